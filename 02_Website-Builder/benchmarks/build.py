@@ -0,0 +1,211 @@
+"""Build benchmark - Times builds and batches against the offline fake LLM backend.
+
+Runs single builds (cold cache, warm cache, streaming, sharded, patch
+review, from a template, local renderer) and batches
+(serial, concurrent, warm cache) with the fake backend, so no API calls are
+made and every run sees the same responses at the same simulated speed.
+Results are appended to a JSONL file together with the git commit, and
+each scenario is compared with the last run that used the same settings.
+
+With ``--latency 0 --tokens-per-second 0`` the LLM takes no time at all and
+the timings are pure orchestrator overhead.
+
+Usage:
+    python benchmarks/build.py [--latency 0.2] [--tokens-per-second 2000]
+                               [--jobs 8] [--repeat 3] [--results FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DESCRIPTION = "A neighbourhood bakery selling sourdough, pastries and coffee"
+
+
+def git_commit() -> str:
+    """Return the short commit hash, marked dirty if the tree has changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "."], cwd=PROJECT_ROOT).returncode
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def configure(options, workdir: Path) -> None:
+    """Point the website builder at the fake backend and scratch directories.
+
+    Must run before website_builder is imported, since its configuration is
+    read from the environment at import time.
+    """
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(options.latency),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(options.tokens_per_second),
+        "OUTPUT_DIR": str(workdir / "output"),
+        "CACHE_DIR": str(workdir / "cache"),
+        "TEMPLATES_DIR": str(workdir / "templates"),
+    })
+    if not options.rate_limits:
+        os.environ["LLM_REQUESTS_PER_MINUTE"] = "0"
+        os.environ["LLM_TOKENS_PER_MINUTE"] = "0"
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def build_scenario(name: str, warm: bool = False, **options):
+    """Return a scenario running one build; a cold one clears the cache first."""
+    def run(orchestrator, run_id):
+        from website_builder.metrics import BuildMetrics
+
+        if not warm:
+            orchestrator.cache.clear()
+        metrics = BuildMetrics(site=run_id)
+        started = time.perf_counter()
+        orchestrator.build_website(DESCRIPTION, output_name=run_id, metrics=metrics, **options)
+        return time.perf_counter() - started, metrics.totals()
+
+    run.__name__ = name
+    return run
+
+
+def batch_scenario(name: str, workers: int, jobs: int, warm: bool = False):
+    """Return a scenario running a batch of distinct jobs."""
+    def run(orchestrator, run_id):
+        from website_builder.batch import BatchJob, BatchRunner, summarize
+
+        if not warm:
+            orchestrator.cache.clear()
+        batch = [
+            BatchJob(description=f"{DESCRIPTION}, branch {number}", name=f"{run_id}-{number}")
+            for number in range(jobs)
+        ]
+        # Every job is built, so serial and concurrent batches do the same work
+        runner = BatchRunner(orchestrator, workers=workers, retries=0, dedupe=False)
+        started = time.perf_counter()
+        results = runner.run(batch)
+        wall_time = time.perf_counter() - started
+        summary = summarize(results, wall_time)
+        if summary["failed"]:
+            raise RuntimeError(f"{name}: {summary['failures'][0]['error']}")
+        return wall_time, {**summary["usage"], "sites_per_minute": round(summary["sites_per_minute"], 1)}
+
+    run.__name__ = name
+    return run
+
+
+def scenarios(options):
+    # Warm scenarios follow the cold scenario whose cache they reuse
+    return [
+        (build_scenario("build/cold"), {"templates": "save"}),
+        (build_scenario("build/warm", warm=True), {}),
+        (build_scenario("build/stream", stream=True), {}),
+        (build_scenario("build/sharded"), {"sharded_code": True}),
+        (build_scenario("build/patch-review"), {"review_mode": "patch"}),
+        # Starts from the template saved by the cold build
+        (build_scenario("build/template"), {"templates": "use"}),
+        (build_scenario("build/local"), {"renderer": "local"}),
+        (batch_scenario("batch/serial", 1, options.jobs), {"coalesce": False}),
+        (batch_scenario("batch/concurrent", options.jobs, options.jobs), {"coalesce": False}),
+        (batch_scenario("batch/warm", options.jobs, options.jobs, warm=True), {"coalesce": False}),
+    ]
+
+
+def run_benchmarks(options):
+    from website_builder.orchestrator import AgentOrchestrator
+
+    results = {}
+    for scenario, orchestrator_options in scenarios(options):
+        orchestrator = AgentOrchestrator(quiet=True, **orchestrator_options)
+        timings, totals = [], {}
+        for repeat in range(options.repeat):
+            run_id = f"{scenario.__name__.replace('/', '-')}-{repeat}"
+            elapsed, totals = scenario(orchestrator, run_id)
+            timings.append(elapsed)
+        results[scenario.__name__] = {
+            "median": statistics.median(timings),
+            "min": min(timings),
+            "runs": timings,
+            "totals": totals,
+        }
+        print(f"{scenario.__name__:<20} {results[scenario.__name__]['median'] * 1000:9.1f} ms", flush=True)
+    return results
+
+
+def previous_record(path: Path, settings):
+    """Return the latest recorded run with the same settings, if any."""
+    if not path.exists():
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("settings") == settings:
+                    previous = record
+    return previous
+
+
+def print_comparison(record, previous) -> None:
+    print(f"\n{'scenario':<20} {'median':>10} {'min':>10}   vs {previous['commit'] if previous else '(no previous run)'}")
+    for name, result in record["scenarios"].items():
+        line = f"{name:<20} {result['median'] * 1000:8.1f}ms {result['min'] * 1000:8.1f}ms"
+        before = (previous or {}).get("scenarios", {}).get(name)
+        if before and before["median"] > 0:
+            line += f"   {result['median'] / before['median'] - 1:+7.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=2000, help="Simulated generation speed; 0 is instant")
+    parser.add_argument("--jobs", type=int, default=8, help="Jobs per batch scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the scheduler's configured rate limits")
+    parser.add_argument(
+        "--results", type=Path, default=PROJECT_ROOT / "benchmarks" / "results.jsonl",
+        help="JSONL file the results are appended to"
+    )
+    options = parser.parse_args()
+
+    settings = {
+        "latency": options.latency,
+        "tokens_per_second": options.tokens_per_second,
+        "jobs": options.jobs,
+        "repeat": options.repeat,
+        "rate_limits": options.rate_limits,
+    }
+    with tempfile.TemporaryDirectory(prefix="website-builder-bench-") as workdir:
+        configure(options, Path(workdir))
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "settings": settings,
+            "scenarios": run_benchmarks(options),
+        }
+
+    previous = previous_record(options.results, settings)
+    print_comparison(record, previous)
+
+    options.results.parent.mkdir(parents=True, exist_ok=True)
+    with open(options.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nResults appended to {options.results}")
+
+
+if __name__ == "__main__":
+    main()
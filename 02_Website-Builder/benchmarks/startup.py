@@ -0,0 +1,109 @@
+"""Startup benchmark - Checks that light CLI commands start within a time budget.
+
+Runs each command several times in a fresh interpreter and compares the
+median wall time against the budget. It also imports the CLI module with
+``python -X importtime`` and fails if any module that should be deferred to
+the commands that need it is imported at startup.
+
+Usage:
+    python benchmarks/startup.py [--budget-ms 200] [--runs 5]
+
+Exits with status 1 if a budget is exceeded.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = [
+    ["config"],
+    ["preview", "--help"],
+    ["--help"],
+]
+
+# Heavy modules only the build, rebuild and batch commands may import
+DEFERRED_MODULES = [
+    "langchain_core",
+    "langchain_openai",
+    "openai",
+    "pydantic",
+    "rich.progress",
+    "website_builder.orchestrator",
+    "website_builder.agents",
+]
+
+
+def time_command(args, runs: int, module: bool = True):
+    """Return the wall time in seconds of each run of a CLI command (or plain interpreter args)."""
+    prefix = ["-m", "website_builder"] if module else []
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *prefix, *args],
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True
+        )
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def import_profile():
+    """Return {module: cumulative import time in microseconds} for importing the CLI."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import website_builder.cli"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        profile[module.strip()] = int(cumulative)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=200, help="Median wall time allowed per command")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command")
+    options = parser.parse_args()
+
+    failed = False
+
+    # Warm the bytecode cache so the first run is not penalised
+    time_command(["--help"], 1)
+    baseline = statistics.median(time_command(["-c", "pass"], options.runs, module=False)) * 1000
+    print(f"{'(interpreter)':<16} {baseline:7.1f} ms")
+    for command in COMMANDS:
+        median = statistics.median(time_command(command, options.runs)) * 1000
+        status = "ok" if median <= options.budget_ms else "OVER BUDGET"
+        failed |= median > options.budget_ms
+        print(f"{' '.join(command):<16} {median:7.1f} ms  (budget {options.budget_ms:.0f} ms)  {status}")
+
+    profile = import_profile()
+    print(f"\nimport website_builder.cli: {profile.get('website_builder.cli', 0) / 1000:.1f} ms")
+    for module, cumulative in sorted(profile.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {cumulative / 1000:7.1f} ms  {module}")
+
+    eager = [module for module in DEFERRED_MODULES if module in profile]
+    if eager:
+        failed = True
+        print(f"\nImported at startup but should be deferred: {', '.join(eager)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# The builder reads its configuration on import: run every agent on the offline fake backend,
+# writing into a directory removed when the tests finish
+workdir = tempfile.mkdtemp(prefix="website-builder-tests-")
+atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0")
+os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "0")
+os.environ.setdefault("OUTPUT_DIR", os.path.join(workdir, "output"))
+os.environ.setdefault("CACHE_DIR", os.path.join(workdir, "cache"))
+os.environ.setdefault("TEMPLATES_DIR", os.path.join(workdir, "templates"))
@@ -0,0 +1,59 @@
+import json
+import shutil
+
+import pytest
+
+from website_builder.manifest import BUILD_DIR_NAME, StageManifest
+from website_builder.orchestrator import AgentOrchestrator
+
+
+DESCRIPTION = "A bakery in Lisbon selling pastel de nata"
+
+
+@pytest.fixture
+def orchestrator():
+    return AgentOrchestrator(use_cache=False, quiet=True, templates="off")
+
+
+def build(orchestrator, project_dir):
+    return orchestrator.build_website(DESCRIPTION, output_name=str(project_dir))
+
+
+def test_unchanged_project_reuses_every_stage(orchestrator, tmp_path):
+    project_dir = build(orchestrator, tmp_path / "bakery")
+    page = (project_dir / "index.html").read_text()
+
+    orchestrator.rebuild_website(project_dir)
+
+    assert StageManifest(project_dir).stages.keys() == {"content", "design", "code", "review"}
+    assert (project_dir / "index.html").read_text() == page
+
+
+def test_new_style_reruns_design_and_everything_after_it(orchestrator, tmp_path):
+    project_dir = build(orchestrator, tmp_path / "bakery")
+    content = (project_dir / "content.json").read_text()
+    manifest = StageManifest(project_dir)
+
+    orchestrator.rebuild_website(project_dir, style="bold")
+
+    rebuilt = StageManifest(project_dir)
+    assert (project_dir / "content.json").read_text() == content
+    assert rebuilt.stages["content"] == manifest.stages["content"]
+    assert rebuilt.stages["design"]["inputs"] != manifest.stages["design"]["inputs"]
+    assert rebuilt.request["style"] == "bold"
+
+
+def test_project_without_manifest_does_not_keep_a_page_from_old_code(orchestrator, tmp_path):
+    project_dir = build(orchestrator, tmp_path / "bakery")
+    content = json.loads((project_dir / "content.json").read_text())
+    # a project built before stage manifests: outputs, but no .build/ directory
+    shutil.rmtree(project_dir / BUILD_DIR_NAME)
+    (project_dir / "index.html").write_text("<html><body>Old page</body></html>")
+
+    rebuilt = orchestrator.rebuild_website(project_dir, description=DESCRIPTION)
+
+    # content.json has nothing upstream and is kept, but the code is rewritten, so the page is reviewed again
+    assert json.loads((rebuilt / "content.json").read_text()) == content
+    assert (rebuilt / BUILD_DIR_NAME / "code.html").exists()
+    assert "Old page" not in (rebuilt / "index.html").read_text()
+    assert StageManifest(rebuilt).stages.keys() == {"content", "design", "code", "review"}
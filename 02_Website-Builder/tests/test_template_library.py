@@ -0,0 +1,30 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from website_builder.template_library import TemplateLibrary
+
+
+DESIGN = json.loads((Path(__file__).parent.parent / "website_builder" / "recordings" / "design.json").read_text())
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = TemplateLibrary(tmp_path / "templates")
+    library.save("business", "elegant", "A bakery in Lisbon selling pastel de nata", DESIGN)
+    return library
+
+
+def test_find_returns_the_closest_template_of_the_same_kind(library):
+    template = library.find("business", "elegant", "A bakery in Lisbon selling pastel de nata and coffee")
+
+    assert template is not None
+    assert template.description == "A bakery in Lisbon selling pastel de nata"
+    assert 0.25 <= template.similarity < 1
+    assert library.find("business", "bold", "A bakery in Lisbon selling pastel de nata") is None
+
+
+def test_find_ignores_templates_below_the_minimum_similarity(library):
+    assert library.find("business", "elegant", "A plumbing company in Boston offering emergency repairs") is None
+    assert library.find("business", "elegant", "A law firm", min_similarity=0) is not None
@@ -1,30 +1,96 @@
 """Base agent class for all AI agents."""
 
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Tuple, Type, TypeVar
 
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from pydantic import BaseModel
 
-from ..config import OPENAI_API_KEY, OPENAI_MODEL
+from ..cache import ResponseCache
+from ..clients import get_chat_model, registry
+from ..jsonparse import parse_json
+from ..metrics import stage_metrics
+from ..scheduler import estimate_tokens, scheduler
+from ..schemas import example_json, find_problems
+
+
+T = TypeVar("T")
+
+REASK_TEMPLATE = """Part of your previous JSON response was missing or invalid.
+
+{context}
+
+Problems:
+{problems}
+
+Respond with valid JSON only: an object containing ONLY the keys {fields},
+each complete and in this format:
+{format}"""
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine to completion from synchronous code.
+    
+    Args:
+        awaitable: The coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_run_and_close(awaitable))
+    awaitable.close()
+    raise RuntimeError(
+        "The synchronous API cannot be used inside a running event loop; "
+        "await the async variant (arun / abuild_website) instead."
+    )
+
+
+async def _run_and_close(awaitable: Awaitable[T]) -> T:
+    """Await a coroutine, then close the pooled connections its event loop opened."""
+    try:
+        return await awaitable
+    finally:
+        await registry.aclose()
+
+
+def _merge_fix(old: Any, new: Any, problems: Dict[str, str]) -> Any:
+    """Merge a re-asked section into the original, keeping its valid fields."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    invalid = {path.split(".")[1] for path in problems if path.count(".") >= 1}
+    merged = dict(new)
+    merged.update({key: value for key, value in old.items() if key not in invalid})
+    return merged
 
 
 class BaseAgent(ABC):
     """Abstract base class for all AI agents."""
 
-    def __init__(self, temperature: float = 0.7):
+    def __init__(self, temperature: float = 0.7, cache: Optional[ResponseCache] = None):
         """Initialize the agent with LLM configuration.
         
         Args:
             temperature: Creativity level for the LLM (0.0-1.0)
+            cache: Optional response cache shared between agents
         """
-        self.llm = ChatOpenAI(
-            api_key=OPENAI_API_KEY,
-            model=OPENAI_MODEL,
-            temperature=temperature
-        )
+        self.temperature = temperature
+        self.cache = cache
         self.output_parser = StrOutputParser()
+        # Chains by (template, parse_output), with the chat model they were built on
+        self._chains: Dict[Tuple[str, bool], Tuple[Any, Any]] = {}
+
+    @property
+    def llm(self):
+        """The shared chat model, sending requests at this agent's temperature."""
+        return get_chat_model(self.temperature)
 
     @property
     @abstractmethod
@@ -38,23 +104,188 @@ class BaseAgent(ABC):
         """Return the agent's system prompt."""
         pass
 
-    def create_chain(self, human_template: str):
-        """Create a LangChain chain with the given human template.
+    def create_chain(self, human_template: str, parse_output: bool = True):
+        """Return the LangChain chain for the given human template.
+        
+        Chains are built once per template and reused. The system prompt is
+        passed as a literal message, so it is sent byte-identical on every
+        request and forms the start of a prefix the provider can cache.
         
         Args:
             human_template: The template for human messages
+            parse_output: Whether to reduce the model's messages to plain text;
+                without it the chain yields messages that carry token usage
             
         Returns:
             A runnable chain
         """
+        model = registry.chat_model()
+        key = (human_template, parse_output)
+        cached = self._chains.get(key)
+        if cached is not None and cached[0] is model:
+            return cached[1]
+
         prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_prompt),
+            SystemMessage(content=self.system_prompt),
             ("human", human_template)
         ])
-        return prompt | self.llm | self.output_parser
+        chain = prompt | self.llm
+        if parse_output:
+            chain = chain | self.output_parser
+        self._chains[key] = (model, chain)
+        return chain
+
+    def _estimate_tokens(self, human_template: str, inputs: Dict[str, Any]) -> int:
+        """Estimate a request's tokens for the scheduler's token budget."""
+        return estimate_tokens(self.system_prompt, human_template, *(str(v) for v in inputs.values()))
+
+    async def ainvoke_chain(self, human_template: str, inputs: Dict[str, Any]) -> str:
+        """Run a chain for the given template, serving repeated requests from the cache.
+        
+        Args:
+            human_template: The template for human messages
+            inputs: Values used to fill the template
+            
+        Returns:
+            The raw LLM response text
+        """
+        metrics = stage_metrics()
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(
+                registry.model_id, self.temperature, self.system_prompt, human_template, inputs
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                if metrics is not None:
+                    metrics.cache_hits += 1
+                return cached
+
+        chain = self.create_chain(human_template, parse_output=False)
+        estimate = self._estimate_tokens(human_template, inputs)
+        message = await scheduler.run(lambda: chain.ainvoke(inputs), estimate)
+        result = self.output_parser.invoke(message)
+        usage = getattr(message, "usage_metadata", None)
+        scheduler.record_usage(estimate, usage.get("total_tokens") if usage else None)
+        if metrics is not None:
+            metrics.record_call(usage)
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.set, key, result)
+        return result
+
+    async def astream_chain(self, human_template: str, inputs: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream a chain's output token by token.
+        
+        A cache hit is yielded as a single chunk; a miss is stored in the
+        cache once the stream completes.
+        
+        Args:
+            human_template: The template for human messages
+            inputs: Values used to fill the template
+            
+        Yields:
+            Chunks of the raw LLM response text
+        """
+        metrics = stage_metrics()
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(
+                registry.model_id, self.temperature, self.system_prompt, human_template, inputs
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                if metrics is not None:
+                    metrics.cache_hits += 1
+                yield cached
+                return
+
+        parts = []
+        usage = None
+        ttft = None
+        chain = self.create_chain(human_template, parse_output=False)
+        estimate = self._estimate_tokens(human_template, inputs)
+        started = time.perf_counter()
+        async for message in scheduler.stream(lambda: chain.astream(inputs), estimate):
+            # With stream_usage the final chunk carries the token counts
+            if getattr(message, "usage_metadata", None):
+                usage = message.usage_metadata
+            chunk = self.output_parser.invoke(message)
+            if not chunk:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(chunk)
+            yield chunk
+
+        scheduler.record_usage(estimate, usage.get("total_tokens") if usage else None)
+        if metrics is not None:
+            metrics.record_call(usage, ttft)
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.set, key, "".join(parts))
+
+    async def aparse_structured(
+        self,
+        raw_response: str,
+        schema: Type[BaseModel],
+        context: str,
+        max_reasks: int = 2
+    ) -> Dict[str, Any]:
+        """Parse JSON output against a schema, repairing it instead of regenerating.
+        
+        The response is parsed with local repair of common defects. Fields
+        that are still missing or invalid are requested again on their own,
+        and the answers are merged into what was already parsed.
+        
+        Args:
+            raw_response: The raw LLM response
+            schema: Model the output should match
+            context: Description of the task, included in re-ask prompts
+            max_reasks: Maximum number of follow-up requests
+            
+        Returns:
+            The parsed and validated output
+            
+        Raises:
+            ValueError: If the output is still invalid after all re-asks
+        """
+        data = parse_json(raw_response)
+        if not isinstance(data, dict):
+            data = {}
+
+        for attempt in range(max_reasks + 1):
+            problems = find_problems(data, schema)
+            if not problems:
+                return data
+            if attempt == max_reasks:
+                break
+
+            fields = sorted(problems)
+            metrics = stage_metrics()
+            if metrics is not None:
+                metrics.retries += 1
+            result = await self.ainvoke_chain(REASK_TEMPLATE, {
+                "context": context,
+                "problems": "\n".join(
+                    f"- {path}: {message}"
+                    for field in fields for path, message in problems[field].items()
+                ),
+                "fields": ", ".join(fields),
+                "format": json.dumps(example_json(schema, fields), indent=2),
+            })
+            patch = parse_json(result)
+            if isinstance(patch, dict):
+                for key, value in patch.items():
+                    if key in problems:
+                        data[key] = _merge_fix(data.get(key), value, problems[key])
+
+        raise ValueError(
+            f"Failed to parse {self.name} output; still invalid: {', '.join(sorted(problems))}"
+        )
 
     @abstractmethod
-    def run(self, **kwargs) -> Dict[str, Any]:
+    async def arun(self, **kwargs) -> Dict[str, Any]:
         """Execute the agent's main task.
         
         Args:
@@ -64,3 +295,7 @@ class BaseAgent(ABC):
             Dictionary containing the agent's output
         """
         pass
+
+    def run(self, **kwargs) -> Dict[str, Any]:
+        """Synchronous wrapper around :meth:`arun`."""
+        return run_sync(self.arun(**kwargs))
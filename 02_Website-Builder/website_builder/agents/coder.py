@@ -1,15 +1,175 @@
 """Coder Agent - Generates HTML, CSS, and JavaScript code."""
 
-from typing import Any, Dict
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 from .base import BaseAgent
+from ..cache import ResponseCache
+from ..patching import PatchError, apply_edits, parse_edits, validate_patched
+from ..streaming import AtomicWriter, StreamStats, stream_to_file, strip_code_fences
+
+
+DEFAULT_SECTIONS = ["hero", "features", "about", "testimonials", "contact", "footer"]
+
+# Placeholder the shell leaves where the sections are stitched in
+SECTIONS_MARKER = "<!-- SECTIONS -->"
+
+# Classes the shell styles and the sections use, so both can be generated independently
+SHARED_CLASSES = """.container (centered, max width from the design)
+.section (vertical section padding)
+.section-title, .section-subtitle (section headings)
+.btn, .btn-primary, .btn-secondary (buttons and links styled as buttons)
+.card (surface with radius, shadow and hover lift)
+.grid (responsive auto-fit grid with the design's element gap)
+.reveal (hidden until scrolled into view, then animated in by the shell's script)"""
+
+# Templates put the static instructions first and the variable inputs last, so
+# requests share a byte-identical prompt prefix that the provider can cache;
+# the sharded templates also share the description and design of a build
+CODE_TEMPLATE = """Generate a complete, production-ready single-page website from the
+description, design specifications and content below.
+
+Create a COMPLETE index.html file with:
+1. Embedded CSS in <style> tags (use CSS custom properties)
+2. Embedded JavaScript in <script> tags
+3. All sections: hero, features, about, testimonials, contact, footer
+4. Responsive navigation with mobile menu
+5. Smooth scroll behavior
+6. Hover animations and micro-interactions
+7. Mobile-responsive design (use media queries)
+8. Google Fonts import
+
+Output ONLY the complete HTML code, starting with <!DOCTYPE html> and ending with </html>.
+Do NOT include any markdown code blocks or explanations.
+
+Website Description: {description}
+
+DESIGN SPECIFICATIONS:
+{design}
+
+CONTENT:
+{content}"""
+
+SHELL_TEMPLATE = """Generate the page shell for a single-page website. Its sections are written separately.
+
+Create a COMPLETE index.html file with:
+1. <head> with meta tags, title and the Google Fonts import
+2. One <style> block defining CSS custom properties from the design, base element
+   styles, media queries and these shared classes:
+""" + SHARED_CLASSES + """
+3. A responsive navigation bar with a mobile menu linking to each section id (skip the footer)
+4. A <main> element containing exactly this line and nothing else: """ + SECTIONS_MARKER + """
+5. One <script> block for the mobile menu, smooth scrolling and the .reveal animation
+
+Do NOT write any section content or a footer.
+Output ONLY the complete HTML code, starting with <!DOCTYPE html> and ending with </html>.
+Do NOT include any markdown code blocks or explanations.
+
+Website Description: {description}
+
+DESIGN SPECIFICATIONS:
+{design}
+
+SECTIONS (in order, each rendered with id equal to its name): {sections}"""
+
+SECTION_TEMPLATE = """Generate one section of a single-page website; the section name and its
+content are given at the end.
+
+The page already styles these shared classes; use them instead of restyling:
+""" + SHARED_CLASSES + """
+
+Rules:
+1. Output a single <section> element whose id is the section name (use <footer id="footer"> for the footer)
+2. Any extra CSS goes in one <style> block inside the element, with every selector
+   prefixed by # and the section name
+3. Use the design's colors through CSS custom properties such as var(--primary)
+4. Use all of the section content; add .reveal to elements that should animate in
+5. No <html>, <head>, <body> or <script> tags
+
+Output ONLY the HTML for this section.
+Do NOT include any markdown code blocks or explanations.
+
+Website Description: {description}
+
+DESIGN SPECIFICATIONS:
+{design}
+
+SECTION: {section}
+
+SECTION CONTENT:
+{content}"""
+
+
+# The shell comes before the site's details, so adapting one template for
+# many sites repeats the same prompt prefix
+ADAPT_SHELL_TEMPLATE = """Adapt the page shell below, written for another website, to the website
+described at the end. Its sections are written separately.
+
+Change only site-specific text: the <title>, meta descriptions, the brand name and
+navigation labels. Keep the markup, CSS, scripts and the line """ + SECTIONS_MARKER + """ unchanged.
+
+Do NOT output the whole file. Output ONLY edit blocks in exactly this format:
+
+<<<<<<< SEARCH
+lines copied verbatim from the shell
+=======
+the replacement lines
+>>>>>>> REPLACE
+
+Each SEARCH block must match exactly one place in the shell. If nothing needs to
+change, output NO CHANGES
+
+PAGE SHELL:
+{shell}
+
+Website Description: {description}
+
+CONTENT:
+{content}"""
+
+
+def stitch_sections(shell: str, sections: List[str]) -> str:
+    """Insert generated sections into the page shell.
+    
+    Sections go where the shell left SECTIONS_MARKER; a <footer> fragment is
+    moved after the closing </main> so it stays outside the main landmark.
+    
+    Args:
+        shell: Complete HTML document containing SECTIONS_MARKER
+        sections: Section HTML fragments in page order
+        
+    Returns:
+        The assembled HTML document
+    """
+    sections = [section.strip() for section in sections]
+    footers = [section for section in sections if section.lower().startswith("<footer")]
+    body = "\n\n".join(section for section in sections if section not in footers)
+
+    if SECTIONS_MARKER in shell:
+        head, tail = shell.split(SECTIONS_MARKER, 1)
+        main_end = tail.lower().find("</main>")
+        if footers and main_end != -1:
+            main_end += len("</main>")
+            tail = tail[:main_end] + "\n" + "\n".join(footers) + tail[main_end:]
+        elif footers:
+            body = "\n\n".join([body, *footers])
+        return head + body + tail
+
+    # The model dropped the marker; fall back to the end of the body
+    body = "\n\n".join([body, *footers])
+    index = shell.lower().rfind("</body>")
+    if index == -1:
+        return f"{shell}\n{body}\n"
+    return f"{shell[:index]}{body}\n{shell[index:]}"
 
 
 class CoderAgent(BaseAgent):
     """Agent responsible for generating website code."""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ResponseCache] = None):
         # Lower temperature for more consistent code generation
-        super().__init__(temperature=0.3)
+        super().__init__(temperature=0.3, cache=cache)
 
     @property
     def name(self) -> str:
@@ -31,53 +191,125 @@ Your code follows best practices:
 Generate COMPLETE, production-ready code. Do not use placeholders or comments like "add more here".
 Always output the complete HTML file with embedded CSS and JavaScript."""
 
-    def run(self, content: Dict[str, Any], design: Dict[str, Any], description: str) -> Dict[str, Any]:
+    async def arun(
+        self,
+        content: Dict[str, Any],
+        design: Dict[str, Any],
+        description: str,
+        output_path: Optional[Path] = None,
+        on_progress: Optional[Callable[[StreamStats], None]] = None,
+        sharded: bool = False,
+        shell_template: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Generate complete website code.
         
         Args:
             content: Website content from ContentAgent
             design: Design specifications from DesignerAgent
             description: Original website description
+            output_path: If given, stream the HTML straight to this file
+            on_progress: Callback receiving stream statistics while streaming
+            sharded: Generate the shell and each section as separate parallel requests
+            shell_template: Page shell of a previous site with the same design; it
+                is adapted with small edits and only the sections are generated
             
         Returns:
-            Dictionary containing HTML, CSS, and JS code
+            Dictionary containing HTML, CSS, and JS code, or the output path
+            and stream statistics when streaming
         """
-        human_template = """Generate a complete, production-ready single-page website.
+        if sharded or shell_template is not None:
+            return await self._arun_sharded(content, design, description, output_path, shell_template)
 
-Website Description: {description}
+        inputs = {
+            "description": description,
+            "content": json.dumps(content, indent=2),
+            "design": json.dumps(design, indent=2)
+        }
 
-CONTENT:
-{content}
+        if output_path is not None:
+            stats = await stream_to_file(
+                self.astream_chain(CODE_TEMPLATE, inputs), output_path, on_progress
+            )
+            return {"path": output_path, "stats": stats}
 
-DESIGN SPECIFICATIONS:
-{design}
+        result = await self.ainvoke_chain(CODE_TEMPLATE, inputs)
 
-Create a COMPLETE index.html file with:
-1. Embedded CSS in <style> tags (use CSS custom properties)
-2. Embedded JavaScript in <script> tags
-3. All sections: hero, features, about, testimonials, contact, footer
-4. Responsive navigation with mobile menu
-5. Smooth scroll behavior
-6. Hover animations and micro-interactions
-7. Mobile-responsive design (use media queries)
-8. Google Fonts import
+        # Clean up the result (remove any markdown formatting if present)
+        html_code = strip_code_fences(result)
 
-Output ONLY the complete HTML code, starting with <!DOCTYPE html> and ending with </html>.
-Do NOT include any markdown code blocks or explanations."""
+        return {"html": html_code, "raw_response": result}
 
-        import json
+    async def _arun_sharded(
+        self,
+        content: Dict[str, Any],
+        design: Dict[str, Any],
+        description: str,
+        output_path: Optional[Path] = None,
+        shell_template: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate the page shell and every section concurrently, then stitch them.
         
-        chain = self.create_chain(human_template)
-        result = chain.invoke({
-            "description": description,
-            "content": json.dumps(content, indent=2),
-            "design": json.dumps(design, indent=2)
-        })
+        The shell and the sections only share the class contract in
+        SHARED_CLASSES, so all requests can run at once and wall-clock time is
+        bounded by the slowest one instead of the whole document. A shell
+        template is adapted instead of generating the shell.
+        """
+        sections = design.get("layout", {}).get("sections_order") or DEFAULT_SECTIONS
+        design_json = json.dumps(design, indent=2)
 
-        # Clean up the result (remove any markdown formatting if present)
-        html_code = result.strip()
-        if html_code.startswith("```"):
-            lines = html_code.split("\n")
-            html_code = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
+        if shell_template is not None:
+            shell_task = self._adapt_shell(shell_template, content, description, design_json, sections)
+        else:
+            shell_task = self.ainvoke_chain(SHELL_TEMPLATE, {
+                "description": description,
+                "design": design_json,
+                "sections": ", ".join(sections)
+            })
+        section_tasks = [
+            self.ainvoke_chain(SECTION_TEMPLATE, {
+                "description": description,
+                "design": design_json,
+                "section": section,
+                "content": json.dumps(content.get(section, {}), indent=2)
+            })
+            for section in sections
+        ]
+        shell, *parts = await asyncio.gather(shell_task, *section_tasks)
 
-        return {"html": html_code, "raw_response": result}
+        html_code = stitch_sections(
+            strip_code_fences(shell), [strip_code_fences(part) for part in parts]
+        )
+
+        if output_path is not None:
+            with AtomicWriter(output_path) as f:
+                f.write(html_code)
+            return {"path": output_path, "stats": None}
+
+        return {"html": html_code, "raw_response": shell}
+
+    async def _adapt_shell(
+        self,
+        shell: str,
+        content: Dict[str, Any],
+        description: str,
+        design_json: str,
+        sections: List[str]
+    ) -> str:
+        """Edit a template's shell for this site, generating a new one if the edits do not apply."""
+        result = await self.ainvoke_chain(ADAPT_SHELL_TEMPLATE, {
+            "shell": shell,
+            "description": description,
+            "content": json.dumps(content, indent=2)
+        })
+        try:
+            adapted = apply_edits(shell, parse_edits(result))
+            validate_patched(shell, adapted)
+            if SECTIONS_MARKER not in adapted:
+                raise PatchError(f"Adapted shell lost {SECTIONS_MARKER}")
+        except PatchError:
+            return await self.ainvoke_chain(SHELL_TEMPLATE, {
+                "description": description,
+                "design": design_json,
+                "sections": ", ".join(sections)
+            })
+        return adapted
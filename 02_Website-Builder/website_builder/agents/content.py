@@ -1,7 +1,62 @@
 """Content Agent - Generates website content and copy."""
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 from .base import BaseAgent
+from ..jsonparse import IncrementalJSONParser
+from ..schemas import WebsiteContent
+
+
+CONTENT_FORMAT = """{
+    "hero": {
+        "headline": "Main attention-grabbing headline",
+        "subheadline": "Supporting text that explains the value proposition",
+        "cta_primary": "Primary button text",
+        "cta_secondary": "Secondary button text"
+    },
+    "about": {
+        "title": "About section title",
+        "description": "2-3 paragraph about section content"
+    },
+    "features": [
+        {
+            "title": "Feature 1 title",
+            "description": "Feature 1 description",
+            "icon": "suggested icon name"
+        },
+        {
+            "title": "Feature 2 title",
+            "description": "Feature 2 description",
+            "icon": "suggested icon name"
+        },
+        {
+            "title": "Feature 3 title",
+            "description": "Feature 3 description",
+            "icon": "suggested icon name"
+        }
+    ],
+    "testimonials": [
+        {
+            "quote": "Testimonial quote",
+            "author": "Person Name",
+            "role": "Job Title, Company"
+        }
+    ],
+    "contact": {
+        "title": "Contact section title",
+        "description": "Invitation to get in touch"
+    },
+    "footer": {
+        "tagline": "Short company tagline",
+        "copyright": "Copyright text"
+    }
+}"""
+
+# Variable inputs come last so every request shares the same prompt prefix
+CONTENT_TEMPLATE = """Create website content for the website below, in the JSON format
+from your instructions.
+
+Website Type: {website_type}
+Website Description: {description}"""
 
 
 class ContentAgent(BaseAgent):
@@ -25,86 +80,54 @@ You will generate content in a structured JSON format including:
 - Footer content
 
 Make the content professional, engaging, and tailored to the specific business/purpose.
-Always respond with valid JSON only, no additional text."""
+Always respond with valid JSON only, no additional text, in this exact format:
+""" + CONTENT_FORMAT
 
-    def run(self, description: str, website_type: str = "business") -> Dict[str, Any]:
+    async def arun(
+        self,
+        description: str,
+        website_type: str = "business",
+        on_headline: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """Generate website content based on description.
         
         Args:
             description: Description of the website to build
             website_type: Type of website (business, portfolio, landing, etc.)
+            on_headline: If given, the response is streamed and this is called
+                with the hero headline as soon as it has been generated
             
         Returns:
             Dictionary containing structured website content
         """
-        human_template = """Create website content for the following:
-
-Website Description: {description}
-Website Type: {website_type}
-
-Generate comprehensive content in this exact JSON format:
-{{
-    "hero": {{
-        "headline": "Main attention-grabbing headline",
-        "subheadline": "Supporting text that explains the value proposition",
-        "cta_primary": "Primary button text",
-        "cta_secondary": "Secondary button text"
-    }},
-    "about": {{
-        "title": "About section title",
-        "description": "2-3 paragraph about section content"
-    }},
-    "features": [
-        {{
-            "title": "Feature 1 title",
-            "description": "Feature 1 description",
-            "icon": "suggested icon name"
-        }},
-        {{
-            "title": "Feature 2 title",
-            "description": "Feature 2 description",
-            "icon": "suggested icon name"
-        }},
-        {{
-            "title": "Feature 3 title",
-            "description": "Feature 3 description",
-            "icon": "suggested icon name"
-        }}
-    ],
-    "testimonials": [
-        {{
-            "quote": "Testimonial quote",
-            "author": "Person Name",
-            "role": "Job Title, Company"
-        }}
-    ],
-    "contact": {{
-        "title": "Contact section title",
-        "description": "Invitation to get in touch"
-    }},
-    "footer": {{
-        "tagline": "Short company tagline",
-        "copyright": "Copyright text"
-    }}
-}}"""
-
-        chain = self.create_chain(human_template)
-        result = chain.invoke({
+        inputs = {
             "description": description,
             "website_type": website_type
-        })
+        }
+
+        if on_headline is None:
+            result = await self.ainvoke_chain(CONTENT_TEMPLATE, inputs)
+        else:
+            parser = IncrementalJSONParser()
+            parts = []
+            headline = None
+            async for chunk in self.astream_chain(CONTENT_TEMPLATE, inputs):
+                parts.append(chunk)
+                parser.feed(chunk)
+                # Only complete strings are visible while outside a string literal
+                if headline is None and '"' in chunk and not parser.in_string:
+                    partial = parser.snapshot()
+                    hero = partial.get("hero") if isinstance(partial, dict) else None
+                    if isinstance(hero, dict) and isinstance(hero.get("headline"), str):
+                        headline = hero["headline"]
+                        on_headline(headline)
+            result = "".join(parts)
 
-        # Parse JSON result
-        import json
-        try:
-            content = json.loads(result)
-        except json.JSONDecodeError:
-            # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                content = json.loads(json_match.group())
-            else:
-                raise ValueError("Failed to parse content from AI response")
+        # Parse JSON result, repairing or re-asking for broken fields
+        content = await self.aparse_structured(
+            result,
+            WebsiteContent,
+            f"Task: website content for: {description}\nWebsite Type: {website_type}"
+        )
 
         return {"content": content, "raw_response": result}
@@ -1,7 +1,61 @@
 """Designer Agent - Creates design specifications for websites."""
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from .base import BaseAgent
+from ..schemas import DesignSpec, find_problems
+
+
+DESIGN_FORMAT = """{
+    "theme": {
+        "mode": "dark or light",
+        "style": "minimal/bold/elegant/playful"
+    },
+    "colors": {
+        "primary": "#hexcode",
+        "secondary": "#hexcode",
+        "accent": "#hexcode",
+        "background": "#hexcode",
+        "surface": "#hexcode",
+        "text_primary": "#hexcode",
+        "text_secondary": "#hexcode",
+        "gradient": "linear-gradient(...)"
+    },
+    "typography": {
+        "font_heading": "Google Font name",
+        "font_body": "Google Font name",
+        "heading_sizes": {
+            "h1": "4rem",
+            "h2": "2.5rem",
+            "h3": "1.75rem"
+        },
+        "body_size": "1rem",
+        "line_height": "1.6"
+    },
+    "spacing": {
+        "section_padding": "6rem",
+        "element_gap": "2rem",
+        "container_max_width": "1200px"
+    },
+    "effects": {
+        "border_radius": "12px",
+        "box_shadow": "0 10px 40px rgba(0,0,0,0.1)",
+        "glass_effect": true,
+        "animations": ["fade-in", "slide-up", "hover-lift"]
+    },
+    "layout": {
+        "hero_style": "centered/split/full-width",
+        "navigation": "fixed/sticky",
+        "sections_order": ["hero", "features", "about", "testimonials", "contact", "footer"]
+    }
+}"""
+
+# Variable inputs come last so every request shares the same prompt prefix
+DESIGN_TEMPLATE = """Create a stunning design specification for the website below, in the
+JSON format from your instructions.
+
+Design Style: {style}
+Website Description: {description}
+Content Preview: {content_preview}"""
 
 
 class DesignerAgent(BaseAgent):
@@ -23,90 +77,47 @@ You understand color theory, typography, spacing, and modern design trends like:
 - Micro-animations
 - Responsive design
 
-Always respond with valid JSON only, no additional text."""
+Always respond with valid JSON only, no additional text, in this exact format:
+""" + DESIGN_FORMAT
 
-    def run(self, description: str, content: Dict[str, Any], style: str = "modern") -> Dict[str, Any]:
+    async def arun(
+        self,
+        description: str,
+        content: Dict[str, Any],
+        style: str = "modern",
+        template: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Generate design specifications based on website description and content.
         
         Args:
             description: Description of the website
-            content: Generated content from ContentAgent
+            content: Generated content from ContentAgent; only the hero headline is used
             style: Design style preference
+            template: Design of a previous site of the same type and style; used
+                as is, without an LLM call, if it is still a valid specification
             
         Returns:
             Dictionary containing design specifications
         """
-        human_template = """Create a stunning design specification for:
-
-Website Description: {description}
-Design Style: {style}
-Content Preview: {content_preview}
-
-Generate a comprehensive design spec in this exact JSON format:
-{{
-    "theme": {{
-        "mode": "dark or light",
-        "style": "minimal/bold/elegant/playful"
-    }},
-    "colors": {{
-        "primary": "#hexcode",
-        "secondary": "#hexcode",
-        "accent": "#hexcode",
-        "background": "#hexcode",
-        "surface": "#hexcode",
-        "text_primary": "#hexcode",
-        "text_secondary": "#hexcode",
-        "gradient": "linear-gradient(...)"
-    }},
-    "typography": {{
-        "font_heading": "Google Font name",
-        "font_body": "Google Font name",
-        "heading_sizes": {{
-            "h1": "4rem",
-            "h2": "2.5rem",
-            "h3": "1.75rem"
-        }},
-        "body_size": "1rem",
-        "line_height": "1.6"
-    }},
-    "spacing": {{
-        "section_padding": "6rem",
-        "element_gap": "2rem",
-        "container_max_width": "1200px"
-    }},
-    "effects": {{
-        "border_radius": "12px",
-        "box_shadow": "0 10px 40px rgba(0,0,0,0.1)",
-        "glass_effect": true,
-        "animations": ["fade-in", "slide-up", "hover-lift"]
-    }},
-    "layout": {{
-        "hero_style": "centered/split/full-width",
-        "navigation": "fixed/sticky",
-        "sections_order": ["hero", "features", "about", "testimonials", "contact", "footer"]
-    }}
-}}"""
+        if template is not None and not find_problems(template, DesignSpec):
+            return {"design": dict(template), "raw_response": None, "template": True}
 
-        # Create a summary of content for the designer
-        content_preview = f"Hero: {content.get('hero', {}).get('headline', 'N/A')}"
+        # Create a summary of content for the designer; when designing in
+        # parallel with the ContentAgent there is nothing to preview yet
+        headline = content.get('hero', {}).get('headline')
+        content_preview = f"Hero: {headline}" if headline else "N/A (design from the description)"
 
-        chain = self.create_chain(human_template)
-        result = chain.invoke({
+        result = await self.ainvoke_chain(DESIGN_TEMPLATE, {
             "description": description,
             "style": style,
             "content_preview": content_preview
         })
 
-        # Parse JSON result
-        import json
-        try:
-            design = json.loads(result)
-        except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                design = json.loads(json_match.group())
-            else:
-                raise ValueError("Failed to parse design from AI response")
+        # Parse JSON result, repairing or re-asking for broken fields
+        design = await self.aparse_structured(
+            result,
+            DesignSpec,
+            f"Task: design specification for: {description}\nDesign Style: {style}"
+        )
 
         return {"design": design, "raw_response": result}
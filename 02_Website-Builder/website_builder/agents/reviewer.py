@@ -1,15 +1,72 @@
 """Reviewer Agent - Reviews and improves generated website code."""
 
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
 from .base import BaseAgent
+from ..cache import ResponseCache
+from ..patching import PatchError, apply_edits, parse_edits, validate_patched
+from ..streaming import AtomicWriter, StreamStats, stream_to_file, strip_code_fences
+
+
+# Instructions come first and the variable inputs last, so requests share a
+# byte-identical prompt prefix that the provider can cache
+REVIEW_TEMPLATE = """Review and improve the website code below.
+
+Please improve the code by:
+1. Adding proper meta tags (description, viewport, og tags)
+2. Ensuring all accessibility requirements are met
+3. Adding subtle micro-animations for better UX
+4. Polishing the visual design
+5. Optimizing performance
+6. Fixing any potential issues
+
+Output ONLY the complete, improved HTML code.
+Start with <!DOCTYPE html> and end with </html>.
+Do NOT include any markdown code blocks or explanations.
+Do NOT remove any sections - only improve them.
+
+ORIGINAL WEBSITE PURPOSE: {description}
+
+CODE TO REVIEW:
+{html_code}"""
+
+PATCH_TEMPLATE = """Review and improve the website code below.
+
+Please improve the code by:
+1. Adding proper meta tags (description, viewport, og tags)
+2. Ensuring all accessibility requirements are met
+3. Adding subtle micro-animations for better UX
+4. Polishing the visual design
+5. Optimizing performance
+6. Fixing any potential issues
+
+Do NOT output the whole file. Output ONLY edit blocks in exactly this format:
+
+<<<<<<< SEARCH
+lines copied verbatim from the code
+=======
+the improved replacement lines
+>>>>>>> REPLACE
+
+Rules:
+- Each SEARCH block must match exactly one place in the code; include just enough lines to be unique
+- Keep blocks small and focused; use as many blocks as needed
+- Blocks are applied in order, so never SEARCH for text changed by an earlier block
+- Do NOT remove any sections - only improve them
+- If nothing needs to change, output NO CHANGES
+
+ORIGINAL WEBSITE PURPOSE: {description}
+
+CODE TO REVIEW:
+{html_code}"""
 
 
 class ReviewerAgent(BaseAgent):
     """Agent responsible for reviewing and improving website code."""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ResponseCache] = None):
         # Moderate temperature for balanced creativity and consistency
-        super().__init__(temperature=0.4)
+        super().__init__(temperature=0.4, cache=cache)
 
     @property
     def name(self) -> str:
@@ -32,46 +89,59 @@ When you review code, output the IMPROVED, COMPLETE HTML file.
 Make meaningful improvements while keeping the core design intact.
 Do NOT remove any sections. Only enhance what exists."""
 
-    def run(self, html_code: str, description: str) -> Dict[str, Any]:
+    async def arun(
+        self,
+        html_code: str,
+        description: str,
+        output_path: Optional[Path] = None,
+        on_progress: Optional[Callable[[StreamStats], None]] = None,
+        mode: str = "full"
+    ) -> Dict[str, Any]:
         """Review and improve the generated website code.
         
         Args:
             html_code: The HTML code to review
             description: Original website description for context
+            output_path: If given, stream the improved HTML straight to this file
+            on_progress: Callback receiving stream statistics while streaming
+            mode: "full" to request the whole improved file, or "patch" to request
+                search/replace edits that are applied locally, falling back to a
+                full rewrite if they do not apply cleanly
             
         Returns:
-            Dictionary containing improved HTML code
+            Dictionary containing improved HTML code, or the output path and
+            stream statistics when streaming
         """
-        human_template = """Review and improve this website code:
-
-ORIGINAL WEBSITE PURPOSE: {description}
-
-CODE TO REVIEW:
-{html_code}
-
-Please improve the code by:
-1. Adding proper meta tags (description, viewport, og tags)
-2. Ensuring all accessibility requirements are met
-3. Adding subtle micro-animations for better UX
-4. Polishing the visual design
-5. Optimizing performance
-6. Fixing any potential issues
-
-Output ONLY the complete, improved HTML code.
-Start with <!DOCTYPE html> and end with </html>.
-Do NOT include any markdown code blocks or explanations.
-Do NOT remove any sections - only improve them."""
-
-        chain = self.create_chain(human_template)
-        result = chain.invoke({
+        inputs = {
             "description": description,
             "html_code": html_code
-        })
+        }
+
+        patch_error = None
+        if mode == "patch":
+            result = await self.ainvoke_chain(PATCH_TEMPLATE, inputs)
+            try:
+                edits = parse_edits(result)
+                improved_html = apply_edits(html_code, edits)
+                validate_patched(html_code, improved_html)
+            except PatchError as e:
+                patch_error = str(e)
+            else:
+                if output_path is not None:
+                    with AtomicWriter(output_path) as f:
+                        f.write(improved_html)
+                    return {"path": output_path, "stats": None, "mode": "patch", "edits": len(edits)}
+                return {"html": improved_html, "raw_response": result, "mode": "patch", "edits": len(edits)}
+
+        if output_path is not None:
+            stats = await stream_to_file(
+                self.astream_chain(REVIEW_TEMPLATE, inputs), output_path, on_progress
+            )
+            return {"path": output_path, "stats": stats, "mode": "full", "patch_error": patch_error}
+
+        result = await self.ainvoke_chain(REVIEW_TEMPLATE, inputs)
 
         # Clean up the result
-        improved_html = result.strip()
-        if improved_html.startswith("```"):
-            lines = improved_html.split("\n")
-            improved_html = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
+        improved_html = strip_code_fences(result)
 
-        return {"html": improved_html, "raw_response": result}
+        return {"html": improved_html, "raw_response": result, "mode": "full", "patch_error": patch_error}
@@ -0,0 +1,329 @@
+"""Batch Builder - Runs many website builds from a manifest concurrently."""
+
+import asyncio
+import csv
+import hashlib
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .agents.base import run_sync
+from .dedupe import DuplicateIndex, request_signature
+from .metrics import BuildMetrics
+from .orchestrator import AgentOrchestrator, project_dir_for
+
+
+STAGES = ["content", "design", "code", "review", "optimize"]
+
+
+@dataclass
+class BatchJob:
+    """A single website build request from a manifest."""
+
+    description: str
+    website_type: str = "business"
+    style: str = "modern"
+    name: Optional[str] = None
+
+    @property
+    def project_dir(self) -> Path:
+        return project_dir_for(self.description, self.name)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch job."""
+
+    job: BatchJob
+    status: str
+    attempts: int = 0
+    elapsed: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
+    totals: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    # For a coalesced job, the project directory whose output it received
+    source: Optional[str] = None
+
+
+def load_manifest(path: Path) -> List[BatchJob]:
+    """Read build jobs from a JSONL or CSV manifest.
+
+    Each record needs a ``description`` and may set ``type`` (or
+    ``website_type``), ``style`` and ``name``.
+
+    Args:
+        path: Path to a .jsonl or .csv manifest
+
+    Returns:
+        List of jobs in manifest order
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    for number, record in enumerate(records, start=1):
+        description = (record.get("description") or "").strip()
+        if not description:
+            raise ValueError(f"{path}: record {number} has no description")
+        jobs.append(BatchJob(
+            description=description,
+            website_type=record.get("type") or record.get("website_type") or "business",
+            style=record.get("style") or "modern",
+            name=record.get("name") or None,
+        ))
+    return assign_project_dirs(jobs)
+
+
+def assign_project_dirs(jobs: List[BatchJob]) -> List[BatchJob]:
+    """Give every job its own project directory.
+
+    Unnamed jobs are placed by the start of their description, so a job
+    whose directory an earlier job already uses is named after it with a
+    short hash of its request appended, and its position in the manifest
+    too if it repeats an earlier request. The names only depend on the
+    manifest, so resuming it finds the same directories.
+
+    Args:
+        jobs: Jobs in manifest order, named in place
+
+    Returns:
+        The same jobs
+
+    Raises:
+        ValueError: If two jobs are given the same name
+    """
+    used: Dict[Path, BatchJob] = {}
+    for number, job in enumerate(jobs, start=1):
+        if job.name is None and job.project_dir in used:
+            request = "\n".join([job.description, job.website_type, job.style])
+            digest = hashlib.sha256(request.encode("utf-8")).hexdigest()[:8]
+            name = f"{job.project_dir.name}_{digest}"
+            job.name = name
+            if job.project_dir in used:
+                job.name = f"{name}_{number}"
+        other = used.get(job.project_dir)
+        if other is not None:
+            raise ValueError(
+                f"job {number} ({job.name!r}) would build into {job.project_dir}, "
+                f"which {(other.name or other.description[:40])!r} already uses; "
+                "give the jobs distinct names"
+            )
+        used[job.project_dir] = job
+    return jobs
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct-th percentile of values using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class BatchRunner:
+    """Runs build jobs concurrently on one event loop sharing one orchestrator."""
+
+    def __init__(
+        self,
+        orchestrator: AgentOrchestrator,
+        workers: int = 4,
+        retries: int = 2,
+        skip_review: bool = False,
+        stream: bool = False,
+        optimize: bool = False,
+        dedupe: bool = True
+    ):
+        """Initialize the runner.
+
+        Args:
+            orchestrator: Orchestrator used for every build
+            workers: Maximum number of builds in flight
+            retries: Extra attempts for a failing job
+            skip_review: Whether to skip the review step
+            stream: Stream generated HTML straight to disk
+            optimize: Minify, split and precompress each site's assets
+            dedupe: Build duplicate jobs once and copy the result to each of
+                their output directories (near-duplicates too when
+                DEDUPE_SIMILARITY is below 1)
+        """
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.retries = retries
+        self.skip_review = skip_review
+        self.stream = stream
+        self.optimize = optimize
+        self.dedupe = dedupe
+
+    def run(
+        self,
+        jobs: List[BatchJob],
+        on_result: Optional[Callable[[BatchResult], None]] = None
+    ) -> List[BatchResult]:
+        """Synchronous wrapper around :meth:`arun`."""
+        return run_sync(self.arun(jobs, on_result))
+
+    async def arun(
+        self,
+        jobs: List[BatchJob],
+        on_result: Optional[Callable[[BatchResult], None]] = None
+    ) -> List[BatchResult]:
+        """Run every job, skipping those whose output already exists.
+
+        With dedupe on, a job that duplicates an earlier one in the batch
+        waits for that job without taking a worker and then receives a
+        copy of its output; if the earlier job fails it is built on its own.
+
+        Args:
+            jobs: Jobs to build
+            on_result: Callback invoked as each job finishes
+
+        Returns:
+            Results in the same order as jobs
+
+        Raises:
+            ValueError: If two jobs would build into the same directory
+        """
+        assign_project_dirs(jobs)
+        slots = asyncio.Semaphore(self.workers)
+
+        async def build(job: BatchJob) -> BatchResult:
+            if (job.project_dir / "index.html").exists():
+                return BatchResult(job=job, status="skipped")
+            async with slots:
+                return await self._run_job(job)
+
+        async def follow(job: BatchJob, leader: "asyncio.Task[BatchResult]", similarity: float) -> BatchResult:
+            if (job.project_dir / "index.html").exists():
+                return BatchResult(job=job, status="skipped")
+            source = await leader
+            if source.status == "failed":
+                return await build(job)
+            metrics = BuildMetrics(site=job.project_dir.name)
+            self.orchestrator.fan_out(source.job.project_dir, job.project_dir, similarity, metrics)
+            return BatchResult(job=job, status="coalesced", source=source.job.project_dir.name)
+
+        async def report(result: Awaitable[BatchResult]) -> BatchResult:
+            result = await result
+            if on_result:
+                on_result(result)
+            return result
+
+        index: DuplicateIndex["asyncio.Task[BatchResult]"] = DuplicateIndex()
+        tasks = []
+        for job in jobs:
+            if not self.dedupe:
+                tasks.append(asyncio.ensure_future(report(build(job))))
+                continue
+            signature = request_signature(
+                job.description, job.website_type, job.style,
+                skip_review=self.skip_review, optimize=self.optimize
+            )
+            match = index.find(signature)
+            if match is None:
+                task = asyncio.ensure_future(report(build(job)))
+                index.add(signature, task)
+            else:
+                task = asyncio.ensure_future(report(follow(job, *match)))
+            tasks.append(task)
+
+        return list(await asyncio.gather(*tasks))
+
+    async def _run_job(self, job: BatchJob) -> BatchResult:
+        """Build a single job, retrying with exponential backoff."""
+        started = time.perf_counter()
+        error = None
+
+        for attempt in range(1, self.retries + 2):
+            metrics = BuildMetrics(site=job.project_dir.name)
+            try:
+                await self.orchestrator.abuild_website(
+                    description=job.description,
+                    website_type=job.website_type,
+                    style=job.style,
+                    output_name=job.name,
+                    skip_review=self.skip_review,
+                    stream=self.stream,
+                    optimize=self.optimize,
+                    metrics=metrics
+                )
+                return BatchResult(
+                    job=job,
+                    status="built",
+                    attempts=attempt,
+                    elapsed=time.perf_counter() - started,
+                    timings=metrics.timings(),
+                    totals=metrics.totals()
+                )
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt <= self.retries:
+                    await asyncio.sleep(2 ** (attempt - 1))
+
+        return BatchResult(
+            job=job,
+            status="failed",
+            attempts=self.retries + 1,
+            elapsed=time.perf_counter() - started,
+            error=error
+        )
+
+
+def summarize(results: List[BatchResult], wall_time: float) -> Dict[str, Any]:
+    """Build a summary report with per-stage latency percentiles and LLM usage totals.
+
+    Args:
+        results: Results returned by BatchRunner.run
+        wall_time: Total wall time of the batch in seconds
+
+    Returns:
+        JSON-serializable report
+    """
+    counts = {"built": 0, "coalesced": 0, "skipped": 0, "failed": 0}
+    for result in results:
+        counts[result.status] += 1
+
+    built = [r for r in results if r.status == "built"]
+    latencies = {}
+    for stage in STAGES + ["total"]:
+        if stage == "total":
+            values = [r.elapsed for r in built]
+        else:
+            values = [r.timings[stage] for r in built if stage in r.timings]
+        if values:
+            latencies[stage] = {
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": max(values),
+            }
+
+    usage: Dict[str, int] = {}
+    for result in built:
+        for key, value in result.totals.items():
+            usage[key] = usage.get(key, 0) + value
+
+    return {
+        "jobs": len(results),
+        **counts,
+        "wall_time": wall_time,
+        "sites_per_minute": (counts["built"] + counts["coalesced"]) / wall_time * 60 if wall_time > 0 else 0.0,
+        "latency": latencies,
+        "usage": usage,
+        "coalesced_jobs": [
+            {"description": r.job.description, "name": r.job.name, "source": r.source}
+            for r in results if r.status == "coalesced"
+        ],
+        "failures": [
+            {"description": r.job.description, "name": r.job.name, "error": r.error}
+            for r in results if r.status == "failed"
+        ],
+    }
@@ -0,0 +1,167 @@
+"""Response Cache - Content-addressed on-disk cache for agent LLM responses."""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import CACHE_DIR, CACHE_MAX_BYTES, CACHE_MAX_AGE
+
+
+class ResponseCache:
+    """Stores LLM responses on disk, keyed by a hash of everything that shaped them.
+
+    Entries live in ``<directory>/<key[:2]>/<key>.json``. Reads refresh an
+    entry's modification time, which is both when it expires and how recently
+    it was used: eviction removes expired entries first and then the least
+    recently used ones until the cache fits in ``max_bytes``. Eviction scans
+    the whole directory, so it runs on the first write and then every
+    ``evict_every`` writes.
+    """
+
+    def __init__(
+        self,
+        directory: Path = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_age: float = CACHE_MAX_AGE,
+        evict_every: int = 50
+    ):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the cache entries
+            max_bytes: Maximum total size of all entries
+            max_age: Seconds an entry may go unused before it expires
+            evict_every: Number of writes between evictions
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self._writes = itertools.count()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        human_template: str,
+        inputs: Dict[str, Any]
+    ) -> str:
+        """Build the cache key for a single chain invocation.
+
+        Args:
+            model: Name of the LLM model
+            temperature: Sampling temperature
+            system_prompt: The agent's system prompt
+            human_template: The human message template
+            inputs: Values used to fill the template
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "temperature": temperature,
+                "system": system_prompt,
+                "human": human_template.format(**inputs),
+                "inputs": inputs,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry["response"]
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response, periodically evicting old entries if the cache is over budget.
+
+        Callers on an event loop should run this in a thread, as eviction
+        touches every entry.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"response": response}, f)
+        os.replace(tmp_path, path)
+
+        if next(self._writes) % self.evict_every == 0:
+            self.evict()
+
+    def _entries(self):
+        if not self.directory.exists():
+            return []
+        return list(self.directory.glob("*/*.json"))
+
+    def evict(self) -> int:
+        """Remove expired entries, then least recently used ones over the size limit.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+        live = []
+
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                live.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in live)
+        for _, size, path in sorted(live):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def clear(self) -> int:
+        """Delete every cache entry.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = self._entries()
+        for path in entries:
+            path.unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries and their total size in bytes."""
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(path.stat().st_size for path in entries),
+        }
@@ -1,16 +1,14 @@
-"""CLI interface for the Website Builder."""
+"""CLI interface for the Website Builder.
+
+Modules that pull in LangChain, the agents or the preview server are
+imported inside the commands that use them, so light commands such as
+``config`` and ``preview`` start quickly.
+"""
 
 import click
 from rich.console import Console
 from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
 from pathlib import Path
-import http.server
-import socketserver
-import webbrowser
-import threading
-
-from .orchestrator import AgentOrchestrator
 
 
 console = Console()
@@ -70,11 +68,77 @@ def cli():
     is_flag=True,
     help="Use interactive mode with prompts"
 )
-def build(description, website_type, style, output_name, skip_review, interactive):
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Stream generated HTML to disk and show token throughput"
+)
+@click.option(
+    "--parallel-design",
+    is_flag=True,
+    help="Design from the description alone, in parallel with content generation"
+)
+@click.option(
+    "--sharded",
+    is_flag=True,
+    help="Generate the page shell and each section in parallel, then stitch them"
+)
+@click.option(
+    "--review-mode",
+    type=click.Choice(["full", "patch"]),
+    default="full",
+    help="Have the reviewer rewrite the whole page or return patches"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Bypass the response cache and always call the LLM"
+)
+@click.option(
+    "--clear-cache",
+    is_flag=True,
+    help="Clear the response cache before building"
+)
+@click.option(
+    "--optimize",
+    is_flag=True,
+    help="Minify the site, split out hashed CSS/JS assets and precompress them"
+)
+@click.option(
+    "--metrics-export",
+    type=click.Choice(["prometheus", "otel"]),
+    multiple=True,
+    help="Also export build metrics as metrics.prom or OpenTelemetry spans"
+)
+@click.option(
+    "--templates",
+    type=click.Choice(["off", "save", "use"]),
+    default="off",
+    show_default=True,
+    help="Save the design and page shell to the template library, or also start from the closest similar template"
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["llm", "local"]),
+    default="llm",
+    show_default=True,
+    help="Write the page with the CoderAgent, or render the standard layout locally without an LLM"
+)
+def build(description, website_type, style, output_name, skip_review, interactive, stream,
+          parallel_design, sharded, review_mode, no_cache, clear_cache, optimize, metrics_export,
+          templates, renderer):
     """Build a new website using AI agents."""
     print_banner()
+
+    from rich.prompt import Prompt, Confirm
+    from .cache import ResponseCache
+    from .orchestrator import AgentOrchestrator
     
     try:
+        if clear_cache:
+            removed = ResponseCache().clear()
+            console.print(f"[yellow]Cleared {removed} cached responses.[/]")
+
         if interactive or not description:
             # Interactive mode
             console.print("\n[bold]Let's build your website! 🚀[/]\n")
@@ -122,13 +186,23 @@ def build(description, website_type, style, output_name, skip_review, interactiv
         ))
         console.print()
 
-        orchestrator = AgentOrchestrator()
+        orchestrator = AgentOrchestrator(
+            use_cache=not no_cache,
+            design_from_description=parallel_design,
+            sharded_code=sharded,
+            review_mode=review_mode,
+            metrics_exporters=metrics_export,
+            templates=templates,
+            renderer=renderer
+        )
         project_dir = orchestrator.build_website(
             description=description,
             website_type=website_type,
             style=style,
             output_name=output_name,
-            skip_review=skip_review
+            skip_review=skip_review,
+            stream=stream,
+            optimize=optimize
         )
 
         # Ask if user wants to preview
@@ -144,10 +218,237 @@ def build(description, website_type, style, output_name, skip_review, interactiv
         raise click.Abort()
 
 
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, file_okay=False))
+@click.option("--description", "-d", default=None, help="New website description")
+@click.option(
+    "--type", "-t", "website_type",
+    type=click.Choice(["business", "portfolio", "landing", "blog", "saas"]),
+    default=None,
+    help="New website type"
+)
+@click.option(
+    "--style", "-s",
+    type=click.Choice(["modern", "minimal", "bold", "elegant", "playful"]),
+    default=None,
+    help="New design style"
+)
+@click.option("--skip-review/--review", default=None, help="Skip or run the code review step")
+@click.option("--stream", is_flag=True, help="Stream generated HTML straight to disk")
+@click.option("--no-cache", is_flag=True, help="Bypass the response cache and always call the LLM")
+@click.option("--optimize/--no-optimize", default=None, help="Minify, split and precompress assets, or not")
+@click.option(
+    "--metrics-export",
+    type=click.Choice(["prometheus", "otel"]),
+    multiple=True,
+    help="Also export build metrics as metrics.prom or OpenTelemetry spans"
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["llm", "local"]),
+    default=None,
+    help="Write the page with the CoderAgent or render it locally (default: as before)"
+)
+@click.option(
+    "--parallel-design/--sequential-design", default=None,
+    help="Design in parallel with content generation, or after the headline (default: as before)"
+)
+@click.option("--sharded/--no-sharded", default=None, help="Generate page sections in parallel, or not (default: as before)")
+@click.option(
+    "--review-mode",
+    type=click.Choice(["full", "patch"]),
+    default=None,
+    help="Have the reviewer rewrite the whole page or return patches (default: as before)"
+)
+def rebuild(path, description, website_type, style, skip_review, stream, no_cache, optimize, metrics_export,
+            renderer, parallel_design, sharded, review_mode):
+    """Rebuild a website, rerunning only the stages whose inputs changed."""
+    print_banner()
+
+    from rich.prompt import Confirm
+    from .orchestrator import AgentOrchestrator
+
+    try:
+        orchestrator = AgentOrchestrator(use_cache=not no_cache, metrics_exporters=metrics_export)
+        project_dir = orchestrator.rebuild_website(
+            Path(path),
+            description=description,
+            website_type=website_type,
+            style=style,
+            skip_review=skip_review,
+            stream=stream,
+            optimize=optimize,
+            renderer=renderer,
+            sharded_code=sharded,
+            review_mode=review_mode,
+            design_from_description=parallel_design
+        )
+
+        if Confirm.ask("\n[cyan]Would you like to preview the website?[/]", default=True):
+            serve_website(project_dir)
+
+    except ValueError as e:
+        console.print(f"[red]Configuration Error:[/] {e}")
+        raise click.Abort()
+    except Exception as e:
+        console.print(f"[red]Error:[/] {e}")
+        raise click.Abort()
+
+
+@cli.command()
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", "-w", default=4, show_default=True, help="Number of builds to run concurrently")
+@click.option("--retries", "-r", default=2, show_default=True, help="Extra attempts for a failing build")
+@click.option("--skip-review", is_flag=True, help="Skip the code review step")
+@click.option("--stream", is_flag=True, help="Stream generated HTML straight to disk")
+@click.option("--parallel-design", is_flag=True, help="Design in parallel with content generation")
+@click.option("--sharded", is_flag=True, help="Generate page sections in parallel")
+@click.option(
+    "--review-mode",
+    type=click.Choice(["full", "patch"]),
+    default="full",
+    help="Have the reviewer rewrite the whole page or return patches"
+)
+@click.option("--no-cache", is_flag=True, help="Bypass the response cache and always call the LLM")
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Where to write the JSON summary (default: output/batch_report.json)"
+)
+@click.option("--optimize", is_flag=True, help="Minify, split and precompress each site's assets")
+@click.option(
+    "--metrics-export",
+    type=click.Choice(["prometheus", "otel"]),
+    multiple=True,
+    help="Also export each build's metrics as metrics.prom or OpenTelemetry spans"
+)
+@click.option("--no-dedupe", is_flag=True, help="Build every job, even duplicate ones")
+@click.option(
+    "--templates",
+    type=click.Choice(["off", "save", "use"]),
+    default="off",
+    show_default=True,
+    help="Save designs and page shells to the template library, or also start from the closest similar template"
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["llm", "local"]),
+    default="llm",
+    show_default=True,
+    help="Write pages with the CoderAgent, or render the standard layout locally without an LLM"
+)
+def batch(manifest, workers, retries, skip_review, stream, parallel_design, sharded, review_mode,
+          no_cache, report, optimize, metrics_export, no_dedupe, templates, renderer):
+    """Build many websites from a JSONL or CSV manifest."""
+    print_banner()
+
+    import json
+    import time
+    from rich.progress import (
+        BarColumn,
+        MofNCompleteColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TimeElapsedColumn,
+    )
+    from rich.table import Table
+    from .batch import BatchRunner, load_manifest, summarize
+    from .config import OUTPUT_DIR
+    from .orchestrator import AgentOrchestrator
+
+    try:
+        jobs = load_manifest(Path(manifest))
+        orchestrator = AgentOrchestrator(
+            use_cache=not no_cache,
+            quiet=True,
+            design_from_description=parallel_design,
+            sharded_code=sharded,
+            review_mode=review_mode,
+            metrics_exporters=metrics_export,
+            coalesce=not no_dedupe,
+            templates=templates,
+            renderer=renderer
+        )
+        runner = BatchRunner(
+            orchestrator,
+            workers=workers,
+            retries=retries,
+            skip_review=skip_review,
+            stream=stream,
+            optimize=optimize,
+            dedupe=not no_dedupe
+        )
+
+        console.print(f"[bold]Building {len(jobs)} websites with {workers} workers...[/]\n")
+        started = time.perf_counter()
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task("[cyan]🏗️ Building...", total=len(jobs))
+
+            def on_result(result):
+                label = result.job.name or result.job.description[:40]
+                if result.status == "failed":
+                    progress.console.print(f"[red]✗[/] {label}: {result.error}")
+                elif result.status == "skipped":
+                    progress.console.print(f"[dim]↷ {label} (already built)[/]")
+                elif result.status == "coalesced":
+                    progress.console.print(f"[green]✓[/] {label} [dim](duplicate of {result.source})[/]")
+                else:
+                    progress.console.print(f"[green]✓[/] {label} [dim]({result.elapsed:.1f}s)[/]")
+                progress.advance(task)
+
+            results = runner.run(jobs, on_result=on_result)
+
+        summary = summarize(results, time.perf_counter() - started)
+        report_path = Path(report) if report else OUTPUT_DIR / "batch_report.json"
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+        table = Table(title="Stage latency (seconds)")
+        table.add_column("Stage")
+        for column in ("p50", "p90", "p99", "max"):
+            table.add_column(column, justify="right")
+        for stage, values in summary["latency"].items():
+            table.add_row(stage, *(f"{values[c]:.1f}" for c in ("p50", "p90", "p99", "max")))
+
+        console.print()
+        console.print(table)
+        console.print(Panel(
+            f"[bold]Built:[/] {summary['built']}  "
+            f"[bold]Duplicates:[/] {summary['coalesced']}  "
+            f"[bold]Skipped:[/] {summary['skipped']}  "
+            f"[bold]Failed:[/] {summary['failed']}\n"
+            f"[bold]Wall time:[/] {summary['wall_time']:.1f}s "
+            f"({summary['sites_per_minute']:.1f} sites/min)\n"
+            f"[bold]Tokens:[/] {summary['usage'].get('prompt_tokens', 0):,} prompt, "
+            f"{summary['usage'].get('completion_tokens', 0):,} completion, "
+            f"{summary['usage'].get('cached_tokens', 0):,} prompt tokens cached by the provider "
+            f"({summary['usage'].get('cache_hits', 0)} response cache hits)\n"
+            f"[bold]Report:[/] {report_path}",
+            title="📦 Batch Summary",
+            border_style="green" if not summary["failed"] else "yellow"
+        ))
+
+    except ValueError as e:
+        console.print(f"[red]Configuration Error:[/] {e}")
+        raise click.Abort()
+
+
 @cli.command()
 @click.argument("path", type=click.Path(exists=True), default="output")
 @click.option("--port", "-p", default=8000, help="Port to serve on")
-def preview(path, port):
+@click.option("--live-reload", is_flag=True, help="Reload the page in the browser when index.html changes")
+def preview(path, port, live_reload):
     """Preview a generated website in the browser."""
     print_banner()
     project_path = Path(path)
@@ -155,37 +456,96 @@ def preview(path, port):
     if project_path.is_file():
         project_path = project_path.parent
     
-    serve_website(project_path, port)
+    serve_website(project_path, port, live_reload)
 
 
-def serve_website(directory: Path, port: int = 8000):
+def serve_website(directory: Path, port: int = 8000, live_reload: bool = False):
     """Serve the website locally and open in browser."""
-    import os
-    os.chdir(directory)
-    
-    handler = http.server.SimpleHTTPRequestHandler
-    
-    # Find an available port
-    while True:
-        try:
-            with socketserver.TCPServer(("", port), handler) as httpd:
-                url = f"http://localhost:{port}"
-                console.print(f"\n[green]🌐 Serving website at:[/] [link={url}]{url}[/link]")
-                console.print("[yellow]Press Ctrl+C to stop the server[/]\n")
-                
-                # Open browser in a separate thread
-                threading.Timer(1, lambda: webbrowser.open(url)).start()
-                
-                try:
-                    httpd.serve_forever()
-                except KeyboardInterrupt:
-                    console.print("\n[yellow]Server stopped.[/]")
-                    break
-        except OSError:
-            port += 1
-            if port > 9000:
-                console.print("[red]Could not find an available port.[/]")
-                break
+    import threading
+    import webbrowser
+    from .server import PreviewServer
+
+    try:
+        httpd = PreviewServer(directory, port, live_reload=live_reload)
+    except OSError as e:
+        console.print(f"[red]Could not start the preview server:[/] {e}")
+        return
+
+    url = httpd.url
+    console.print(f"\n[green]🌐 Serving website at:[/] [link={url}]{url}[/link]")
+    if live_reload:
+        console.print("[dim]Live reload is on: the page refreshes when index.html changes.[/]")
+    console.print("[yellow]Press Ctrl+C to stop the server[/]\n")
+
+    # Open browser in a separate thread
+    threading.Timer(1, lambda: webbrowser.open(url)).start()
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Server stopped.[/]")
+    finally:
+        httpd.stopping.set()
+        httpd.server_close()
+
+
+@cli.command()
+@click.option("--clear", is_flag=True, help="Delete all cached responses")
+def cache(clear):
+    """Show or clear the LLM response cache."""
+    print_banner()
+
+    from .cache import ResponseCache
+
+    response_cache = ResponseCache()
+    if clear:
+        removed = response_cache.clear()
+        console.print(f"[yellow]Cleared {removed} cached responses.[/]")
+        return
+
+    stats = response_cache.stats()
+    console.print(Panel(
+        f"[bold]Location:[/] {response_cache.directory}\n"
+        f"[bold]Entries:[/] {stats['entries']}\n"
+        f"[bold]Size:[/] {stats['bytes'] / (1024 * 1024):.1f} MB "
+        f"of {response_cache.max_bytes / (1024 * 1024):.0f} MB",
+        title="🗄️ Response Cache",
+        border_style="blue"
+    ))
+
+
+@cli.command()
+@click.option("--clear", is_flag=True, help="Delete all templates")
+def templates(clear):
+    """List or clear the template library of previous designs."""
+    print_banner()
+
+    from rich.table import Table
+    from .template_library import TemplateLibrary
+
+    library = TemplateLibrary()
+    if clear:
+        removed = library.clear()
+        console.print(f"[yellow]Removed {removed} templates.[/]")
+        return
+
+    entries = library.list()
+    if not entries:
+        console.print(f"[dim]No templates in {library.directory} yet; builds run with --templates save or use add them as they finish.[/]")
+        return
+
+    table = Table(title=f"Templates in {library.directory}")
+    for column in ("Type", "Style", "ID", "Shell", "Built from"):
+        table.add_column(column)
+    for template in entries:
+        table.add_row(
+            template.website_type,
+            template.style,
+            template.id,
+            "✓" if template.shell else "",
+            template.description[:50]
+        )
+    console.print(table)
 
 
 @cli.command()
@@ -193,13 +553,14 @@ def config():
     """Show current configuration."""
     print_banner()
     
-    from .config import OPENAI_API_KEY, OPENAI_MODEL, OUTPUT_DIR
+    from .config import LLM_BACKEND, OPENAI_API_KEY, OPENAI_MODEL, OUTPUT_DIR
     
     api_key_display = f"{OPENAI_API_KEY[:8]}..." if OPENAI_API_KEY else "[red]Not set[/]"
     
     console.print(Panel(
         f"[bold]OpenAI API Key:[/] {api_key_display}\n"
         f"[bold]Model:[/] {OPENAI_MODEL}\n"
+        f"[bold]LLM Backend:[/] {LLM_BACKEND}\n"
         f"[bold]Output Directory:[/] {OUTPUT_DIR}",
         title="⚙️ Configuration",
         border_style="blue"
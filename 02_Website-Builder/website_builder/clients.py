@@ -0,0 +1,169 @@
+"""LLM Clients - Process-wide registry of chat models and pooled HTTP clients."""
+
+import asyncio
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+
+from .config import (
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
+    LLM_BACKEND,
+    LLM_CONNECT_TIMEOUT,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE,
+    LLM_POOL_TIMEOUT,
+    LLM_TIMEOUT,
+    FAKE_LLM_LATENCY,
+    FAKE_LLM_RECORDINGS,
+    FAKE_LLM_TOKENS_PER_SECOND,
+)
+
+
+class ClientRegistry:
+    """Shares one chat model, and so one keep-alive connection pool, between agents.
+
+    The synchronous HTTP client is process-wide. Async connections belong to
+    the event loop that opened them, so each running loop gets its own async
+    client and chat model; every agent and orchestrator on that loop shares
+    it. Agents apply their own temperature per call instead of owning a model.
+
+    Models come from the configured backend, so the same agents can run
+    against a provider or an offline fake.
+    """
+
+    def __init__(
+        self,
+        backend: str = LLM_BACKEND,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_keepalive: int = LLM_MAX_KEEPALIVE,
+        pool_timeout: float = LLM_POOL_TIMEOUT,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        timeout: float = LLM_TIMEOUT
+    ):
+        """Configure the backend and connection pool limits.
+
+        Args:
+            backend: Name of a backend in BACKENDS
+            max_connections: Maximum concurrent connections (and so in-flight
+                requests) per pool; further requests wait for a free connection
+            max_keepalive: Idle connections kept open for reuse
+            pool_timeout: Seconds a request may wait for a free connection
+            connect_timeout: Seconds allowed to open a connection
+            timeout: Seconds a request may wait to send or to receive each part
+                of the response; a stalled request fails and can be retried
+        """
+        self.backend = backend
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout)
+        self._lock = threading.Lock()
+        self._sync_client: Optional[httpx.Client] = None
+        self._default_model: Optional[BaseChatModel] = None
+        self._loop_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BaseChatModel]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def model_id(self) -> str:
+        """Name of the model responses come from, e.g. for cache keys."""
+        return OPENAI_MODEL if self.backend == "openai" else f"{self.backend}:{OPENAI_MODEL}"
+
+    def chat_model(self) -> BaseChatModel:
+        """Return the shared chat model for the current event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            if loop is None:
+                if self._default_model is None:
+                    self._default_model = self._create_model()
+                return self._default_model
+
+            model = self._loop_models.get(loop)
+            if model is None:
+                model = self._loop_models[loop] = self._create_model()
+            return model
+
+    def sync_client(self) -> httpx.Client:
+        """Return the process-wide synchronous HTTP client."""
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+        return self._sync_client
+
+    def async_client(self) -> httpx.AsyncClient:
+        """Return a new async HTTP client for the current event loop."""
+        return httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+
+    def _create_model(self) -> BaseChatModel:
+        factory = BACKENDS.get(self.backend)
+        if factory is None:
+            raise ValueError(
+                f"Unknown LLM backend '{self.backend}'. Choose from: {', '.join(sorted(BACKENDS))}"
+            )
+        return factory(self)
+
+    async def aclose(self) -> None:
+        """Close the async connections opened on the current event loop."""
+        with self._lock:
+            model = self._loop_models.pop(asyncio.get_running_loop(), None)
+        client = getattr(model, "http_async_client", None)
+        if client is not None:
+            await client.aclose()
+
+
+def _openai_model(registry: ClientRegistry) -> BaseChatModel:
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        api_key=OPENAI_API_KEY,
+        model=OPENAI_MODEL,
+        stream_usage=True,
+        # Retries are handled by the scheduler, which also adapts to rate limits
+        max_retries=0,
+        # Given explicitly, since the SDK would otherwise replace the pooled clients' timeout
+        timeout=registry.timeout,
+        http_client=registry.sync_client(),
+        http_async_client=registry.async_client()
+    )
+
+
+def _fake_model(registry: ClientRegistry) -> BaseChatModel:
+    from .fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        recordings_dir=FAKE_LLM_RECORDINGS,
+        latency=FAKE_LLM_LATENCY,
+        tokens_per_second=FAKE_LLM_TOKENS_PER_SECOND,
+        model_name=OPENAI_MODEL
+    )
+
+
+# Chat model factories by backend name; called once per event loop
+BACKENDS: Dict[str, Callable[[ClientRegistry], BaseChatModel]] = {
+    "openai": _openai_model,
+    "fake": _fake_model,
+}
+
+
+# Process-wide registry used by all agents
+registry = ClientRegistry()
+
+
+def get_chat_model(temperature: float):
+    """Return the shared chat model with a per-call temperature applied.
+
+    Args:
+        temperature: Sampling temperature for requests made through the result
+
+    Returns:
+        A runnable that sends requests over the shared connection pool
+    """
+    return registry.chat_model().bind(temperature=temperature)
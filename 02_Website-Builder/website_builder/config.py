@@ -13,17 +13,44 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
-OUTPUT_DIR = PROJECT_ROOT / "output"
-TEMPLATES_DIR = PROJECT_ROOT / "templates"
+OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", PROJECT_ROOT / "output"))
+TEMPLATES_DIR = Path(os.getenv("TEMPLATES_DIR", PROJECT_ROOT / "templates"))
 
-# Ensure directories exist
-OUTPUT_DIR.mkdir(exist_ok=True)
-TEMPLATES_DIR.mkdir(exist_ok=True)
+# Response cache
+CACHE_DIR = Path(os.getenv("CACHE_DIR", PROJECT_ROOT / ".cache"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_MAX_AGE = int(os.getenv("CACHE_MAX_AGE_DAYS", "30")) * 24 * 60 * 60
+
+# Shared HTTP connection pool for LLM requests
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "600"))
+
+# Rate limits and retries for LLM requests
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+
+# Minimum similarity (0-1) of two descriptions built only once; the default 1 merges
+# exact duplicates only, lower values also merge near-duplicates with the same names and numbers
+DEDUPE_SIMILARITY = float(os.getenv("DEDUPE_SIMILARITY", "1"))
+
+# Minimum similarity (0-1) of a new build's description to a template's for the build to start from it
+TEMPLATE_MIN_SIMILARITY = float(os.getenv("TEMPLATE_MIN_SIMILARITY", "0.25"))
+
+# LLM backend: "openai", or "fake" to replay recorded responses offline
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+FAKE_LLM_RECORDINGS = Path(os.getenv("FAKE_LLM_RECORDINGS", Path(__file__).parent / "recordings"))
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0"))
 
 
 def validate_config() -> bool:
     """Validate that required configuration is present."""
-    if not OPENAI_API_KEY:
+    if LLM_BACKEND == "openai" and not OPENAI_API_KEY:
         raise ValueError(
             "OPENAI_API_KEY is not set. "
             "Please set it in your .env file or environment variables."
@@ -0,0 +1,198 @@
+"""Request Dedupe - Fingerprints build requests to find exact and near-duplicates."""
+
+import hashlib
+import random
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Generic, List, Optional, Tuple, TypeVar
+
+from .config import DEDUPE_SIMILARITY
+from .manifest import fingerprint
+
+
+T = TypeVar("T")
+
+# Filler words that do not change what gets built
+FILLER_WORDS = {
+    "a", "an", "the", "and", "that", "which", "please", "create", "build", "make", "me", "us", "my", "our",
+}
+
+SHINGLE_SIZE = 4
+
+# MinHash signature of BANDS x ROWS values; descriptions sharing all rows of
+# any band are compared exactly. Pairs above about 0.5 similarity are found.
+BANDS = 16
+ROWS = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)]
+
+
+def normalize_description(description: str) -> str:
+    """Reduce a description to the words that matter, ignoring case, punctuation and fillers.
+
+    Args:
+        description: Website description as written in a request
+
+    Returns:
+        Lowercase words separated by single spaces
+    """
+    text = unicodedata.normalize("NFKC", description).casefold().replace("&", " and ")
+    words = re.sub(r"[\W_]+", " ", text).split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def identifiers(description: str) -> FrozenSet[str]:
+    """Return the names, numbers and addresses in a description.
+
+    Two requests differing in any of them are for different customers, however
+    similar the rest of the text is.
+    """
+    found = set()
+    for word in unicodedata.normalize("NFKC", description).split():
+        word = word.strip(".,;:!?\"'()[]")
+        if not word or word.casefold() in FILLER_WORDS:
+            continue
+        # Capitalized names and places, phone numbers, addresses, prices, emails and URLs
+        if word[0].isupper() or any(c.isdigit() for c in word) or "@" in word or "/" in word or "www." in word:
+            found.add(word.casefold())
+    return frozenset(found)
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Return the overlapping character n-grams of text."""
+    if len(text) <= SHINGLE_SIZE:
+        return frozenset([text])
+    return frozenset(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+
+
+def minhash(items: FrozenSet[str]) -> Tuple[int, ...]:
+    """Return the MinHash signature of a set of shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        for item in items
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class RequestSignature:
+    """Normalized identity of a build request.
+
+    ``scope`` holds everything that must match exactly (website type, style
+    and build options), as do ``identifiers``; the rest of the descriptions
+    within a scope may differ slightly.
+    """
+
+    scope: str
+    normalized: str
+    key: str
+    identifiers: FrozenSet[str]
+    shingles: FrozenSet[str]
+    minhash: Tuple[int, ...]
+
+    def similarity(self, other: "RequestSignature") -> float:
+        """Jaccard similarity of the two descriptions, or 0 across scopes or identifiers."""
+        if self.scope != other.scope:
+            return 0.0
+        if self.key == other.key:
+            return 1.0
+        if self.identifiers != other.identifiers:
+            return 0.0
+        return jaccard(self.shingles, other.shingles)
+
+
+def request_signature(
+    description: str,
+    website_type: str = "business",
+    style: str = "modern",
+    **options: Any
+) -> RequestSignature:
+    """Fingerprint a build request.
+
+    Args:
+        description: Website description
+        website_type: Type of website
+        style: Design style
+        **options: Build options that change the output, e.g. skip_review
+
+    Returns:
+        The request's signature; equal keys mean exact duplicates
+    """
+    normalized = normalize_description(description)
+    scope = fingerprint([website_type.strip().casefold(), style.strip().casefold(), options])
+    items = shingles(normalized)
+    return RequestSignature(
+        scope=scope,
+        normalized=normalized,
+        key=fingerprint([scope, normalized]),
+        identifiers=identifiers(description),
+        shingles=items,
+        minhash=minhash(items)
+    )
+
+
+class DuplicateIndex(Generic[T]):
+    """Finds the entry whose request duplicates a new one.
+
+    Exact duplicates are looked up by key. Near-duplicates are only matched
+    when the threshold is below 1: they are found by locality sensitive
+    hashing on the MinHash bands, then confirmed by their exact similarity,
+    and never differ in names or numbers.
+    """
+
+    def __init__(self, threshold: float = DEDUPE_SIMILARITY):
+        """Initialize the index.
+
+        Args:
+            threshold: Minimum description similarity (0-1) of a near-duplicate;
+                1 matches exact duplicates only
+        """
+        self.threshold = threshold
+        self._exact: Dict[str, List[Tuple[RequestSignature, T]]] = {}
+        self._bands: Dict[Tuple[int, str, Tuple[int, ...]], List[Tuple[RequestSignature, T]]] = {}
+
+    def _band_keys(self, signature: RequestSignature):
+        for band in range(BANDS):
+            yield band, signature.scope, signature.minhash[band * ROWS:(band + 1) * ROWS]
+
+    def find(self, signature: RequestSignature) -> Optional[Tuple[T, float]]:
+        """Return the value of the most similar duplicate of a request and the similarity, if any."""
+        exact = self._exact.get(signature.key)
+        if exact:
+            return exact[0][1], 1.0
+        if self.threshold >= 1:
+            return None
+
+        best = None
+        for band_key in self._band_keys(signature):
+            for candidate, value in self._bands.get(band_key, ()):
+                similarity = signature.similarity(candidate)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (value, similarity)
+        return best
+
+    def add(self, signature: RequestSignature, value: T) -> None:
+        entry = (signature, value)
+        self._exact.setdefault(signature.key, []).append(entry)
+        for band_key in self._band_keys(signature):
+            self._bands.setdefault(band_key, []).append(entry)
+
+    def remove(self, signature: RequestSignature, value: T) -> None:
+        """Remove an entry added with the same signature and value."""
+        entry = (signature, value)
+        buckets = [(self._exact, signature.key)]
+        buckets += [(self._bands, band_key) for band_key in self._band_keys(signature)]
+        for bucket, key in buckets:
+            entries = bucket.get(key, [])
+            if entry in entries:
+                entries.remove(entry)
+                if not entries:
+                    del bucket[key]
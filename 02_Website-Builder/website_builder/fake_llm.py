@@ -0,0 +1,225 @@
+"""Fake LLM - Deterministic offline chat model that replays recorded responses."""
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Pattern, Set, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+CHARS_PER_TOKEN = 4
+
+# Providers cache prompt prefixes of at least 1024 tokens, in 128-token steps
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+# Seconds between streamed chunks; tokens are grouped so sleeps stay this coarse
+STREAM_INTERVAL = 0.02
+
+
+@dataclass(frozen=True)
+class Recording:
+    """A recorded response and the prompts it answers."""
+
+    name: str
+    pattern: Pattern
+    response: str
+
+    def render(self, match: "re.Match") -> str:
+        """Fill {group} placeholders in the response from the pattern's named groups."""
+        text = self.response
+        for key, value in match.groupdict().items():
+            text = text.replace("{" + key + "}", value or "")
+        return text
+
+
+@lru_cache(maxsize=None)
+def load_recordings(directory: Path) -> Tuple[Recording, ...]:
+    """Load the recordings of a directory.
+
+    ``rules.json`` lists rules in priority order. Each has a ``name``, a
+    regular expression ``match`` searched for in the whole prompt (system
+    and human messages), and either an inline ``response`` or a ``file``
+    in the directory holding it.
+
+    Args:
+        directory: Directory containing rules.json
+
+    Returns:
+        Recordings in priority order
+    """
+    directory = Path(directory)
+    with open(directory / "rules.json", encoding="utf-8") as f:
+        rules = json.load(f)
+
+    recordings = []
+    for rule in rules:
+        response = rule.get("response")
+        if response is None:
+            response = (directory / rule["file"]).read_text(encoding="utf-8")
+        recordings.append(Recording(rule["name"], re.compile(rule["match"], re.DOTALL), response))
+    return tuple(recordings)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the token count of text."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers from recordings instead of calling a provider.
+
+    The same prompt always gets the same response, after a configurable
+    time to first token and at a configurable token rate, with usage
+    metadata like a real provider's. Prompt prefixes are remembered so
+    repeated prefixes are reported as cached tokens, as with provider
+    prompt caching.
+    """
+
+    recordings_dir: Path
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    model_name: str = "fake"
+
+    _prefixes: Set[bytes] = PrivateAttr(default_factory=set)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-recordings"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "recordings_dir": str(self.recordings_dir),
+            "latency": self.latency,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def respond(self, messages: List[BaseMessage]) -> Tuple[str, Dict[str, Any]]:
+        """Return the recorded response to a prompt and its usage metadata.
+
+        Raises:
+            ValueError: If no recording matches the prompt
+        """
+        prompt = "\n\n".join(str(message.content) for message in messages)
+        for recording in load_recordings(self.recordings_dir):
+            match = recording.pattern.search(prompt)
+            if match:
+                text = recording.render(match)
+                break
+        else:
+            raise ValueError(f"No recording in {self.recordings_dir} matches the prompt: {prompt[:80]!r}")
+
+        input_tokens, output_tokens = count_tokens(prompt), count_tokens(text)
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": self._cached_tokens(prompt)},
+        }
+        return text, usage
+
+    def _cached_tokens(self, prompt: str) -> int:
+        """Return the tokens of the longest prefix seen before, in cacheable blocks."""
+        block = CACHE_BLOCK_TOKENS * CHARS_PER_TOKEN
+        digest = hashlib.sha256()
+        cached = 0
+        with self._lock:
+            for end in range(block, len(prompt) + 1, block):
+                digest.update(prompt[end - block:end].encode("utf-8"))
+                prefix = digest.copy().digest()
+                if prefix in self._prefixes:
+                    cached = end
+                self._prefixes.add(prefix)
+        tokens = cached // CHARS_PER_TOKEN
+        return tokens if tokens >= CACHE_MIN_TOKENS else 0
+
+    def _generation_time(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _chunks(self, text: str) -> Iterator[Tuple[str, float]]:
+        """Split a response into stream chunks, each with its due time after the request.
+
+        Due times are absolute, so sleeping until each one does not let
+        timer overshoot accumulate over a long stream.
+        """
+        tokens = max(1, round(self.tokens_per_second * STREAM_INTERVAL))
+        size = tokens * CHARS_PER_TOKEN
+        due = self.latency
+        for start in range(0, len(text), size):
+            piece = text[start:start + size]
+            due += self._generation_time(count_tokens(piece))
+            yield piece, due
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        text, usage = self.respond(messages)
+        time.sleep(self.latency + self._generation_time(usage["output_tokens"]))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        text, usage = self.respond(messages)
+        await asyncio.sleep(self.latency + self._generation_time(usage["output_tokens"]))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        text, usage = self.respond(messages)
+        started = time.monotonic()
+        for piece, due in self._chunks(text):
+            delay = started + due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        # Like stream_usage, the final chunk carries the token counts
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        text, usage = self.respond(messages)
+        started = time.monotonic()
+        for piece, due in self._chunks(text):
+            delay = started + due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
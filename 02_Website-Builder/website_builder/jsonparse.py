@@ -0,0 +1,245 @@
+"""JSON Parsing - Incremental parsing and local repair of LLM JSON output."""
+
+import json
+import re
+from typing import Any, List, Optional
+
+from .streaming import strip_code_fences
+
+
+# Incomplete \uXXXX escape at the end of a truncated string
+PARTIAL_UNICODE_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{0,3}$")
+
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+WORD = re.compile(r"\w+")
+CLOSING_BRACKET = re.compile(r"\s*[}\]]")
+
+
+class IncrementalJSONParser:
+    """Tracks the lexical state of a streamed JSON document.
+
+    Text before the first ``{`` or ``[`` (prose, a code fence) is skipped and
+    anything after the root value closes is ignored. At any point
+    :meth:`snapshot` turns the text received so far into a valid document by
+    dropping incomplete keys and literals and closing open strings and
+    containers, so consumers can act on fields as soon as they are complete.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        # Each open container is [bracket, state]; state is one of
+        # "key", "colon", "value" or "after" (a value was just completed)
+        self._stack: List[List[str]] = []
+        self.in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._token_start: Optional[int] = None
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """The JSON text received so far, from the root value onwards."""
+        if self._start is None:
+            return ""
+        return "".join(self._chunks)[self._start:]
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next chunk of the stream."""
+        if self.done:
+            return
+        base = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+
+        for offset, char in enumerate(chunk):
+            position = base + offset
+            if self.done:
+                break
+            if self._start is None:
+                if char in "{[":
+                    self._start = position
+                    self._stack.append([char, "key" if char == "{" else "value"])
+                continue
+
+            if self.in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self.in_string = False
+                    top = self._stack[-1]
+                    top[1] = "colon" if top[0] == "{" and top[1] == "key" else "after"
+                continue
+
+            if self._token_start is not None and (char.isspace() or char in ",}]"):
+                self._token_start = None
+                self._stack[-1][1] = "after"
+
+            if char.isspace():
+                continue
+            if char == '"':
+                self.in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._stack[-1][1] = "after"
+                self._stack.append([char, "key" if char == "{" else "value"])
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+            elif char == ":":
+                self._stack[-1][1] = "value"
+            elif char == ",":
+                self._stack[-1][1] = "key" if self._stack[-1][0] == "{" else "value"
+            elif self._token_start is None:
+                self._token_start = position
+
+    def snapshot(self) -> Optional[Any]:
+        """Return the document received so far as parsed JSON, or None if unusable."""
+        if self._start is None:
+            return None
+        full = "".join(self._chunks)
+        end = self._length
+        suffix = ""
+
+        if self.done:
+            return _loads(full[self._start:self._find_root_end(full)])
+
+        top = self._stack[-1]
+        state = top[1]
+        if self.in_string:
+            if top[0] == "{" and state == "key":
+                end = self._string_start
+            else:
+                text = full[self._string_start:end]
+                if self._escape:
+                    text = text[:-1]
+                text = PARTIAL_UNICODE_ESCAPE.sub("", text)
+                full, end = full[:self._string_start] + text, self._string_start + len(text)
+                suffix = '"'
+                state = "after"
+        elif self._token_start is not None:
+            token = full[self._token_start:end]
+            end = self._token_start
+            suffix = token if _loads(token) is not None or token == "null" else "null"
+            state = "after"
+
+        text = full[self._start:end].rstrip()
+        if not suffix and state in ("key", "value"):
+            text = text.rstrip(",").rstrip()
+            if state == "value" and top[0] == "{":
+                suffix = "null"
+        elif not suffix and state == "colon":
+            suffix = ":null"
+
+        closing = "".join("}" if bracket == "{" else "]" for bracket, _ in reversed(self._stack))
+        return _loads(text + suffix + closing)
+
+    def _find_root_end(self, full: str) -> int:
+        """Return the index just past the closed root value."""
+        depth, in_string, escape = 0, False, False
+        for position in range(self._start, len(full)):
+            char = full[position]
+            if in_string:
+                if escape:
+                    escape = False
+                elif char == "\\":
+                    escape = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    return position + 1
+        return len(full)
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        return None
+
+
+def clean_json_text(text: str) -> str:
+    """Fix common defects outside of string literals.
+
+    Removes // and /* */ comments and trailing commas, and converts the
+    Python literals True, False and None to their JSON spelling.
+    """
+    out: List[str] = []
+    i, n = 0, len(text)
+    in_string, escape = False, False
+
+    while i < n:
+        char = text[i]
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif text.startswith("/*", i):
+            close = text.find("*/", i + 2)
+            i = n if close == -1 else close + 2
+            continue
+        elif char == ",":
+            if CLOSING_BRACKET.match(text, i + 1):
+                i += 1
+                continue
+        elif char.isalpha():
+            word = WORD.match(text, i).group()
+            out.append(PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+
+        out.append(char)
+        i += 1
+
+    return "".join(out)
+
+
+def parse_json(text: str) -> Optional[Any]:
+    """Parse JSON from an LLM response, repairing it locally if needed.
+
+    Tries the response as-is, then without code fences, then with comments,
+    trailing commas and Python literals fixed, extracting the first JSON
+    value and closing anything a truncated response left open.
+
+    Args:
+        text: Raw model response
+
+    Returns:
+        The parsed value, or None if nothing usable could be recovered
+    """
+    result = _loads(text)
+    if result is not None:
+        return result
+
+    text = strip_code_fences(text)
+    result = _loads(text)
+    if result is not None:
+        return result
+
+    parser = IncrementalJSONParser()
+    parser.feed(clean_json_text(text))
+    return parser.snapshot()
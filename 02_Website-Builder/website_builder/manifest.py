@@ -0,0 +1,95 @@
+"""Stage Manifest - Records stage input hashes so unchanged stages can be skipped."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+
+BUILD_DIR_NAME = ".build"
+MANIFEST_NAME = "manifest.json"
+
+
+def fingerprint(value: Any) -> str:
+    """Return a stable hash of a JSON-serializable value."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """Return the hash of a file's contents, or None if it does not exist."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class StageManifest:
+    """Per-project record of the request and of each stage's input and output hashes.
+
+    Stored as ``.build/manifest.json`` inside the project directory::
+
+        {
+          "request": {"description": ..., "website_type": ..., "style": ..., ...},
+          "stages": {"content": {"inputs": "<sha256>", "output": "<sha256>"}, ...}
+        }
+    """
+
+    def __init__(self, project_dir: Path):
+        """Load the manifest for a project, starting empty if there is none.
+
+        Args:
+            project_dir: The generated website's directory
+        """
+        self.project_dir = Path(project_dir)
+        self.path = self.project_dir / BUILD_DIR_NAME / MANIFEST_NAME
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.request: Dict[str, Any] = data.get("request", {})
+        self.stages: Dict[str, Dict[str, str]] = data.get("stages", {})
+        # Stages that produced new output in the current build
+        self.rerun: Set[str] = set()
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def can_reuse(self, stage: str, inputs: str, output_path: Path, upstream: Iterable[str] = ()) -> bool:
+        """Whether a stage's saved output is still valid for the given inputs.
+
+        An output counts as valid when its inputs are unchanged, including
+        when the output file itself was edited by hand since it was written.
+        Projects built before manifests existed have no entry for the stage,
+        so what their outputs were made from is unknown: an existing output
+        is reused as-is only while none of the stages it depends on has
+        rerun in this build.
+
+        Args:
+            stage: Stage name
+            inputs: Fingerprint of the stage's current inputs
+            output_path: File the stage writes its output to
+            upstream: Stages whose output this stage consumes
+        """
+        if not Path(output_path).exists():
+            return False
+        entry = self.stages.get(stage)
+        if entry is None:
+            return not self.exists and self.rerun.isdisjoint(upstream)
+        return entry.get("inputs") == inputs
+
+    def record(self, stage: str, inputs: str, output_path: Path) -> None:
+        """Record the inputs and output of a completed stage."""
+        self.stages[stage] = {"inputs": inputs, "output": file_hash(output_path)}
+
+    def forget(self, stage: str) -> None:
+        """Drop a stage that is no longer part of the pipeline."""
+        self.stages.pop(stage, None)
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"request": self.request, "stages": self.stages}, f, indent=2)
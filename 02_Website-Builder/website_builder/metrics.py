@@ -0,0 +1,183 @@
+"""Metrics - Per-stage timing, token and cache instrumentation for builds."""
+
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class StageMetrics:
+    """Measurements for one pipeline stage, summed over all of its LLM calls."""
+
+    stage: str
+    started_at: float = 0.0
+    wall_time: float = 0.0
+    ttft: Optional[float] = None
+    calls: int = 0
+    cache_hits: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    def record_call(self, usage: Optional[Dict[str, Any]] = None, ttft: Optional[float] = None) -> None:
+        """Record a completed LLM call.
+
+        Args:
+            usage: LangChain usage metadata with input/output token counts
+            ttft: Seconds until the first streamed token, if the call streamed
+        """
+        self.calls += 1
+        if usage:
+            self.prompt_tokens += usage.get("input_tokens", 0)
+            self.completion_tokens += usage.get("output_tokens", 0)
+            # Prompt tokens served from the provider's prompt cache
+            self.cached_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        if ttft is not None and self.ttft is None:
+            self.ttft = ttft
+
+
+# Stage the current task is working on; agents record their calls into it
+current_stage: ContextVar[Optional[StageMetrics]] = ContextVar("current_stage", default=None)
+
+
+def stage_metrics() -> Optional[StageMetrics]:
+    """Return the metrics of the stage running in the current context, if any."""
+    return current_stage.get()
+
+
+class BuildMetrics:
+    """Collects the metrics of every stage of a single website build."""
+
+    def __init__(self, site: str = ""):
+        self.site = site
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.wall_time = 0.0
+        self.stages: Dict[str, StageMetrics] = {}
+        # Stage-specific results, such as the optimizer's byte savings
+        self.reports: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Measure a stage and make it the target of agent calls in this context."""
+        metrics = StageMetrics(stage=name, started_at=time.time())
+        self.stages[name] = metrics
+        token = current_stage.set(metrics)
+        started = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_time = time.perf_counter() - started
+            current_stage.reset(token)
+
+    def finish(self) -> None:
+        """Mark the build as complete."""
+        self.wall_time = time.perf_counter() - self._started
+
+    def timings(self) -> Dict[str, float]:
+        """Return the wall time of each stage that ran."""
+        return {name: stage.wall_time for name, stage in self.stages.items()}
+
+    def totals(self) -> Dict[str, int]:
+        """Return call, token, retry and cache counts summed over all stages."""
+        keys = ("calls", "cache_hits", "retries", "prompt_tokens", "completion_tokens", "cached_tokens")
+        return {key: sum(getattr(stage, key) for stage in self.stages.values()) for key in keys}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "site": self.site,
+            "started_at": self.started_at,
+            "wall_time": self.wall_time,
+            "totals": self.totals(),
+            "stages": {name: asdict(stage) for name, stage in self.stages.items()},
+            "reports": self.reports,
+        }
+
+    def write_json(self, path: Path) -> None:
+        """Write the metrics as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        site = self.site.replace("\\", "\\\\").replace('"', '\\"')
+        series = [
+            ("stage_seconds", "Wall time of a build stage", "wall_time"),
+            ("stage_ttft_seconds", "Time to first token of a build stage", "ttft"),
+            ("stage_llm_calls", "LLM calls made by a build stage", "calls"),
+            ("stage_cache_hits", "Response cache hits of a build stage", "cache_hits"),
+            ("stage_retries", "Retried or re-asked LLM calls of a build stage", "retries"),
+            ("stage_prompt_tokens", "Prompt tokens used by a build stage", "prompt_tokens"),
+            ("stage_completion_tokens", "Completion tokens used by a build stage", "completion_tokens"),
+            ("stage_cached_tokens", "Prompt tokens served from the provider's prompt cache", "cached_tokens"),
+        ]
+
+        lines = []
+        for name, help_text, attribute in series:
+            lines.append(f"# HELP website_builder_{name} {help_text}")
+            lines.append(f"# TYPE website_builder_{name} gauge")
+            for stage in self.stages.values():
+                value = getattr(stage, attribute)
+                if value is not None:
+                    lines.append(
+                        f'website_builder_{name}{{site="{site}",stage="{stage.stage}"}} {value}'
+                    )
+        lines.append("# HELP website_builder_build_seconds Wall time of a complete build")
+        lines.append("# TYPE website_builder_build_seconds gauge")
+        lines.append(f'website_builder_build_seconds{{site="{site}"}} {self.wall_time}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write the metrics in Prometheus text format."""
+        with open(path, "w") as f:
+            f.write(self.to_prometheus())
+
+    def export_otel(self) -> None:
+        """Emit the build and its stages as OpenTelemetry spans.
+
+        Uses the globally configured tracer provider, so spans go wherever
+        the application's OpenTelemetry SDK is set up to send them.
+
+        Raises:
+            RuntimeError: If opentelemetry-api is not installed
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise RuntimeError(
+                "OpenTelemetry export requires the opentelemetry-api package "
+                "(pip install opentelemetry-api opentelemetry-sdk)."
+            )
+
+        tracer = trace.get_tracer("website_builder")
+
+        def to_ns(seconds: float) -> int:
+            return int(seconds * 1e9)
+
+        root = tracer.start_span(
+            "build_website",
+            start_time=to_ns(self.started_at),
+            attributes={"website.site": self.site, **{f"llm.{k}": v for k, v in self.totals().items()}}
+        )
+        context = trace.set_span_in_context(root)
+        for stage in self.stages.values():
+            attributes = {
+                "llm.calls": stage.calls,
+                "llm.cache_hits": stage.cache_hits,
+                "llm.retries": stage.retries,
+                "llm.prompt_tokens": stage.prompt_tokens,
+                "llm.completion_tokens": stage.completion_tokens,
+                "llm.cached_tokens": stage.cached_tokens,
+            }
+            if stage.ttft is not None:
+                attributes["llm.ttft_seconds"] = stage.ttft
+            span = tracer.start_span(
+                stage.stage, context=context, start_time=to_ns(stage.started_at), attributes=attributes
+            )
+            span.end(end_time=to_ns(stage.started_at + stage.wall_time))
+        root.end(end_time=to_ns(self.started_at + self.wall_time))
@@ -1,37 +1,135 @@
 """Agent Orchestrator - Coordinates all AI agents to build websites."""
 
+import asyncio
 import json
+import shutil
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from .cache import ResponseCache
 from .config import OUTPUT_DIR, validate_config
+from .dedupe import DuplicateIndex, request_signature
+from .manifest import BUILD_DIR_NAME, StageManifest, file_hash, fingerprint
+from .metrics import BuildMetrics
+from .pipeline import Stage, run_stages
+from .postprocess import optimize_site, remove_optimized
+from .renderer import can_render, render_page, unsupported_sections
+from .streaming import AtomicWriter, StreamStats
+from .template_library import TemplateLibrary
 from .agents import ContentAgent, DesignerAgent, CoderAgent, ReviewerAgent
+from .agents.base import run_sync
 
 
 console = Console()
 
 
+def project_dir_for(description: str, output_name: Optional[str] = None) -> Path:
+    """Return the output directory a build of description would write to.
+    
+    Args:
+        description: Description of the website to build
+        output_name: Name for the output folder
+        
+    Returns:
+        Path to the project directory
+    """
+    if output_name:
+        return OUTPUT_DIR / output_name
+
+    # Generate name from description
+    safe_name = "".join(c if c.isalnum() else "_" for c in description[:30])
+    return OUTPUT_DIR / safe_name.strip("_").lower()
+
+
+class _NullProgress:
+    """Progress stand-in that displays nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_task(self, *args, **kwargs):
+        return None
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def remove_task(self, *args, **kwargs):
+        pass
+
+
 class AgentOrchestrator:
     """Orchestrates the website building process using multiple AI agents."""
 
-    def __init__(self):
-        """Initialize the orchestrator with all agents."""
+    def __init__(
+        self,
+        use_cache: bool = True,
+        quiet: bool = False,
+        design_from_description: bool = False,
+        sharded_code: bool = False,
+        review_mode: str = "full",
+        metrics_exporters: Optional[List[str]] = None,
+        coalesce: bool = True,
+        templates: str = "off",
+        renderer: str = "llm"
+    ):
+        """Initialize the orchestrator with all agents.
+        
+        Args:
+            use_cache: Whether to serve repeated LLM requests from the response cache
+            quiet: Suppress panels and spinners, e.g. when many builds run at once
+            design_from_description: Start the design from the description alone,
+                fully in parallel with content, instead of waiting for the hero headline
+            sharded_code: Generate the page shell and each section as parallel
+                requests instead of one monolithic document
+            review_mode: "full" to have the reviewer rewrite the whole page, or
+                "patch" to apply its search/replace edits locally
+            metrics_exporters: Extra formats for each build's metrics besides
+                metrics.json: "prometheus" (metrics.prom) and/or "otel" (spans)
+            coalesce: Let a build that duplicates one already in flight wait for
+                it and copy its output instead of generating the site again
+            templates: "save" to add each new design and page shell to the
+                template library, "use" to also start new builds from the
+                closest sufficiently similar template of the same type and
+                style, or "off" to leave the library alone
+            renderer: "llm" to have the CoderAgent write the page, or "local" to
+                render the standard section layout from templates, leaving only
+                custom layouts to the CoderAgent
+        """
         validate_config()
-        self.content_agent = ContentAgent()
-        self.designer_agent = DesignerAgent()
-        self.coder_agent = CoderAgent()
-        self.reviewer_agent = ReviewerAgent()
+        self.quiet = quiet
+        self.design_from_description = design_from_description
+        self.sharded_code = sharded_code
+        self.review_mode = review_mode
+        self.renderer = renderer
+        self.metrics_exporters = list(metrics_exporters or [])
+        self.console = Console(quiet=True) if quiet else console
+        self.cache = ResponseCache() if use_cache else None
+        self.content_agent = ContentAgent(cache=self.cache)
+        self.designer_agent = DesignerAgent(cache=self.cache)
+        self.coder_agent = CoderAgent(cache=self.cache)
+        self.reviewer_agent = ReviewerAgent(cache=self.cache)
+        self.templates = TemplateLibrary() if templates != "off" else None
+        self.use_templates = templates == "use"
+        # Builds in flight by request, each with a future resolving to its output directory
+        self._inflight: Optional[DuplicateIndex[asyncio.Future]] = DuplicateIndex() if coalesce else None
 
-    def build_website(
+    async def abuild_website(
         self,
         description: str,
         website_type: str = "business",
         style: str = "modern",
         output_name: Optional[str] = None,
-        skip_review: bool = False
+        skip_review: bool = False,
+        stream: bool = False,
+        optimize: bool = False,
+        metrics: Optional[BuildMetrics] = None
     ) -> Path:
         """Build a complete website using the AI agent pipeline.
         
@@ -41,92 +139,417 @@ class AgentOrchestrator:
             style: Design style (modern, minimal, bold, elegant)
             output_name: Name for the output folder
             skip_review: Whether to skip the review step
+            stream: Stream generated HTML straight to disk as it arrives
+            optimize: Minify the page, split out hashed assets and precompress them
+            metrics: Optional collector for the build's per-stage metrics
             
         Returns:
             Path to the generated website
         """
-        # Create output directory
-        if output_name:
-            project_dir = OUTPUT_DIR / output_name
+        project_dir = project_dir_for(description, output_name)
+        if self._inflight is None:
+            return await self._abuild(
+                project_dir, description, website_type, style, skip_review, stream, optimize, metrics,
+                self.renderer, self.sharded_code, self.review_mode, self.design_from_description, reuse=False
+            )
+
+        # Single flight: duplicate requests share one build
+        loop = asyncio.get_running_loop()
+        signature = request_signature(
+            description, website_type, style, skip_review=skip_review, optimize=optimize
+        )
+        match = self._inflight.find(signature)
+        if match is not None and match[0].get_loop() is loop:
+            leader, similarity = match
+            source = await asyncio.shield(leader)
+            return self.fan_out(source, project_dir, similarity, metrics)
+
+        leader = loop.create_future()
+        self._inflight.add(signature, leader)
+        try:
+            result = await self._abuild(
+                project_dir, description, website_type, style, skip_review, stream, optimize, metrics,
+                self.renderer, self.sharded_code, self.review_mode, self.design_from_description, reuse=False
+            )
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                e = RuntimeError("The build this request was coalesced with was cancelled")
+            leader.set_exception(e)
+            # Waiting duplicates re-raise the error; without any it must not be reported as unhandled
+            leader.exception()
+            raise
         else:
-            # Generate name from description
-            safe_name = "".join(c if c.isalnum() else "_" for c in description[:30])
-            project_dir = OUTPUT_DIR / safe_name.strip("_").lower()
-        
-        project_dir.mkdir(parents=True, exist_ok=True)
+            leader.set_result(result)
+            return result
+        finally:
+            self._inflight.remove(signature, leader)
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
+    def fan_out(
+        self,
+        source: Path,
+        project_dir: Path,
+        similarity: float = 1.0,
+        metrics: Optional[BuildMetrics] = None
+    ) -> Path:
+        """Give a duplicate request the output of the build it was coalesced with.
+        
+        Args:
+            source: Output directory of the build that ran
+            project_dir: Output directory the duplicate asked for
+            similarity: How similar the two descriptions were (1 for exact duplicates)
+            metrics: Optional collector of the duplicate's metrics
             
-            # Step 1: Generate Content
-            task = progress.add_task("[cyan]📝 Generating content...", total=None)
-            console.print(Panel(f"[bold cyan]{self.content_agent.name}[/] is writing compelling content..."))
+        Returns:
+            The duplicate's project directory
+        """
+        project_dir = Path(project_dir)
+        if project_dir.resolve() != Path(source).resolve():
+            shutil.copytree(source, project_dir, dirs_exist_ok=True)
+        if metrics is not None:
+            metrics.reports["coalesced"] = {"source": str(source), "similarity": round(similarity, 3)}
+        self.console.print(f"[dim]↷ Same request as {Path(source).name}, reusing its output[/]")
+        return project_dir
+
+    async def arebuild_website(
+        self,
+        project_dir: Path,
+        description: Optional[str] = None,
+        website_type: Optional[str] = None,
+        style: Optional[str] = None,
+        skip_review: Optional[bool] = None,
+        stream: bool = False,
+        optimize: Optional[bool] = None,
+        metrics: Optional[BuildMetrics] = None,
+        renderer: Optional[str] = None,
+        sharded_code: Optional[bool] = None,
+        review_mode: Optional[str] = None,
+        design_from_description: Optional[bool] = None
+    ) -> Path:
+        """Rebuild an existing website, rerunning only stages whose inputs changed.
+        
+        Options that are not given are taken from the previous build. Edits
+        made by hand to content.json or design.json are kept and only the
+        stages downstream of them are rerun.
+        
+        Args:
+            project_dir: Directory of the previously generated website
+            description: New description of the website
+            website_type: New type of website
+            style: New design style
+            skip_review: Whether to skip the review step
+            stream: Stream generated HTML straight to disk as it arrives
+            optimize: Whether to minify, split and precompress the page's assets
+            metrics: Optional collector for the metrics of the stages that ran
+            renderer: "llm" or "local" page rendering (see __init__)
+            sharded_code: Whether to generate sections as parallel requests
+            review_mode: "full" or "patch" review (see __init__)
+            design_from_description: Whether to design without waiting for the headline
             
-            content_result = self.content_agent.run(
-                description=description,
-                website_type=website_type
+        Returns:
+            Path to the rebuilt website
+        """
+        project_dir = Path(project_dir)
+        previous = StageManifest(project_dir).request
+
+        description = description or previous.get("description")
+        if not description:
+            raise ValueError(
+                f"{project_dir} has no build manifest; pass the website description to rebuild it."
             )
-            content = content_result["content"]
-            progress.remove_task(task)
-            console.print("[green]✓[/] Content generated successfully!")
+        return await self._abuild(
+            project_dir,
+            description,
+            website_type or previous.get("website_type", "business"),
+            style or previous.get("style", "modern"),
+            skip_review if skip_review is not None else previous.get("skip_review", False),
+            stream,
+            optimize if optimize is not None else previous.get("optimize", False),
+            metrics,
+            renderer or previous.get("renderer", self.renderer),
+            sharded_code if sharded_code is not None else previous.get("sharded_code", self.sharded_code),
+            review_mode or previous.get("review_mode", self.review_mode),
+            design_from_description if design_from_description is not None
+            else previous.get("design_from_description", self.design_from_description),
+            reuse=True
+        )
 
-            # Save content for reference
-            with open(project_dir / "content.json", "w") as f:
-                json.dump(content, f, indent=2)
+    async def _abuild(
+        self,
+        project_dir: Path,
+        description: str,
+        website_type: str,
+        style: str,
+        skip_review: bool,
+        stream: bool,
+        optimize: bool,
+        metrics: Optional[BuildMetrics],
+        renderer: str,
+        sharded_code: bool,
+        review_mode: str,
+        design_from_description: bool,
+        reuse: bool
+    ) -> Path:
+        """Run the stage graph for a project, optionally reusing unchanged stage outputs."""
+        project_dir.mkdir(parents=True, exist_ok=True)
+        (project_dir / BUILD_DIR_NAME).mkdir(exist_ok=True)
+        content_path = project_dir / "content.json"
+        design_path = project_dir / "design.json"
+        code_path = project_dir / BUILD_DIR_NAME / "code.html"
+        index_path = project_dir / "index.html"
+        # With optimization the reviewed page is kept and index.html is derived from it
+        staged_page_path = project_dir / BUILD_DIR_NAME / "page.html"
+        page_path = staged_page_path if optimize else index_path
+        if metrics is None:
+            metrics = BuildMetrics(site=project_dir.name)
 
-            # Step 2: Generate Design
-            task = progress.add_task("[magenta]🎨 Creating design...", total=None)
-            console.print(Panel(f"[bold magenta]{self.designer_agent.name}[/] is crafting the visual design..."))
-            
-            design_result = self.designer_agent.run(
-                description=description,
-                content=content,
-                style=style
-            )
-            design = design_result["design"]
-            progress.remove_task(task)
-            console.print("[green]✓[/] Design specifications created!")
+        manifest = StageManifest(project_dir)
 
-            # Save design for reference
-            with open(project_dir / "design.json", "w") as f:
-                json.dump(design, f, indent=2)
+        # A rebuild keeps the template of the previous build; a new build looks for the closest one
+        template = None
+        if reuse:
+            template_id = manifest.request.get("template")
+            if template_id:
+                template = (self.templates or TemplateLibrary()).get(template_id)
+        elif self.use_templates:
+            template = self.templates.find(website_type, style, description)
+        if template is not None:
+            metrics.reports["template"] = {"id": template.id, "shell": template.shell is not None}
+            if not reuse:
+                metrics.reports["template"]["similarity"] = round(template.similarity, 3)
+            self.console.print(f"[dim]Starting from template {template.id} ({template.description[:50]})[/]")
 
-            # Step 3: Generate Code
-            task = progress.add_task("[yellow]💻 Writing code...", total=None)
-            console.print(Panel(f"[bold yellow]{self.coder_agent.name}[/] is building the website..."))
-            
-            code_result = self.coder_agent.run(
-                content=content,
-                design=design,
-                description=description
-            )
-            html_code = code_result["html"]
-            progress.remove_task(task)
-            console.print("[green]✓[/] Website code generated!")
+        manifest.request = {
+            "description": description,
+            "website_type": website_type,
+            "style": style,
+            "skip_review": skip_review,
+            "optimize": optimize,
+            "template": template.id if template is not None else None,
+            "renderer": renderer,
+            "sharded_code": sharded_code,
+            "review_mode": review_mode,
+            "design_from_description": design_from_description,
+        }
+
+        # Turning optimization on or off moves the reviewed page rather than redoing the review
+        if reuse and optimize != ("optimize" in manifest.stages):
+            source, target = (index_path, staged_page_path) if optimize else (staged_page_path, index_path)
+            if source.exists():
+                shutil.copyfile(source, target)
+
+        def reusable(stage: str, inputs, path: Path, upstream=()):
+            """Return the stage's input fingerprint and whether its saved output is still valid."""
+            key = fingerprint(inputs)
+            if reuse and manifest.can_reuse(stage, key, path, upstream):
+                self.console.print(f"[dim]↷ {stage}: inputs unchanged, reusing {path.name}[/]")
+                return key, True
+            manifest.rerun.add(stage)
+            return key, False
+
+        with self._progress() as progress:
+            headline = asyncio.get_running_loop().create_future()
+
+            def publish_headline(text: str):
+                if not headline.done():
+                    headline.set_result(text)
+
+            # Step 1: Generate Content (publishes the hero headline early)
+            async def generate_content(_):
+                key, fresh = reusable("content", [description, website_type], content_path)
+                if fresh:
+                    with open(content_path) as f:
+                        content = json.load(f)
+                else:
+                    with self._stage(progress, metrics, "content", "[cyan]📝 Generating content...",
+                                     f"[bold cyan]{self.content_agent.name}[/] is writing compelling content...",
+                                     "Content generated successfully!"):
+                        content_result = await self.content_agent.arun(
+                            description=description,
+                            website_type=website_type,
+                            on_headline=publish_headline
+                        )
+                    content = content_result["content"]
+
+                    # Save content for reference
+                    with open(content_path, "w") as f:
+                        json.dump(content, f, indent=2)
+
+                publish_headline(content.get("hero", {}).get("headline", "N/A"))
+                manifest.record("content", key, content_path)
+                return content
+
+            async def wait_for_headline(_):
+                return await headline
+
+            # Step 2: Generate Design (only needs the headline, or nothing at all)
+            async def generate_design(deps):
+                template_id = template.id if template is not None else None
+                key, fresh = reusable(
+                    "design", [description, style, deps.get("headline"), template_id], design_path,
+                    upstream=["content"] if "headline" in deps else []
+                )
+                if fresh:
+                    with open(design_path) as f:
+                        design = json.load(f)
+                else:
+                    preview = {"hero": {"headline": deps["headline"]}} if "headline" in deps else {}
+                    with self._stage(progress, metrics, "design", "[magenta]🎨 Creating design...",
+                                     f"[bold magenta]{self.designer_agent.name}[/] is crafting the visual design...",
+                                     "Design specifications created!"):
+                        design_result = await self.designer_agent.arun(
+                            description=description,
+                            content=preview,
+                            style=style,
+                            template=template.design if template is not None else None
+                        )
+                    design = design_result["design"]
+
+                    # Save design for reference
+                    with open(design_path, "w") as f:
+                        json.dump(design, f, indent=2)
+
+                manifest.record("design", key, design_path)
+                return design
+
+            # Step 3: Generate Code (the draft before review lives in .build/)
+            async def generate_code(deps):
+                if renderer == "local":
+                    if can_render(deps["content"], deps["design"]):
+                        return render_code(deps)
+                    unknown = unsupported_sections(deps["design"])
+                    self.console.print(
+                        f"[yellow]Custom layout ({', '.join(unknown) or 'non-standard content or design'}); "
+                        "the CoderAgent will write the page.[/]"
+                    )
+
+                # The template's shell only fits its own design
+                shell = None
+                if template is not None and template.shell and deps["design"] == template.design:
+                    shell = template.shell
+                inputs = [description, deps["content"], deps["design"], sharded_code, shell]
+                key, fresh = reusable("code", inputs, code_path, upstream=["content", "design"])
+                if not fresh:
+                    label = "[yellow]💻 Writing code..."
+                    with self._stage(progress, metrics, "code", label,
+                                     f"[bold yellow]{self.coder_agent.name}[/] is building the website...",
+                                     "Website code generated!") as task:
+                        code_result = await self.coder_agent.arun(
+                            content=deps["content"],
+                            design=deps["design"],
+                            description=description,
+                            output_path=code_path if stream else None,
+                            on_progress=self._stream_progress(progress, task, label),
+                            sharded=sharded_code,
+                            shell_template=shell
+                        )
+                    if not stream:
+                        with open(code_path, "w", encoding="utf-8") as f:
+                            f.write(code_result["html"])
+
+                manifest.record("code", key, code_path)
+                return file_hash(code_path)
+
+            # Step 3 for the standard layout: render it from templates, no LLM needed
+            def render_code(deps):
+                key, fresh = reusable(
+                    "code", [deps["content"], deps["design"], "local"], code_path, upstream=["content", "design"]
+                )
+                if not fresh:
+                    with self._stage(progress, metrics, "code", "[yellow]🧩 Rendering page...",
+                                     "[bold yellow]Local Renderer[/] is laying out the standard sections...",
+                                     "Website code rendered!"):
+                        html = render_page(deps["content"], deps["design"])
+                        with AtomicWriter(code_path) as f:
+                            f.write(html)
+                    metrics.reports["renderer"] = "local"
+
+                manifest.record("code", key, code_path)
+                return file_hash(code_path)
 
             # Step 4: Review and Improve (optional)
-            if not skip_review:
-                task = progress.add_task("[blue]🔍 Reviewing & polishing...", total=None)
-                console.print(Panel(f"[bold blue]{self.reviewer_agent.name}[/] is polishing the final result..."))
-                
-                review_result = self.reviewer_agent.run(
-                    html_code=html_code,
-                    description=description
+            async def review_code(deps):
+                key, fresh = reusable(
+                    "review", [description, deps["code"], review_mode], page_path, upstream=["code"]
+                )
+                if not fresh:
+                    label = "[blue]🔍 Reviewing & polishing..."
+                    with self._stage(progress, metrics, "review", label,
+                                     f"[bold blue]{self.reviewer_agent.name}[/] is polishing the final result...",
+                                     "Code reviewed and improved!") as task:
+                        review_result = await self.reviewer_agent.arun(
+                            html_code=code_path.read_text(encoding="utf-8"),
+                            description=description,
+                            output_path=page_path if stream else None,
+                            on_progress=self._stream_progress(progress, task, label),
+                            mode=review_mode
+                        )
+                    if review_result.get("patch_error"):
+                        self.console.print(
+                            f"[yellow]Review patches did not apply ({review_result['patch_error']}); "
+                            "used a full rewrite instead.[/]"
+                        )
+                    if not stream:
+                        with open(page_path, "w", encoding="utf-8") as f:
+                            f.write(review_result["html"])
+
+                manifest.record("review", key, page_path)
+                return file_hash(page_path)
+
+            # Step 5: Optimize assets (optional)
+            async def optimize_page(deps):
+                source = code_path if skip_review else page_path
+                key, fresh = reusable(
+                    "optimize", [deps.get("review") or deps["code"]], index_path,
+                    upstream=["code" if skip_review else "review"]
                 )
-                html_code = review_result["html"]
-                progress.remove_task(task)
-                console.print("[green]✓[/] Code reviewed and improved!")
+                if not fresh:
+                    with self._stage(progress, metrics, "optimize", "[green]📦 Optimizing assets...",
+                                     "[bold green]Optimizer[/] is minifying, splitting and compressing assets...",
+                                     "Assets optimized!"):
+                        report = optimize_site(source.read_text(encoding="utf-8"), project_dir)
+                    metrics.reports["optimize"] = report.to_dict()
+                    self.console.print(f"[dim]{report.describe()}[/]")
+
+                manifest.record("optimize", key, index_path)
+
+            stages = [
+                Stage("content", generate_content),
+                Stage("headline", wait_for_headline),
+                Stage("design", generate_design, deps=[] if design_from_description else ["headline"]),
+                Stage("code", generate_code, deps=["content", "design"]),
+            ]
+            if not skip_review:
+                stages.append(Stage("review", review_code, deps=["code"]))
+            if optimize:
+                stages.append(Stage("optimize", optimize_page, deps=["code" if skip_review else "review"]))
+
+            await run_stages(stages)
+
+            # Without a review the draft is the final website
+            if skip_review:
+                if not optimize:
+                    with AtomicWriter(index_path) as f:
+                        f.write(code_path.read_text(encoding="utf-8"))
+                manifest.forget("review")
+            if not optimize:
+                remove_optimized(project_dir)
+                manifest.forget("optimize")
 
-            # Save the final website
-            index_path = project_dir / "index.html"
-            with open(index_path, "w", encoding="utf-8") as f:
-                f.write(html_code)
+        manifest.save()
 
-        console.print()
-        console.print(Panel(
+        # Designs that did not come from the library are added to it
+        if self.templates is not None and template is None:
+            with open(design_path) as f:
+                design = json.load(f)
+            final_page = code_path if skip_review else page_path
+            self.templates.save(
+                website_type, style, description, design,
+                final_page.read_text(encoding="utf-8"), source=project_dir.name
+            )
+        self._write_metrics(metrics, project_dir)
+
+        self.console.print()
+        self.console.print(Panel(
             f"[bold green]🎉 Website created successfully![/]\n\n"
             f"[white]Location:[/] {project_dir}\n"
             f"[white]Open:[/] {index_path}",
@@ -135,3 +558,52 @@ class AgentOrchestrator:
         ))
 
         return project_dir
+
+    def build_website(self, description: str, **kwargs) -> Path:
+        """Synchronous wrapper around :meth:`abuild_website`."""
+        return run_sync(self.abuild_website(description, **kwargs))
+
+    def rebuild_website(self, project_dir: Path, **kwargs) -> Path:
+        """Synchronous wrapper around :meth:`arebuild_website`."""
+        return run_sync(self.arebuild_website(project_dir, **kwargs))
+
+    def _progress(self):
+        """Return a spinner display, or a silent stand-in when running quietly."""
+        if self.quiet:
+            return _NullProgress()
+        return Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=self.console
+        )
+
+    @contextmanager
+    def _stage(self, progress, metrics: BuildMetrics, name: str, label: str, panel: str, done: str):
+        """Show a spinner while a stage runs and record its metrics."""
+        task = progress.add_task(label, total=None)
+        self.console.print(Panel(panel))
+        try:
+            with metrics.stage(name):
+                yield task
+        finally:
+            progress.remove_task(task)
+        self.console.print(f"[green]✓[/] {done}")
+
+    def _write_metrics(self, metrics: BuildMetrics, project_dir: Path):
+        """Save a build's metrics beside the site and send them to the configured exporters."""
+        metrics.finish()
+        metrics.write_json(project_dir / "metrics.json")
+        if "prometheus" in self.metrics_exporters:
+            metrics.write_prometheus(project_dir / "metrics.prom")
+        if "otel" in self.metrics_exporters:
+            try:
+                metrics.export_otel()
+            except RuntimeError as e:
+                self.console.print(f"[yellow]⚠ {e}[/]")
+
+    @staticmethod
+    def _stream_progress(progress: Progress, task, label: str):
+        """Return a callback that shows stream statistics on a progress task."""
+        def update(stats: StreamStats):
+            progress.update(task, description=f"{label} [dim]{stats.describe()}[/]")
+        return update
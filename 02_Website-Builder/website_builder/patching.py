@@ -0,0 +1,97 @@
+"""Patching - Applies search/replace edits returned by the ReviewerAgent."""
+
+import re
+from typing import List, Tuple
+
+
+EDIT_PATTERN = re.compile(
+    r"<{5,}\s*SEARCH[^\n]*\n(.*?)\n={5,}[^\n]*\n(.*?)\n?>{5,}\s*REPLACE",
+    re.DOTALL
+)
+
+LANDMARK_ID_PATTERN = re.compile(
+    r"<(?:section|header|footer|nav|main)\b[^>]*\bid\s*=\s*[\"']([^\"']+)[\"']",
+    re.IGNORECASE
+)
+
+Edit = Tuple[str, str]
+
+
+class PatchError(ValueError):
+    """Raised when edits cannot be parsed, applied or validated."""
+
+
+def parse_edits(text: str) -> List[Edit]:
+    """Parse SEARCH/REPLACE blocks from a model response.
+
+    Args:
+        text: Raw response containing blocks of the form
+            ``<<<<<<< SEARCH`` / ``=======`` / ``>>>>>>> REPLACE``
+
+    Returns:
+        List of (search, replace) pairs in response order
+
+    Raises:
+        PatchError: If the response contains no usable edits
+    """
+    edits = [(search, replace) for search, replace in EDIT_PATTERN.findall(text)]
+    if not edits:
+        if text.strip().upper() in ("NO CHANGES", "NO_CHANGES"):
+            return []
+        raise PatchError("Response contains no SEARCH/REPLACE blocks")
+    for search, _ in edits:
+        if not search.strip():
+            raise PatchError("Edit has an empty SEARCH block")
+    return edits
+
+
+def _find_unique(html: str, search: str) -> Tuple[int, int]:
+    """Locate search in html, tolerating differences in indentation."""
+    count = html.count(search)
+    if count == 1:
+        start = html.index(search)
+        return start, start + len(search)
+    if count > 1:
+        raise PatchError(f"SEARCH block matches {count} times: {search[:60]!r}")
+
+    # Match line by line, ignoring leading/trailing whitespace
+    lines = [line.strip() for line in search.strip().splitlines()]
+    pattern = r"[ \t]*" + r"[ \t]*\n[ \t]*".join(re.escape(line) for line in lines) + r"[ \t]*"
+    matches = list(re.finditer(pattern, html))
+    if len(matches) != 1:
+        found = "no" if not matches else f"{len(matches)}"
+        raise PatchError(f"SEARCH block has {found} matches: {search[:60]!r}")
+    return matches[0].span()
+
+
+def apply_edits(html: str, edits: List[Edit]) -> str:
+    """Apply edits in order; each SEARCH block must match exactly once.
+
+    Raises:
+        PatchError: If any edit does not match exactly once
+    """
+    for search, replace in edits:
+        start, end = _find_unique(html, search)
+        html = html[:start] + replace + html[end:]
+    return html
+
+
+def validate_patched(original: str, patched: str) -> None:
+    """Check that edits kept the document whole and every landmark section intact.
+
+    Raises:
+        PatchError: If the patched document lost structure the original had
+    """
+    lowered_original, lowered = original.lower(), patched.lower()
+
+    for marker in ("<!doctype html", "</html>", "</body>"):
+        if marker in lowered_original and marker not in lowered:
+            raise PatchError(f"Patched document lost {marker}")
+
+    for tag in ("<section", "<script", "<style"):
+        if lowered.count(tag) < lowered_original.count(tag):
+            raise PatchError(f"Patched document has fewer {tag}> elements")
+
+    missing = set(LANDMARK_ID_PATTERN.findall(original)) - set(LANDMARK_ID_PATTERN.findall(patched))
+    if missing:
+        raise PatchError(f"Patched document lost sections: {', '.join(sorted(missing))}")
@@ -0,0 +1,86 @@
+"""Pipeline - Runs build stages as a dependency graph."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class Stage:
+    """A unit of work that starts as soon as all of its dependencies finish."""
+
+    def __init__(self, name: str, run: StageFn, deps: Sequence[str] = ()):
+        """Initialize the stage.
+
+        Args:
+            name: Unique stage name
+            run: Coroutine function receiving a dict of dependency results
+            deps: Names of the stages whose results this stage needs
+        """
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, deps={self.deps!r})"
+
+
+def topological_order(stages: List[Stage]) -> List[Stage]:
+    """Order stages so every stage comes after its dependencies.
+
+    Raises:
+        ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    by_name = {stage.name: stage for stage in stages}
+    ordered: List[Stage] = []
+    state: Dict[str, str] = {}
+
+    def visit(stage: Stage):
+        if state.get(stage.name) == "done":
+            return
+        if state.get(stage.name) == "visiting":
+            raise ValueError(f"Pipeline has a dependency cycle at '{stage.name}'")
+        state[stage.name] = "visiting"
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+            visit(by_name[dep])
+        state[stage.name] = "done"
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+
+async def run_stages(stages: List[Stage]) -> Dict[str, Any]:
+    """Run stages concurrently, each one as soon as its inputs are ready.
+
+    If any stage fails, the stages still running are cancelled and the
+    first error is raised.
+
+    Args:
+        stages: Stages making up the pipeline
+
+    Returns:
+        Mapping of stage name to result
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_stage(stage: Stage):
+        results = await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+        return await stage.run(dict(zip(stage.deps, results)))
+
+    for stage in topological_order(stages):
+        tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,449 @@
+"""Post-processing - Minifies, splits and precompresses generated websites."""
+
+import gzip
+import hashlib
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .streaming import AtomicWriter
+
+
+ASSETS_DIR_NAME = "assets"
+
+# Files written by optimize_site, including their precompressed siblings
+OPTIMIZED_ASSET = re.compile(r"^(?:styles|app)\.[0-9a-f]{10}\.(?:css|js)(?:\.gz|\.br)?$")
+
+STYLE_BLOCK = re.compile(r"<style\b([^>]*)>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL)
+SCRIPT_BLOCK = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+RAW_BLOCK = re.compile(
+    r"(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.IGNORECASE | re.DOTALL
+)
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+BLOCK_TAG = re.compile(
+    r"\s*(</?(?:html|head|body|meta|link|title|base|div|section|header|footer|nav|main|article|"
+    r"aside|ul|ol|li|p|h[1-6]|form|fieldset|table|thead|tbody|tr|td|th|br|hr|figure|noscript)"
+    r"\b[^>]*>|<!doctype[^>]*>)\s*",
+    re.IGNORECASE
+)
+ATTRIBUTE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+FIRST_SECTION_END = re.compile(r"</section\s*>", re.IGNORECASE)
+HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+TAG_NAME = re.compile(r"<([a-zA-Z][\w-]*)")
+CLASS_ATTRIBUTE = re.compile(r"""\bclass\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+ID_ATTRIBUTE = re.compile(r"""\bid\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+SELECTOR_NOISE = re.compile(r"::?[\w-]+(?:\([^)]*\))?|\[[^\]]*\]")
+SELECTOR_PART = re.compile(r"([#.]?)(-?[_a-zA-Z][\w-]*)")
+ANIMATION_NAME = re.compile(r"animation(?:-name)?\s*:([^;}]*)")
+
+JS_TYPES = {"", "text/javascript", "application/javascript", "module"}
+
+# Tokens after which a "/" starts a regular expression rather than a division
+REGEX_PREFIX = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORD = re.compile(
+    r"\b(?:return|typeof|case|do|else|in|of|void|yield|await|delete|instanceof|new)$"
+)
+
+# Roughly what the first TCP round trip delivers; the fold when a page has no sections
+FOLD_BYTES = 14 * 1024
+
+
+def _skip_string(text: str, start: int) -> int:
+    """Return the index just past the string literal that starts at start."""
+    quote = text[start]
+    i = start + 1
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+            continue
+        if text[i] == quote:
+            return i + 1
+        if text[i] == "\n" and quote != "`":
+            return i
+        i += 1
+    return len(text)
+
+
+def minify_css(css: str) -> str:
+    """Remove comments and insignificant whitespace from a stylesheet."""
+    out: List[str] = []
+    i, n = 0, len(css)
+    space = False
+
+    while i < n:
+        char = css[i]
+        if css.startswith("/*", i):
+            close = css.find("*/", i + 2)
+            i = n if close == -1 else close + 2
+            space = True
+            continue
+        if char.isspace():
+            space = True
+            i += 1
+            continue
+
+        # Spaces are only significant between words, e.g. "0 auto" or "and ("
+        if space and out and out[-1][-1] not in "{};,>~:(" and char not in "{};,>~)":
+            out.append(" ")
+        space = False
+
+        if char in "\"'":
+            end = _skip_string(css, i)
+            out.append(css[i:end])
+            i = end
+            continue
+        if char == "}" and out and out[-1] == ";":
+            out.pop()
+        out.append(char)
+        i += 1
+
+    return "".join(out)
+
+
+def minify_js(js: str) -> str:
+    """Remove comments, indentation and blank lines from a script.
+
+    Line breaks are kept so automatic semicolon insertion still applies;
+    strings, template literals and regular expression literals are left
+    untouched.
+    """
+    out: List[str] = []
+    i, n = 0, len(js)
+
+    def preceding_code() -> str:
+        return "".join(out[-16:]).rstrip()
+
+    while i < n:
+        char = js[i]
+        if char in "\"'`":
+            end = _skip_string(js, i)
+            out.append(js[i:end])
+            i = end
+            continue
+        if js.startswith("//", i):
+            newline = js.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        if js.startswith("/*", i):
+            close = js.find("*/", i + 2)
+            i = n if close == -1 else close + 2
+            continue
+        if char == "/":
+            previous = preceding_code()
+            if not previous or previous[-1] in REGEX_PREFIX or REGEX_KEYWORD.search(previous):
+                # Regular expression literal, possibly containing "/" in a class
+                j, in_class = i + 1, False
+                while j < n and js[j] != "\n":
+                    if js[j] == "\\":
+                        j += 2
+                        continue
+                    if js[j] == "[":
+                        in_class = True
+                    elif js[j] == "]":
+                        in_class = False
+                    elif js[j] == "/" and not in_class:
+                        j += 1
+                        break
+                    j += 1
+                out.append(js[i:j])
+                i = j
+                continue
+        if char == "\n":
+            while out and out[-1] in (" ", "\t", "\r"):
+                out.pop()
+            if out and out[-1] != "\n":
+                out.append("\n")
+            i += 1
+            # Drop the next line's indentation
+            while i < n and js[i] in " \t\r":
+                i += 1
+            continue
+        if char in " \t\r" and (not out or out[-1] in (" ", "\t", "\n")):
+            i += 1
+            continue
+        out.append(char)
+        i += 1
+
+    return "".join(out).strip()
+
+
+def minify_html(html: str) -> str:
+    """Minify a page, including its inline styles and scripts.
+
+    Whitespace is collapsed to single spaces and removed around block-level
+    tags only, so spacing between inline elements renders unchanged;
+    <pre> and <textarea> contents are kept verbatim.
+    """
+    parts: List[str] = []
+    position = 0
+    for match in RAW_BLOCK.finditer(html):
+        parts.append(_minify_markup(html[position:match.start()]))
+        open_tag, tag, body, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == "style":
+            body = minify_css(body)
+        elif tag == "script" and _script_type(open_tag) in JS_TYPES:
+            body = minify_js(body)
+        parts.append(_minify_markup(open_tag) + body + close_tag)
+        position = match.end()
+    parts.append(_minify_markup(html[position:]))
+    return "".join(parts).strip()
+
+
+def _minify_markup(markup: str) -> str:
+    markup = HTML_COMMENT.sub("", markup)
+    markup = re.sub(r"\s+", " ", markup)
+    return BLOCK_TAG.sub(r"\1", markup)
+
+
+def _attributes(open_tag: str) -> Dict[str, str]:
+    return {
+        name.lower(): next((v for v in values if v), "")
+        for name, *values in ATTRIBUTE.findall(open_tag)
+    }
+
+
+def _script_type(attributes: str) -> str:
+    return _attributes(attributes).get("type", "").strip().lower()
+
+
+def _css_statements(css: str) -> List[Tuple[str, Optional[str]]]:
+    """Split minified CSS into top-level (prelude, block) pairs; block is None for @import etc."""
+    statements: List[Tuple[str, Optional[str]]] = []
+    i, n, start = 0, len(css), 0
+    depth, block_start = 0, 0
+    while i < n:
+        char = css[i]
+        if char in "\"'":
+            i = _skip_string(css, i)
+            continue
+        if char == "{":
+            if depth == 0:
+                block_start = i
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                statements.append((css[start:block_start].strip(), css[block_start + 1:i]))
+                start = i + 1
+        elif char == ";" and depth == 0:
+            statements.append((css[start:i].strip(), None))
+            start = i + 1
+        i += 1
+    return statements
+
+
+def _selector_is_used(selector: str, tags: Set[str], classes: Set[str], ids: Set[str]) -> bool:
+    for compound in re.split(r"[\s>+~]+", SELECTOR_NOISE.sub("", selector).strip()):
+        for prefix, name in SELECTOR_PART.findall(compound):
+            if prefix == "." and name not in classes:
+                return False
+            if prefix == "#" and name not in ids:
+                return False
+            if not prefix and name.lower() not in tags:
+                return False
+    return True
+
+
+def critical_css(css: str, above_fold: str) -> str:
+    """Select the rules needed to render the given top of the page.
+
+    A rule is critical when one of its selectors only uses tags, classes and
+    ids that occur in the above-the-fold markup. @font-face and @import are
+    always kept, @media/@supports blocks are filtered recursively and
+    @keyframes are kept when a critical rule animates with them.
+    """
+    tags = {tag.lower() for tag in TAG_NAME.findall(above_fold)} | {"html", "body"}
+    classes = {name for value in CLASS_ATTRIBUTE.findall(above_fold) for name in value.split()}
+    ids = set(ID_ATTRIBUTE.findall(above_fold))
+
+    def select(text: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+        kept, keyframes = [], []
+        for prelude, block in _css_statements(text):
+            lowered = prelude.lower()
+            if block is None:
+                if lowered.startswith(("@import", "@charset")):
+                    kept.append(prelude + ";")
+            elif lowered.startswith("@font-face"):
+                kept.append(f"{prelude}{{{block}}}")
+            elif lowered.startswith(("@keyframes", "@-webkit-keyframes")):
+                keyframes.append((prelude.split()[-1], f"{prelude}{{{block}}}"))
+            elif lowered.startswith(("@media", "@supports")):
+                inner, inner_keyframes = select(block)
+                if inner:
+                    kept.append(f"{prelude}{{{''.join(inner)}}}")
+                keyframes.extend(inner_keyframes)
+            elif not prelude.startswith("@"):
+                if any(_selector_is_used(s, tags, classes, ids) for s in prelude.split(",")):
+                    kept.append(f"{prelude}{{{block}}}")
+        return kept, keyframes
+
+    kept, keyframes = select(css)
+    text = "".join(kept)
+    animated = {
+        name.strip()
+        for value in ANIMATION_NAME.findall(text)
+        for name in re.split(r"[\s,]+", value)
+    }
+    return "".join(rule for name, rule in keyframes if name in animated) + text
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def precompress(path: Path) -> Dict[str, int]:
+    """Write .gz (and, if brotli is installed, .br) siblings of a file.
+
+    Returns:
+        Compressed size by encoding
+    """
+    data = Path(path).read_bytes()
+    sizes = {}
+
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    Path(f"{path}.gz").write_bytes(compressed)
+    sizes["gzip"] = len(compressed)
+
+    try:
+        import brotli
+    except ImportError:
+        return sizes
+    compressed = brotli.compress(data, quality=11)
+    Path(f"{path}.br").write_bytes(compressed)
+    sizes["br"] = len(compressed)
+    return sizes
+
+
+@dataclass
+class OptimizeReport:
+    """Byte sizes of a site before and after optimization."""
+
+    original_bytes: int = 0
+    optimized_bytes: int = 0
+    gzip_bytes: int = 0
+    brotli_bytes: Optional[int] = None
+    files: List[str] = field(default_factory=list)
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+    def describe(self) -> str:
+        """Return a one-line summary for progress output."""
+        text = (
+            f"{self.original_bytes / 1024:.1f} KB → {self.optimized_bytes / 1024:.1f} KB minified "
+            f"({-self.saved_bytes / max(self.original_bytes, 1):+.0%}), "
+            f"{self.gzip_bytes / 1024:.1f} KB gzip"
+        )
+        if self.brotli_bytes is not None:
+            text += f", {self.brotli_bytes / 1024:.1f} KB brotli"
+        return text
+
+    def to_dict(self) -> Dict[str, object]:
+        return {**asdict(self), "saved_bytes": self.saved_bytes}
+
+
+def optimize_site(html: str, project_dir: Path, output_name: str = "index.html") -> OptimizeReport:
+    """Write an optimized version of a generated page into its project directory.
+
+    Inline styles are combined into one stylesheet and inline scripts moved
+    to their own files, all minified and named after a hash of their
+    contents under ``assets/`` so they can be cached indefinitely. The CSS
+    needed to render the top of the page is inlined and the full stylesheet
+    is loaded without blocking rendering. The page and its assets get
+    precompressed .gz/.br siblings; assets from earlier builds are removed.
+
+    Args:
+        html: The page as written by the reviewer (or coder)
+        project_dir: The website's directory
+        output_name: File name of the optimized page
+
+    Returns:
+        Sizes before and after optimization
+    """
+    project_dir = Path(project_dir)
+    assets_dir = project_dir / ASSETS_DIR_NAME
+    assets_dir.mkdir(exist_ok=True)
+    report = OptimizeReport(original_bytes=len(html.encode("utf-8")))
+    assets: Dict[str, bytes] = {}
+
+    def add_asset(stem: str, suffix: str, text: str) -> str:
+        data = text.encode("utf-8")
+        name = f"{stem}.{_content_hash(data)}{suffix}"
+        assets[name] = data
+        return f"{ASSETS_DIR_NAME}/{name}"
+
+    # Scripts keep their position, so they run in the same order as before
+    def extract_script(match: re.Match) -> str:
+        attributes, body = match.groups()
+        script_type = _script_type(attributes)
+        if "src" in _attributes(attributes) or script_type not in JS_TYPES or not body.strip():
+            return match.group(0)
+        src = add_asset("app", ".js", minify_js(body))
+        type_attribute = ' type="module"' if script_type == "module" else ""
+        return f'<script src="{src}"{type_attribute}></script>'
+
+    html = SCRIPT_BLOCK.sub(extract_script, html)
+
+    styles = []
+    for match in STYLE_BLOCK.finditer(html):
+        media = _attributes(match.group(1)).get("media")
+        styles.append(f"@media {media}{{{match.group(2)}}}" if media else match.group(2))
+    html = STYLE_BLOCK.sub("", html)
+
+    if styles:
+        css = minify_css("\n".join(styles))
+        href = add_asset("styles", ".css", css)
+        fold = FIRST_SECTION_END.search(html)
+        above_fold = html[:fold.end()] if fold else html[:FOLD_BYTES]
+        head = (
+            f"<style>{critical_css(css, above_fold)}</style>"
+            f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{href}"></noscript>'
+        )
+        head_end = HEAD_END.search(html)
+        position = head_end.start() if head_end else 0
+        html = html[:position] + head + html[position:]
+
+    html = minify_html(html)
+
+    for name, data in assets.items():
+        (assets_dir / name).write_bytes(data)
+    for stale in assets_dir.iterdir():
+        name = stale.name[:-3] if stale.name.endswith((".gz", ".br")) else stale.name
+        if OPTIMIZED_ASSET.match(stale.name) and name not in assets:
+            stale.unlink()
+
+    output_path = project_dir / output_name
+    with AtomicWriter(output_path) as f:
+        f.write(html)
+
+    brotli_total = 0
+    for path in [output_path, *(assets_dir / name for name in assets)]:
+        report.files.append(str(path.relative_to(project_dir)))
+        report.optimized_bytes += path.stat().st_size
+        sizes = precompress(path)
+        report.gzip_bytes += sizes["gzip"]
+        if "br" in sizes:
+            brotli_total += sizes["br"]
+            report.brotli_bytes = brotli_total
+
+    return report
+
+
+def remove_optimized(project_dir: Path) -> None:
+    """Remove the assets and precompressed files written by :func:`optimize_site`.
+
+    Used when a site is rebuilt without optimization, so stale hashed
+    assets and .gz/.br pages are not served in place of the new page.
+    """
+    project_dir = Path(project_dir)
+    for suffix in (".gz", ".br"):
+        (project_dir / f"index.html{suffix}").unlink(missing_ok=True)
+    assets_dir = project_dir / ASSETS_DIR_NAME
+    if assets_dir.is_dir():
+        for path in assets_dir.iterdir():
+            if OPTIMIZED_ASSET.match(path.name):
+                path.unlink()
@@ -0,0 +1,156 @@
+"""Local Renderer - Renders the standard page layout from content and design without an LLM."""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+from urllib.parse import quote_plus
+
+from jinja2 import Environment, FileSystemLoader
+
+from .agents.coder import DEFAULT_SECTIONS
+from .schemas import DesignSpec, WebsiteContent, find_problems
+
+
+LAYOUTS_DIR = Path(__file__).parent / "layouts"
+
+# Navigation labels of the sections that get a menu entry
+NAV_LABELS = {
+    "features": "Features",
+    "about": "About",
+    "testimonials": "Testimonials",
+    "contact": "Contact",
+}
+
+HERO_STYLES = ("centered", "split", "full-width")
+
+# Emoji for the icon names the ContentAgent usually suggests
+ICONS = {
+    "award": "🏆", "bolt": "⚡", "book": "📚", "bread": "🍞", "briefcase": "💼", "calendar": "📅",
+    "camera": "📷", "chart": "📈", "chat": "💬", "check": "✅", "clock": "⏰",
+    "cloud": "☁️", "code": "💻", "coffee": "☕", "cog": "⚙️", "design": "🎨",
+    "dollar": "💲", "globe": "🌍", "graph": "📊", "heart": "❤️", "home": "🏠",
+    "leaf": "🌿", "lightbulb": "💡", "lightning": "⚡", "lock": "🔒", "mail": "✉️",
+    "map": "🗺️", "music": "🎵", "palette": "🎨", "phone": "📞", "rocket": "🚀",
+    "search": "🔍", "security": "🔒", "settings": "⚙️", "shield": "🛡️", "star": "⭐",
+    "support": "🤝", "target": "🎯", "team": "👥", "tools": "🛠️", "truck": "🚚",
+    "user": "👤", "users": "👥", "wheat": "🌾", "wifi": "📶",
+}
+DEFAULT_ICON = "✦"
+
+# Characters that could end a CSS declaration or the <style> block
+CSS_UNSAFE = re.compile(r"[;{}<>\\\n\r]")
+
+
+def unsupported_sections(design: Dict[str, Any]) -> List[str]:
+    """Return the sections of a design's layout the local renderer has no template for."""
+    order = design.get("layout", {}).get("sections_order") or DEFAULT_SECTIONS
+    return [section for section in order if section not in DEFAULT_SECTIONS]
+
+
+def can_render(content: Dict[str, Any], design: Dict[str, Any]) -> bool:
+    """Whether the page can be rendered locally.
+
+    Only the standard sections are supported, and content and design must
+    match their schemas; anything else is a custom layout for the CoderAgent.
+    """
+    return (
+        not unsupported_sections(design)
+        and not find_problems(content, WebsiteContent)
+        and not find_problems(design, DesignSpec)
+    )
+
+
+def css_value(value: Any) -> str:
+    """Make a design value safe to place in a CSS declaration."""
+    return CSS_UNSAFE.sub("", str(value)).strip()
+
+
+def icon(name: str) -> str:
+    """Return the emoji for a suggested icon name, or a neutral symbol."""
+    for word in re.findall(r"[a-z]+", str(name).casefold()):
+        if word in ICONS:
+            return ICONS[word]
+    return DEFAULT_ICON
+
+
+def paragraphs(text: str) -> List[str]:
+    """Split text on blank lines into paragraphs."""
+    return [part.strip() for part in re.split(r"\n\s*\n", str(text)) if part.strip()]
+
+
+def brand_name(content: Dict[str, Any]) -> str:
+    """Derive the site's name from its copyright line, falling back to the headline."""
+    copyright = content.get("footer", {}).get("copyright", "")
+    name = re.sub(r"(?i)copyright|©|\(c\)|all rights reserved\.?|\b\d{4}\b", "", copyright)
+    name = name.strip(" .,-|")
+    if not name or len(name) > 40:
+        return content.get("hero", {}).get("headline", "Home")
+    return name
+
+
+def fonts_url(fonts: Iterable[str]) -> str:
+    """Return the Google Fonts stylesheet URL for the given font families."""
+    families = "&".join(
+        f"family={quote_plus(font)}:wght@400;500;600;700"
+        for font in dict.fromkeys(font.strip() for font in fonts if font and font.strip())
+    )
+    return f"https://fonts.googleapis.com/css2?{families}&display=swap"
+
+
+@lru_cache(maxsize=1)
+def _environment() -> Environment:
+    env = Environment(
+        loader=FileSystemLoader(LAYOUTS_DIR),
+        autoescape=True,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True
+    )
+    env.filters.update(css=css_value, icon=icon, paragraphs=paragraphs)
+    return env
+
+
+def render_page(content: Dict[str, Any], design: Dict[str, Any]) -> str:
+    """Render a complete, responsive index.html from a site's content and design.
+
+    Args:
+        content: Content in the WebsiteContent schema
+        design: Design in the DesignSpec schema, whose layout only uses the
+            standard sections (see can_render)
+
+    Returns:
+        The HTML document
+
+    Raises:
+        ValueError: If the layout has sections without a template
+    """
+    unknown = unsupported_sections(design)
+    if unknown:
+        raise ValueError(f"No local template for section(s): {', '.join(unknown)}")
+
+    layout = design.get("layout", {})
+    sections = list(dict.fromkeys(layout.get("sections_order") or DEFAULT_SECTIONS))
+    typography = design.get("typography", {})
+    hero_style = str(layout.get("hero_style", "")).casefold().replace(" ", "-")
+    # The primary call to action leads to the contact form, the secondary to the first section
+    targets = [section for section in sections if section in NAV_LABELS] or ["hero"]
+
+    return _environment().get_template("page.html.j2").render(
+        content=content,
+        colors=design.get("colors", {}),
+        typography=typography,
+        spacing=design.get("spacing", {}),
+        effects=design.get("effects", {}),
+        animations=design.get("effects", {}).get("animations", []),
+        layout=layout,
+        dark=str(design.get("theme", {}).get("mode", "")).casefold() == "dark",
+        sections=sections,
+        nav_labels=NAV_LABELS,
+        brand=brand_name(content),
+        meta_description=content.get("hero", {}).get("subheadline", ""),
+        fonts_url=fonts_url([typography.get("font_heading", ""), typography.get("font_body", "")]),
+        hero_style=hero_style if hero_style in HERO_STYLES else "centered",
+        primary_target="contact" if "contact" in sections else targets[0],
+        secondary_target=targets[0] if targets[0] != "contact" else targets[-1]
+    )
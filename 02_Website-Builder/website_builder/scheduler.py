@@ -0,0 +1,341 @@
+"""LLM Scheduler - Rate limiting, retries and adaptive concurrency for all LLM calls."""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, Set, TypeVar
+
+import openai
+
+from .config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+)
+from .metrics import stage_metrics
+
+
+T = TypeVar("T")
+
+# Completion tokens assumed for a request until its real usage is known
+COMPLETION_ESTIMATE = 2000
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Roughly estimate the tokens of a request from its prompt text."""
+    return sum(len(text) for text in texts) // 4 + COMPLETION_ESTIMATE
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate.
+
+    Requests reserve their cost up front and may drive the balance negative;
+    the caller then waits until the bucket has refilled past zero, so
+    concurrent callers queue fairly instead of all retrying at once.
+    """
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60
+        self.capacity = float(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket and return the seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Return an over-estimated reservation (or charge more, if negative)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    async def acquire(self, amount: float) -> None:
+        wait = self.reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted by additive increase, multiplicative decrease.
+
+    Every successful call raises the limit by 1/limit (about one slot per
+    round of calls); a rate-limited call halves it, at most once per
+    cooldown so a burst of 429s from one window counts once. Waiters are
+    plain futures woken thread-safely, so builds on different event loops
+    share the same limit.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, cooldown: float = 2.0):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.cooldown = cooldown
+        self.limit = float(maximum)
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Waiters handed a slot whose wake-up may not have run yet
+        self._granted: Set[asyncio.Future] = set()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < int(self.limit) and not self._waiters:
+                self._active += 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                granted = waiter in self._granted
+                self._granted.discard(waiter)
+            if granted:
+                # The slot was handed over as we were cancelled; pass it on
+                self.release()
+            raise
+        with self._lock:
+            self._granted.discard(waiter)
+
+    def release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            self._wake()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_rate_limited(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._last_decrease = now
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters in arrival order; the lock must be held.
+
+        A waiter cancelled meanwhile still gets its slot and releases it
+        when it sees it was granted, so every slot is accounted for.
+        """
+        while self._waiters and self._active < int(self.limit):
+            waiter = self._waiters.popleft()
+            self._active += 1
+            self._granted.add(waiter)
+            waiter.get_loop().call_soon_threadsafe(_grant, waiter)
+
+
+def _grant(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Return the delay a provider asked for in an error response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an LLM call failed for a transient reason worth retrying."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status in RETRYABLE_STATUS or (status is not None and status >= 500)
+
+
+class LLMScheduler:
+    """Central gate for every LLM request.
+
+    Requests wait for request and token budgets from per-minute token
+    buckets and for a slot under the adaptive concurrency limit. Transient
+    failures are retried with exponential backoff and full jitter, or
+    after the provider's retry-after delay, during which every other
+    request is held back too.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        """Configure the limits.
+
+        Args:
+            requests_per_minute: Request budget; 0 disables the limit
+            tokens_per_minute: Prompt plus completion token budget; 0 disables the limit
+            max_concurrency: Upper bound for the adaptive concurrency limit
+            max_retries: Retries of a failing request before its error is raised
+            base_delay: First backoff delay in seconds
+            max_delay: Longest backoff delay in seconds
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._paused_until = 0.0
+
+    async def run(self, call: Callable[[], Awaitable[T]], estimated_tokens: int) -> T:
+        """Run an LLM call under the limits, retrying transient failures.
+
+        Args:
+            call: Function starting the request; called again for each retry
+            estimated_tokens: Expected prompt plus completion tokens
+
+        Returns:
+            The call's result
+        """
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            try:
+                result = await call()
+            except Exception as e:
+                # A failed attempt used no tokens; the retry reserves them again
+                self._refund(estimated_tokens)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.concurrency.on_success()
+                return result
+            finally:
+                self.concurrency.release()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def stream(
+        self,
+        open_stream: Callable[[], AsyncIterator[T]],
+        estimated_tokens: int
+    ) -> AsyncIterator[T]:
+        """Stream an LLM call under the limits.
+
+        A failure before the first chunk is retried like :meth:`run`; once
+        chunks have been passed on, errors are raised to the caller.
+
+        Args:
+            open_stream: Function starting the stream; called again for each retry
+            estimated_tokens: Expected prompt plus completion tokens
+
+        Yields:
+            The stream's chunks
+        """
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            started = False
+            try:
+                async for chunk in open_stream():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if not started:
+                    self._refund(estimated_tokens)
+                delay = None if started else self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.concurrency.on_success()
+                return
+            finally:
+                self.concurrency.release()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token budget once a request's real usage is known."""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def _refund(self, estimated_tokens: int) -> None:
+        if self.tokens is not None:
+            self.tokens.refund(estimated_tokens)
+
+    async def _acquire(self, estimated_tokens: int) -> None:
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+        await self.concurrency.acquire()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Return how long to wait before retrying, or None if the error is final."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if is_rate_limited(error):
+            self.concurrency.on_rate_limited()
+            requested = retry_after(error)
+            if requested is not None:
+                delay = requested + random.uniform(0, 0.1 * requested + 0.1)
+                self._paused_until = max(self._paused_until, time.monotonic() + requested)
+
+        metrics = stage_metrics()
+        if metrics is not None:
+            metrics.retries += 1
+        return delay
+
+
+# Process-wide scheduler shared by all agents
+scheduler = LLMScheduler()
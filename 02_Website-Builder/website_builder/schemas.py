@@ -0,0 +1,180 @@
+"""Schemas - Typed models for the JSON produced by the Content and Designer agents."""
+
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class Section(BaseModel):
+    """Base for all schema models; unknown extra keys from the model are kept."""
+
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+
+# Content ---------------------------------------------------------------------
+
+class Hero(Section):
+    headline: str = Field(description="Main attention-grabbing headline")
+    subheadline: str = Field(description="Supporting text that explains the value proposition")
+    cta_primary: str = Field(description="Primary button text")
+    cta_secondary: str = Field(description="Secondary button text")
+
+
+class About(Section):
+    title: str = Field(description="About section title")
+    description: str = Field(description="2-3 paragraph about section content")
+
+
+class Feature(Section):
+    title: str = Field(description="Feature title")
+    description: str = Field(description="Feature description")
+    icon: str = Field(default="", description="suggested icon name")
+
+
+class Testimonial(Section):
+    quote: str = Field(description="Testimonial quote")
+    author: str = Field(description="Person Name")
+    role: str = Field(default="", description="Job Title, Company")
+
+
+class Contact(Section):
+    title: str = Field(description="Contact section title")
+    description: str = Field(description="Invitation to get in touch")
+
+
+class Footer(Section):
+    tagline: str = Field(description="Short company tagline")
+    copyright: str = Field(description="Copyright text")
+
+
+class WebsiteContent(Section):
+    """Content generated by the ContentAgent."""
+
+    hero: Hero
+    about: About
+    features: List[Feature] = Field(min_length=1)
+    testimonials: List[Testimonial] = Field(min_length=1)
+    contact: Contact
+    footer: Footer
+
+
+# Design ----------------------------------------------------------------------
+
+class Theme(Section):
+    mode: str = Field(description="dark or light")
+    style: str = Field(description="minimal/bold/elegant/playful")
+
+
+class Colors(Section):
+    primary: str = Field(description="#hexcode")
+    secondary: str = Field(description="#hexcode")
+    accent: str = Field(description="#hexcode")
+    background: str = Field(description="#hexcode")
+    surface: str = Field(description="#hexcode")
+    text_primary: str = Field(description="#hexcode")
+    text_secondary: str = Field(description="#hexcode")
+    gradient: str = Field(description="linear-gradient(...)")
+
+
+class HeadingSizes(Section):
+    h1: str = Field(description="4rem")
+    h2: str = Field(description="2.5rem")
+    h3: str = Field(description="1.75rem")
+
+
+class Typography(Section):
+    font_heading: str = Field(description="Google Font name")
+    font_body: str = Field(description="Google Font name")
+    heading_sizes: HeadingSizes
+    body_size: str = Field(description="1rem")
+    line_height: str = Field(description="1.6")
+
+
+class Spacing(Section):
+    section_padding: str = Field(description="6rem")
+    element_gap: str = Field(description="2rem")
+    container_max_width: str = Field(description="1200px")
+
+
+class Effects(Section):
+    border_radius: str = Field(description="12px")
+    box_shadow: str = Field(description="0 10px 40px rgba(0,0,0,0.1)")
+    glass_effect: bool = Field(description="true or false")
+    animations: List[str] = Field(description="fade-in, slide-up, hover-lift")
+
+
+class Layout(Section):
+    hero_style: str = Field(description="centered/split/full-width")
+    navigation: str = Field(description="fixed/sticky")
+    sections_order: List[str] = Field(
+        min_length=1,
+        description="hero, features, about, testimonials, contact, footer"
+    )
+
+
+class DesignSpec(Section):
+    """Design specification generated by the DesignerAgent."""
+
+    theme: Theme
+    colors: Colors
+    typography: Typography
+    spacing: Spacing
+    effects: Effects
+    layout: Layout
+
+
+def find_problems(data: Any, schema: Type[BaseModel]) -> Dict[str, Dict[str, str]]:
+    """Validate data against a schema and group the problems by top-level key.
+
+    Args:
+        data: Parsed model output
+        schema: Model the output should match
+
+    Returns:
+        Mapping of top-level key to {dotted field path: error message}; empty
+        when the data is valid
+    """
+    if not isinstance(data, dict):
+        return {name: {name: "Field required"} for name in schema.model_fields}
+
+    try:
+        schema.model_validate(data)
+    except ValidationError as e:
+        problems: Dict[str, Dict[str, str]] = {}
+        for error in e.errors():
+            location = [str(part) for part in error["loc"]]
+            if location:
+                problems.setdefault(location[0], {})[".".join(location)] = error["msg"]
+        return problems
+    return {}
+
+
+def example_json(schema: Type[BaseModel], fields: List[str]) -> Dict[str, Any]:
+    """Build an example object for some of a schema's fields, like the prompt templates.
+
+    Args:
+        schema: Model to describe
+        fields: Top-level fields to include
+
+    Returns:
+        Example value with field descriptions in place of real content
+    """
+    def describe(annotation, info) -> Any:
+        origin = getattr(annotation, "__origin__", None)
+        if origin in (list, List):
+            (item,) = annotation.__args__
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                return [describe(item, None)]
+            return [info.description if info and info.description else "..."]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return {
+                name: describe(field.annotation, field)
+                for name, field in annotation.model_fields.items()
+            }
+        return info.description if info and info.description else "..."
+
+    return {
+        name: describe(schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in fields
+        if name in schema.model_fields
+    }
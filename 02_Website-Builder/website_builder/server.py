@@ -0,0 +1,223 @@
+"""Preview Server - Threaded static file server for generated websites."""
+
+import errno
+import functools
+import http.server
+import io
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from .postprocess import OPTIMIZED_ASSET
+
+
+LIVE_RELOAD_PATH = "/__livereload"
+
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVE_RELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+# Precompressed siblings in order of preference
+PRECOMPRESSED = [("br", ".br"), ("gzip", ".gz")]
+
+# Content-hashed assets never change, so browsers may keep them for a year
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    encodings = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class PreviewRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files from a directory with validators, precompression and live reload."""
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, live_reload: bool = False, **kwargs):
+        self.live_reload = live_reload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.live_reload and urlsplit(self.path).path == LIVE_RELOAD_PATH:
+            self._stream_reloads()
+        else:
+            super().do_GET()
+
+    def send_head(self):
+        """Send the headers for a file, or a 304 when the client's copy is current."""
+        url_path = urlsplit(self.path).path
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            index = path / "index.html"
+            if not url_path.endswith("/") or not index.is_file():
+                # Redirects to the trailing slash, or lists the directory
+                return super().send_head()
+            path = index
+        if not path.is_file():
+            self.send_error(404, "File not found")
+            return None
+
+        stat = path.stat()
+        content_type = self.guess_type(str(path))
+        inject = self.live_reload and content_type == "text/html"
+
+        # Injecting the reload script needs the uncompressed page
+        encoding, body_path = None, path
+        if not inject:
+            encoding, body_path = self._precompressed(path, stat.st_mtime)
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}{"-lr" if inject else ""}"'
+        cache_control = IMMUTABLE_CACHE if OPTIMIZED_ASSET.match(path.name) else REVALIDATE_CACHE
+
+        if self._not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            self._send_validators(etag, stat.st_mtime, cache_control)
+            self.end_headers()
+            return None
+
+        if inject:
+            html = path.read_bytes()
+            index = html.lower().rfind(b"</body>")
+            script = LIVE_RELOAD_SCRIPT.encode("utf-8")
+            html = html + script if index == -1 else html[:index] + script + html[index:]
+            body, length = io.BytesIO(html), len(html)
+        else:
+            body = open(body_path, "rb")
+            length = body_path.stat().st_size
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self._send_validators(etag, stat.st_mtime, cache_control)
+        self.end_headers()
+        return body
+
+    def _precompressed(self, path: Path, mtime: float) -> Tuple[Optional[str], Path]:
+        """Pick a .br or .gz sibling the client accepts and that is not older than the file."""
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            candidate = path.with_name(path.name + suffix)
+            try:
+                if candidate.stat().st_mtime >= mtime:
+                    return encoding, candidate
+            except OSError:
+                continue
+        return None, path
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_validators(self, etag: str, mtime: float, cache_control: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _stream_reloads(self) -> None:
+        """Send a server-sent event whenever index.html is replaced."""
+        index = Path(self.directory) / "index.html"
+
+        def modified() -> Optional[int]:
+            try:
+                return index.stat().st_mtime_ns
+            except OSError:
+                return None
+
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        last = modified()
+        idle = 0
+        try:
+            self.wfile.write(b": connected\n\n")
+            self.wfile.flush()
+            while not self.server.stopping.wait(0.5):
+                current = modified()
+                if current is not None and current != last:
+                    last = current
+                    self.wfile.write(b"data: reload\n\n")
+                    self.wfile.flush()
+                    idle = 0
+                else:
+                    idle += 1
+                    # Comment line so proxies and dead clients are noticed
+                    if idle % 30 == 0:
+                        self.wfile.write(b": ping\n\n")
+                        self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class PreviewServer(http.server.ThreadingHTTPServer):
+    """Serves a website directory, one thread per connection.
+
+    The directory is passed to each handler, so the process's working
+    directory is never changed. If the requested port is taken, the
+    operating system picks a free one.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, directory: Path, port: int = 8000, host: str = "", live_reload: bool = False):
+        """Bind the server.
+
+        Args:
+            directory: Website directory to serve
+            port: Preferred port; 0 picks any free port
+            host: Interface to listen on; empty for all interfaces
+            live_reload: Reload open pages when index.html changes
+        """
+        self.directory = Path(directory).resolve()
+        self.stopping = threading.Event()
+        handler = functools.partial(
+            PreviewRequestHandler, directory=str(self.directory), live_reload=live_reload
+        )
+        try:
+            super().__init__((host, port), handler)
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE or port == 0:
+                raise
+            super().__init__((host, 0), handler)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    def shutdown(self) -> None:
+        """Stop serving and end open live reload streams."""
+        self.stopping.set()
+        super().shutdown()
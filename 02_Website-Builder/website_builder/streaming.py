@@ -0,0 +1,185 @@
+"""Streaming helpers - Write LLM token streams to disk as they arrive."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import AsyncIterable, Callable, Optional
+
+
+class StreamStats:
+    """Tracks time-to-first-token and throughput of a token stream."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.tokens = 0
+        self.bytes_written = 0
+
+    def record(self, chunk: str) -> None:
+        """Record a chunk received from the model."""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+
+    def finish(self) -> None:
+        """Mark the stream as complete."""
+        self.finished_at = time.perf_counter()
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds until the first token arrived."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def tokens_per_sec(self) -> float:
+        """Tokens per second since the first token arrived."""
+        if self.first_token_at is None:
+            return 0.0
+        end = self.finished_at or time.perf_counter()
+        elapsed = end - self.first_token_at
+        return self.tokens / elapsed if elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        """Return a short human readable summary for progress output."""
+        if self.ttft is None:
+            return "waiting for first token..."
+        return f"TTFT {self.ttft:.1f}s · {self.tokens} tokens · {self.tokens_per_sec:.0f} tok/s"
+
+
+class FenceStripper:
+    """Incrementally removes a markdown code fence wrapped around streamed output.
+
+    Mirrors the non-streaming cleanup: leading/trailing whitespace is dropped,
+    and if the text opens with ``` the first line is removed along with a
+    closing ``` line at the end. Only trailing whitespace and the last
+    non-blank line are held back, so memory stays bounded by one line.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._fenced = False
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the text that is safe to emit."""
+        self._pending += chunk
+
+        if not self._started:
+            stripped = self._pending.lstrip()
+            if not stripped:
+                return ""
+            if stripped.startswith("```"):
+                newline = stripped.find("\n")
+                if newline == -1:
+                    return ""
+                self._fenced = True
+                stripped = stripped[newline + 1:]
+            elif "```".startswith(stripped):
+                # Could still become a fence; wait for more text
+                return ""
+            self._started = True
+            self._pending = stripped
+
+        # Hold back the last non-blank line; it may be a closing fence
+        body = self._pending.rstrip()
+        cut = body.rfind("\n")
+        if cut == -1:
+            return ""
+        keep = len(body[:cut].rstrip())
+        out, self._pending = self._pending[:keep], self._pending[keep:]
+        return out
+
+    def finish(self) -> str:
+        """Flush the remaining text at the end of the stream."""
+        tail = self._pending.strip() if not self._started else self._pending.rstrip()
+        if self._fenced:
+            head, sep, last = tail.rpartition("\n")
+            if last.strip() == "```":
+                tail = head if sep else ""
+        self._pending = ""
+        return tail
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove a markdown code fence wrapped around a complete response."""
+    text = text.strip()
+    if text.startswith("```"):
+        lines = text.split("\n")
+        text = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
+    return text
+
+
+class AtomicWriter:
+    """Writes to a temporary file and renames it over the target on success."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        self._tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            # mkstemp creates owner-only files; keep the target readable
+            mode = self.path.stat().st_mode if self.path.exists() else 0o644
+            os.chmod(self._tmp_path, mode & 0o777)
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
+        return False
+
+
+async def stream_to_file(
+    chunks: AsyncIterable[str],
+    path: Path,
+    on_progress: Optional[Callable[[StreamStats], None]] = None,
+    progress_interval: float = 0.1
+) -> StreamStats:
+    """Write a token stream to path, stripping code fences on the fly.
+
+    Args:
+        chunks: Text chunks produced by the model
+        path: Destination file, replaced atomically once the stream completes
+        on_progress: Optional callback receiving the running stats
+        progress_interval: Minimum seconds between progress callbacks
+
+    Returns:
+        Statistics about the completed stream
+    """
+    stats = StreamStats()
+    stripper = FenceStripper()
+    last_report = 0.0
+
+    with AtomicWriter(path) as f:
+        async for chunk in chunks:
+            stats.record(chunk)
+            text = stripper.feed(chunk)
+            if text:
+                f.write(text)
+                stats.bytes_written += len(text)
+
+            now = time.perf_counter()
+            if on_progress and now - last_report >= progress_interval:
+                on_progress(stats)
+                last_report = now
+
+        text = stripper.finish()
+        f.write(text)
+        stats.bytes_written += len(text)
+
+    stats.finish()
+    if on_progress:
+        on_progress(stats)
+    return stats
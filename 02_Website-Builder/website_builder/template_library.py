@@ -0,0 +1,203 @@
+"""Template Library - Reusable designs and page shells from previous builds."""
+
+import json
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .agents.coder import SECTIONS_MARKER
+from .config import TEMPLATE_MIN_SIMILARITY, TEMPLATES_DIR
+from .dedupe import jaccard, normalize_description, shingles
+from .manifest import fingerprint
+from .schemas import DesignSpec, find_problems
+from .streaming import AtomicWriter
+
+
+# Oldest templates of a website type and style are removed beyond this many
+MAX_TEMPLATES_PER_KIND = 20
+
+MAIN_PATTERN = re.compile(r"(<main\b[^>]*>)(.*)(</main\s*>)", re.IGNORECASE | re.DOTALL)
+FOOTER_PATTERN = re.compile(r"\s*<footer\b.*?</footer\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def extract_shell(html: str) -> Optional[str]:
+    """Turn a finished page into a shell by emptying its <main> and dropping its footer.
+
+    The head, styles, navigation and scripts are kept; SECTIONS_MARKER
+    takes the place of the sections, as in a shell the CoderAgent writes.
+
+    Args:
+        html: Complete HTML document
+
+    Returns:
+        The shell, or None if the page has no single <main> element to empty
+    """
+    lowered = html.lower()
+    if "<!doctype html" not in lowered or "</html>" not in lowered or lowered.count("<main") != 1:
+        return None
+    match = MAIN_PATTERN.search(html)
+    if match is None:
+        return None
+    shell = html[:match.start(2)] + "\n" + SECTIONS_MARKER + "\n" + html[match.end(2):]
+    return FOOTER_PATTERN.sub("", shell)
+
+
+def _kind(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.casefold()).strip("-") or "default"
+
+
+@dataclass
+class SiteTemplate:
+    """A stored design, and optionally a page shell built from it."""
+
+    id: str
+    website_type: str
+    style: str
+    description: str
+    design: Dict[str, Any]
+    shell: Optional[str]
+    path: Path
+    created: float
+    similarity: float = 0.0
+
+
+class TemplateLibrary:
+    """Stores the designs and page shells of finished builds for reuse.
+
+    Templates live in ``<directory>/<website_type>/<style>/<id>/`` with a
+    ``design.json``, a ``shell.html`` when one could be extracted, and a
+    ``template.json`` describing the site they came from. The id is a hash
+    of the type, style and design, so saving the same design again updates
+    one template.
+    """
+
+    def __init__(self, directory: Path = TEMPLATES_DIR):
+        """Initialize the library.
+
+        Args:
+            directory: Directory holding the templates
+        """
+        self.directory = Path(directory)
+
+    def _kind_dir(self, website_type: str, style: str) -> Path:
+        return self.directory / _kind(website_type) / _kind(style)
+
+    def _load(self, path: Path) -> Optional[SiteTemplate]:
+        try:
+            with open(path / "template.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(path / "design.json", encoding="utf-8") as f:
+                design = json.load(f)
+        except (OSError, ValueError):
+            return None
+        shell_path = path / "shell.html"
+        return SiteTemplate(
+            id=path.name,
+            website_type=meta.get("website_type", ""),
+            style=meta.get("style", ""),
+            description=meta.get("description", ""),
+            design=design,
+            shell=shell_path.read_text(encoding="utf-8") if shell_path.exists() else None,
+            path=path,
+            created=meta.get("created", 0.0)
+        )
+
+    def list(self, website_type: Optional[str] = None, style: Optional[str] = None) -> List[SiteTemplate]:
+        """Return the stored templates, newest first, optionally of one type and style."""
+        pattern = f"{_kind(website_type) if website_type else '*'}/{_kind(style) if style else '*'}/*"
+        templates = [self._load(path) for path in self.directory.glob(pattern) if path.is_dir()]
+        return sorted((t for t in templates if t is not None), key=lambda t: -t.created)
+
+    def get(self, template_id: str) -> Optional[SiteTemplate]:
+        """Return the template with the given id, if it still exists."""
+        for path in self.directory.glob(f"*/*/{template_id}"):
+            return self._load(path)
+        return None
+
+    def find(
+        self,
+        website_type: str,
+        style: str,
+        description: str,
+        min_similarity: float = TEMPLATE_MIN_SIMILARITY
+    ) -> Optional[SiteTemplate]:
+        """Return the closest template for a request.
+
+        Only templates of the same website type and style qualify; among
+        them the one whose description is most similar wins, then the newest.
+        A site unlike any stored one gets no template, so it is designed
+        from scratch.
+
+        Args:
+            website_type: Type of website requested
+            style: Design style requested
+            description: Description of the website requested
+            min_similarity: Lowest description similarity (0-1) a template may have
+
+        Returns:
+            The template with its similarity set, or None if none is similar enough
+        """
+        wanted = shingles(normalize_description(description))
+        best = None
+        for template in self.list(website_type, style):
+            template.similarity = jaccard(wanted, shingles(normalize_description(template.description)))
+            if template.similarity >= min_similarity and (best is None or template.similarity > best.similarity):
+                best = template
+        return best
+
+    def save(
+        self,
+        website_type: str,
+        style: str,
+        description: str,
+        design: Dict[str, Any],
+        html: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> Optional[SiteTemplate]:
+        """Store a build's design, and the shell of its page if one can be extracted.
+
+        Args:
+            website_type: Type of the website built
+            style: Design style of the website built
+            description: Description the website was built from
+            design: The build's design specification
+            html: The build's finished page
+            source: Name of the project the template came from
+
+        Returns:
+            The stored template, or None if the design is not valid
+        """
+        if find_problems(design, DesignSpec):
+            return None
+
+        template_id = fingerprint([_kind(website_type), _kind(style), design])[:12]
+        path = self._kind_dir(website_type, style) / template_id
+        path.mkdir(parents=True, exist_ok=True)
+        with AtomicWriter(path / "design.json") as f:
+            json.dump(design, f, indent=2)
+        shell = extract_shell(html) if html else None
+        if shell is not None:
+            with AtomicWriter(path / "shell.html") as f:
+                f.write(shell)
+        with AtomicWriter(path / "template.json") as f:
+            json.dump({
+                "website_type": website_type,
+                "style": style,
+                "description": description,
+                "source": source,
+                "created": time.time(),
+            }, f, indent=2)
+
+        for stale in self.list(website_type, style)[MAX_TEMPLATES_PER_KIND:]:
+            shutil.rmtree(stale.path, ignore_errors=True)
+        return self._load(path)
+
+    def clear(self) -> int:
+        """Delete every template and return how many were removed."""
+        templates = self.list()
+        for template in templates:
+            shutil.rmtree(template.path, ignore_errors=True)
+        return len(templates)
@@ -4,14 +4,16 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from openai import OpenAI
 
+from embedding_cache import CachedEmbeddings
+
 load_dotenv()
 
 client = OpenAI()
 
-# vector embedding
-embedding_model =OpenAIEmbeddings(
+# vector embedding, reusing vectors of queries asked before
+embedding_model = CachedEmbeddings(OpenAIEmbeddings(
     model="text-embedding-3-large"
-)
+))
 
 #making connections with the db
 vector_db = QdrantVectorStore.from_existing_collection(
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from html import unescape
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from langchain_core.documents import Document
+
+if TYPE_CHECKING:
+    from manifest import CrawlManifest
+
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "rag-chai-docs-crawler/1.0"
+
+#links and page metadata are pulled out with regexes, like RecursiveUrlLoader does
+LINK_PATTERN = re.compile(r"""<a\s[^>]*?href\s*=\s*["']([^"'#][^"']*)["']""", re.IGNORECASE)
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+DESCRIPTION_PATTERN = re.compile(
+    r"""<meta\s[^>]*?name\s*=\s*["']description["'][^>]*?content\s*=\s*["'](.*?)["']""", re.IGNORECASE
+)
+LANGUAGE_PATTERN = re.compile(r"""<html\s[^>]*?lang\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+#a missing page is gone; other failures may be transient
+GONE_STATUSES = (404, 410)
+
+#links to these are never pages worth indexing
+SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip",
+    ".css", ".js", ".json", ".xml", ".mp4", ".webm", ".woff", ".woff2",
+)
+
+SITEMAP_NAMESPACE = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def normalize_url(url: str, base: str = "") -> Optional[str]:
+    """Resolve a link against the page it is on and drop its fragment; None if it is not http(s)."""
+    url = urldefrag(urljoin(base, unescape(url.strip())))[0]
+    if urlsplit(url).scheme not in ("http", "https"):
+        return None
+    return url
+
+
+def page_metadata(url: str, html: str, content_type: str) -> dict:
+    """Return the metadata RecursiveUrlLoader attaches to a page."""
+    metadata = {"source": url, "content_type": content_type}
+    for key, pattern in (("title", TITLE_PATTERN), ("description", DESCRIPTION_PATTERN), ("language", LANGUAGE_PATTERN)):
+        match = pattern.search(html)
+        if match:
+            metadata[key] = unescape(" ".join(match.group(1).split()))
+    return metadata
+
+
+@dataclass
+class _Host:
+    """Politeness state of one host: how many requests may run at once and when the next may start."""
+
+    semaphore: asyncio.Semaphore
+    delay: float
+    next_request: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def wait_turn(self):
+        async with self.lock:
+            wait = self.next_request - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.next_request = time.monotonic() + self.delay
+
+
+class Crawler:
+    """Crawls a site concurrently and yields its HTML pages as documents.
+
+    Pages are fetched by a fixed number of workers over one pooled HTTP
+    client, with at most ``per_host`` requests to a host at a time and
+    ``delay`` seconds (or the robots.txt Crawl-delay) between their starts.
+    The crawl is seeded from the start URL and the sitemaps in robots.txt
+    (or /sitemap.xml), and only URLs under the start URL are followed.
+    Documents are handed over through a small queue, so a slow consumer
+    pauses the crawl instead of the site piling up in memory.
+
+    With a manifest, pages indexed before are requested conditionally; a
+    304 yields no document but its recorded links are still followed, as
+    are those of a page that fails for a reason other than being gone.
+    Each document carries its ``etag``, ``last_modified`` and ``links`` in
+    its metadata for the manifest. After a crawl, ``fetched`` holds the
+    URLs that answered (changed or not) and ``failed`` those that could not
+    be fetched for reasons other than being gone.
+    """
+
+    def __init__(
+        self,
+        start_url: str,
+        concurrency: int = 16,
+        per_host: int = 4,
+        delay: float = 0.0,
+        max_pages: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        timeout: float = 30.0,
+        user_agent: str = USER_AGENT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        manifest: Optional["CrawlManifest"] = None
+    ):
+        """
+        Args:
+            start_url: Page the crawl starts from; it also limits which URLs are followed
+            concurrency: Pages fetched at once, and the size of the connection pool
+            per_host: Pages fetched at once from one host
+            delay: Minimum seconds between request starts to one host
+            max_pages: Stop queueing pages after this many
+            max_depth: Follow links at most this many hops from the start page or sitemap
+            timeout: Seconds before a request is abandoned
+            user_agent: User-Agent header, also used for robots.txt rules
+            transport: httpx transport to use instead of the network, e.g. for tests
+            manifest: Record of the previous crawl, for conditional requests
+        """
+        self.start_url = normalize_url(start_url)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.transport = transport
+        self.manifest = manifest
+
+        self.seen: Set[str] = set()
+        self.fetched: Set[str] = set()
+        self.failed: Set[str] = set()
+        self._hosts = {}
+        self._robots = {}
+
+    def allowed(self, url: str) -> bool:
+        """Whether a URL is under the start URL, looks like a page and robots.txt permits it."""
+        if not url.startswith(self.start_url) or urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        robots = self._robots.get(urlsplit(url).netloc)
+        return robots is None or robots.can_fetch(self.user_agent, url)
+
+    def _host(self, url: str) -> _Host:
+        netloc = urlsplit(url).netloc
+        if netloc not in self._hosts:
+            robots = self._robots.get(netloc)
+            crawl_delay = robots.crawl_delay(self.user_agent) if robots else None
+            self._hosts[netloc] = _Host(asyncio.Semaphore(self.per_host), max(self.delay, float(crawl_delay or 0)))
+        return self._hosts[netloc]
+
+    async def _get(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        host = self._host(url)
+        async with host.semaphore:
+            await host.wait_turn()
+            return await self._client.get(url, headers=headers)
+
+    async def _load_robots(self) -> List[str]:
+        """Read robots.txt of the start URL's host and return the sitemaps it lists."""
+        parts = urlsplit(self.start_url)
+        robots = RobotFileParser(f"{parts.scheme}://{parts.netloc}/robots.txt")
+        try:
+            response = await self._client.get(robots.url)
+        except httpx.HTTPError as e:
+            logger.warning("Could not read %s: %s", robots.url, e)
+            return []
+        if response.status_code >= 400:
+            #like RobotFileParser.read(): no robots.txt allows everything, a forbidden one allows nothing
+            robots.disallow_all = response.status_code in (401, 403)
+            robots.allow_all = not robots.disallow_all
+        else:
+            robots.parse(response.text.splitlines())
+        self._robots[parts.netloc] = robots
+        return robots.site_maps() or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+    async def _sitemap_urls(self, sitemap_url: str, visited: Set[str]) -> List[str]:
+        """Return the page URLs of a sitemap, following sitemap indexes."""
+        if sitemap_url in visited:
+            return []
+        visited.add(sitemap_url)
+        try:
+            response = await self._get(sitemap_url)
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+        except (httpx.HTTPError, ET.ParseError) as e:
+            logger.info("No usable sitemap at %s: %s", sitemap_url, e)
+            return []
+
+        locations = [loc.text.strip() for loc in root.iter(f"{SITEMAP_NAMESPACE}loc") if loc.text]
+        if root.tag != f"{SITEMAP_NAMESPACE}sitemapindex":
+            return locations
+        nested = await asyncio.gather(*(self._sitemap_urls(url, visited) for url in locations))
+        return [url for urls in nested for url in urls]
+
+    def _enqueue(self, urls: Iterable[str], depth: int, base: str = "") -> None:
+        if self.max_depth is not None and depth > self.max_depth:
+            return
+        for url in urls:
+            url = normalize_url(url, base)
+            if url is None or url in self.seen or not self.allowed(url):
+                continue
+            if self.max_pages is not None and len(self.seen) >= self.max_pages:
+                return
+            self.seen.add(url)
+            self._frontier.put_nowait((url, depth))
+
+    async def _fetch(self, url: str) -> Tuple[Optional[Document], List[str]]:
+        """Fetch a page and return it as a document with the links on it.
+
+        Non-HTML pages give no document, and unchanged pages give none but
+        the links recorded in the manifest.
+        """
+        headers = self.manifest.conditional_headers(url) if self.manifest is not None else None
+        response = await self._get(url, headers=headers)
+        if response.status_code == 304 and headers:
+            self.fetched.add(url)
+            return None, self.manifest.get(url).links
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type:
+            return None, []
+        final_url = str(response.url)
+        self.seen.add(final_url)
+        self.fetched.add(final_url)
+        html = response.text
+        links = LINK_PATTERN.findall(html)
+        metadata = page_metadata(final_url, html, content_type)
+        metadata.update(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            links=links
+        )
+        return Document(page_content=html, metadata=metadata), links
+
+    async def _worker(self) -> None:
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                document, links = await self._fetch(url)
+                if document is not None:
+                    await self._results.put(document)
+                self._enqueue(links, depth + 1, base=document.metadata["source"] if document else url)
+            except Exception as e:
+                logger.warning("Skipping %s: %s", url, e)
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in GONE_STATUSES:
+                    continue
+                self.failed.add(url)
+                #the page is kept, so the pages reached through it are still visited
+                record = self.manifest.get(url) if self.manifest is not None else None
+                if record is not None:
+                    self._enqueue(record.links, depth + 1, base=url)
+            finally:
+                self._frontier.task_done()
+
+    async def crawl(self) -> AsyncIterator[Document]:
+        """Yield the site's pages as documents, in the order they are fetched."""
+        self._frontier = asyncio.Queue()
+        self._results = asyncio.Queue(maxsize=self.concurrency)
+        self.seen, self.fetched, self.failed = set(), set(), set()
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(
+            headers={"User-Agent": self.user_agent},
+            limits=limits,
+            timeout=self.timeout,
+            follow_redirects=True,
+            transport=self.transport
+        ) as self._client:
+            sitemaps = await self._load_robots()
+            visited = set()
+            seeds = await asyncio.gather(*(self._sitemap_urls(url, visited) for url in sitemaps))
+            self._enqueue([self.start_url], 0)
+            self._enqueue([url for urls in seeds for url in urls], 0)
+
+            async def finish():
+                await self._frontier.join()
+                await self._results.put(None)
+
+            tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+            tasks.append(asyncio.create_task(finish()))
+            try:
+                while (document := await self._results.get()) is not None:
+                    yield document
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def crawl(start_url: str, **options) -> AsyncIterator[Document]:
+    """Crawl a site and yield its pages as documents; see Crawler for the options."""
+    return Crawler(start_url, **options).crawl()
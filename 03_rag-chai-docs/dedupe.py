@@ -0,0 +1,73 @@
+import hashlib
+import random
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# chunks at least this similar (Jaccard over word 3-grams) are near-duplicates
+NEAR_DUPLICATE_SIMILARITY = 0.9
+
+SHINGLE_WORDS = 3
+
+# MinHash signature of BANDS x ROWS values; chunks sharing all rows of any band
+# are compared exactly. Pairs above about 0.75 similarity are found.
+BANDS = 8
+ROWS = 8
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0xC4A1)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)]
+
+
+def normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]+", " ", text.casefold()).split())
+
+
+def shingles(text: str) -> Set[str]:
+    words = text.split()
+    if len(words) <= SHINGLE_WORDS:
+        return {text}
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(items: Set[str]) -> Tuple[int, ...]:
+    hashes = [int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big") for item in items]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+class ChunkDeduplicator:
+    """Recognizes chunks whose text was already seen, exactly or nearly.
+
+    Exact duplicates are found by the hash of their normalized text;
+    near-duplicates by locality sensitive hashing on MinHash bands,
+    confirmed by their exact similarity. Each chunk is remembered with its
+    ID, so a duplicate can refer to the chunk it repeats.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_SIMILARITY):
+        self.threshold = threshold
+        self.exact: Dict[str, str] = {}
+        self.bands: Dict[Tuple[int, Tuple[int, ...]], List[Tuple[Set[str], str]]] = {}
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    def original(self, text: str, chunk_id: str) -> Optional[str]:
+        """Return the ID of the chunk text duplicates, or None after remembering it under chunk_id."""
+        normalized = normalize(text)
+        key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        if key in self.exact:
+            self.exact_duplicates += 1
+            return self.exact[key]
+
+        items = shingles(normalized)
+        signature = minhash(items)
+        band_keys = [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+        for band_key in band_keys:
+            for candidate, candidate_id in self.bands.get(band_key, ()):
+                if len(items & candidate) / len(items | candidate) >= self.threshold:
+                    self.near_duplicates += 1
+                    return candidate_id
+
+        self.exact[key] = chunk_id
+        for band_key in band_keys:
+            self.bands.setdefault(band_key, []).append((items, chunk_id))
+        return None
@@ -0,0 +1,115 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+
+# vectors of text embedded before, shared by indexing and chat
+EMBEDDING_CACHE_PATH = Path(__file__).parent / "embedding_cache.sqlite"
+
+# least recently used vectors are evicted beyond this many
+# (a text-embedding-3-large vector takes 12 KB)
+MAX_ENTRIES = 50_000
+
+
+class EmbeddingStore:
+    """SQLite table of float32 vectors by key, evicting the least recently used.
+
+    Safe to share between threads, and between processes thanks to WAL mode.
+    """
+
+    def __init__(self, path: Path = EMBEDDING_CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._db.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return the stored vectors of the keys that have one, marking them as used."""
+        found = {}
+        with self._lock:
+            # SQLite limits the number of parameters per statement
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            now = time.time()
+            self._db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+            self._db.commit()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """Store vectors, then evict the least recently used beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+            )
+            excess = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM embeddings")
+            self._db.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that look vectors up in an EmbeddingStore before calling the model.
+
+    Entries are keyed by model, dimensions and a hash of the text, so
+    identical chunks repeated across pages and repeated queries are embedded
+    once, and texts repeated within one call are sent to the model once.
+    """
+
+    def __init__(self, embeddings: Embeddings, store: Optional[EmbeddingStore] = None):
+        self.embeddings = embeddings
+        self.store = store or EmbeddingStore()
+        self.namespace = f"{getattr(embeddings, 'model', type(embeddings).__name__)}:{getattr(embeddings, 'dimensions', None)}"
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = self.store.get_many(list(dict.fromkeys(keys)))
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            new = dict(zip(missing, self.embeddings.embed_documents(list(missing.values()))))
+            self.store.put_many(new)
+            vectors.update(new)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self.store.get_many([key]).get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = self.embeddings.embed_query(text)
+        self.store.put_many({key: vector})
+        return vector
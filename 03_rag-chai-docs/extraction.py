@@ -0,0 +1,170 @@
+import hashlib
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import List
+
+
+# everything inside these is site chrome or not text at all
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "canvas", "head",
+    "nav", "header", "footer", "aside", "form", "button", "select",
+}
+CHROME_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search"}
+CHROME_CLASSES = re.compile(r"(^|[\s_-])(sidebar|navbar|breadcrumbs?|pagination|toc|skip-link)($|[\s_-])", re.IGNORECASE)
+
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd", "table", "tr",
+    "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "br", "hr", "figure", "figcaption", "details", "summary",
+}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# a block also found on more than this many other pages is treated as site chrome
+BOILERPLATE_PAGES = 3
+
+CODE_FENCE = "```"
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text blocks of a page, noting which lie inside <main> or <article>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []  # (tag, skipped, region)
+        self.blocks = []  # (region, text)
+        self.inline = []
+        self.prefix = ""
+
+    @property
+    def skipped(self) -> bool:
+        return bool(self.stack) and self.stack[-1][1]
+
+    @property
+    def region(self) -> str:
+        return self.stack[-1][2] if self.stack else "body"
+
+    def flush(self):
+        if self.skipped:
+            self.inline, self.prefix = [], ""
+            return
+        if self.in_pre:
+            text = "".join(self.inline).strip("\n")
+            if text.strip():
+                self.blocks.append((self.region, f"{CODE_FENCE}\n{text}\n{CODE_FENCE}"))
+        else:
+            text = " ".join("".join(self.inline).split())
+            if text:
+                self.blocks.append((self.region, self.prefix + text))
+        self.inline, self.prefix = [], ""
+
+    @property
+    def in_pre(self) -> bool:
+        return any(tag == "pre" for tag, _, _ in self.stack)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            # highlighters wrap each code line in a block element
+            if self.in_pre:
+                self.inline.append("\n")
+            else:
+                self.flush()
+        if tag in VOID_TAGS:
+            return
+        attributes = dict(attrs)
+        skipped = (
+            self.skipped
+            or tag in SKIPPED_TAGS
+            or attributes.get("role") in CHROME_ROLES
+            or attributes.get("aria-hidden") == "true"
+            or "hidden" in attributes
+            or bool(CHROME_CLASSES.search(attributes.get("class") or ""))
+        )
+        region = "main" if tag == "main" else "article" if tag == "article" and self.region == "body" else self.region
+        self.stack.append((tag, skipped, region))
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self.prefix = "#" * int(tag[1]) + " "
+        elif tag == "li":
+            self.prefix = "- "
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _, _ in self.stack):
+            return
+        if tag == "pre" or (tag in BLOCK_TAGS and not self.in_pre):
+            self.flush()
+        # unclosed tags inside it end with it
+        while self.stack and self.stack.pop()[0] != tag:
+            pass
+
+    def handle_data(self, data):
+        if not self.skipped:
+            self.inline.append(data)
+
+
+def extract_blocks(html: str) -> List[str]:
+    """Return the text blocks of a page's main content.
+
+    Scripts, styles, navigation, headers, footers, sidebars and other chrome
+    are dropped; if the page has a <main> (or else an <article>) only its
+    text is kept. Headings and list items keep a markdown marker and <pre>
+    blocks are kept verbatim as fenced code.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    parser.flush()
+    for region in ("main", "article"):
+        blocks = [text for block_region, text in parser.blocks if block_region == region]
+        if blocks:
+            return blocks
+    return [text for _, text in parser.blocks]
+
+
+def html_to_text(html: str) -> str:
+    return "\n\n".join(extract_blocks(html))
+
+
+class BoilerplateFilter:
+    """Drops text blocks repeated across pages, such as menus, banners and footers.
+
+    It counts how many pages each block is on, by a short hash of the block,
+    so the hashes can be saved with each page and counted again on the next
+    run. A page is added before it is filtered; a block also found on more
+    than ``min_pages`` other pages is dropped. Headings and code blocks are
+    always kept, since the same heading or snippet on many pages is still
+    content.
+    """
+
+    def __init__(self, min_pages: int = BOILERPLATE_PAGES):
+        self.min_pages = min_pages
+        self.pages = Counter()
+        self.page_count = 0
+
+    @staticmethod
+    def _hash(block: str) -> str:
+        return hashlib.blake2b(" ".join(block.casefold().split()).encode("utf-8"), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _filtered(block: str) -> bool:
+        return not block.startswith(("#", CODE_FENCE))
+
+    def hashes(self, blocks: List[str]) -> List[str]:
+        """Return the hashes of a page's blocks that may be chrome."""
+        return sorted({self._hash(block) for block in blocks if self._filtered(block)})
+
+    def add(self, hashes: List[str]) -> None:
+        """Count a page with these block hashes."""
+        if hashes:
+            self.pages.update(hashes)
+            self.page_count += 1
+
+    def remove(self, hashes: List[str]) -> None:
+        """Stop counting a page added with these block hashes."""
+        if hashes:
+            self.pages.subtract(hashes)
+            self.page_count -= 1
+
+    def __call__(self, blocks: List[str]) -> List[str]:
+        return [
+            block for block in blocks
+            if not self._filtered(block) or self.pages[self._hash(block)] <= self.min_pages
+        ]
@@ -1,38 +1,242 @@
-from dotenv import load_dotenv
+import argparse
+import asyncio
 from pathlib import Path
-from langchain_community.document_loaders import RecursiveUrlLoader
+
+from dotenv import load_dotenv
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from crawler import Crawler
+from dedupe import ChunkDeduplicator
+from embedding_cache import CachedEmbeddings
+from extraction import BoilerplateFilter, extract_blocks
+from manifest import CrawlManifest, PageRecord, chunk_ids, content_hash
+from pipeline import EMBED_CONCURRENCY, IndexingPipeline, count_tokens
 
 
 load_dotenv()
 
+START_URL = "https://docs.chaicode.com/"
+QDRANT_URL = "http://localhost:6333"
+COLLECTION_NAME = "learning_vectors"
+EMBEDDING_DIMENSIONS = 3072  # text-embedding-3-large
+
+# what was indexed for each page, so the next run only redoes what changed
+MANIFEST_PATH = Path(__file__).parent / "crawl_manifest.json"
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 150
+
+# changing how pages become chunks re-indexes every page on the next run
+INDEX_VERSION = f"text-v2:{CHUNK_SIZE}/{CHUNK_OVERLAP}"
+
+# the manifest is saved after about this many new chunks are stored
+CHECKPOINT_CHUNKS = 2000
+
+# pages are held back until the boilerplate filter has counted the blocks of this many,
+# so the first pages of a new index lose their site chrome too
+BOILERPLATE_WARMUP_PAGES = 10
+
+
+async def index(
+    start_url: str,
+    concurrency: int,
+    per_host: int,
+    max_pages=None,
+    full=False,
+    qdrant_url=QDRANT_URL,
+    grpc=True,
+    embed_concurrency=EMBED_CONCURRENCY
+):
+    #chunking of the page text, with site chrome and duplicate chunks removed
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+    # only to report savings: how raw HTML used to be chunked
+    raw_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=400
+    )
+
+    # vector embedding, reusing vectors of text embedded before
+    embedding_model = CachedEmbeddings(OpenAIEmbeddings(
+        model="text-embedding-3-large"
+    ))
+
+    #making connections with the db (over gRPC unless disabled), creating the collection on the first run
+    client = QdrantClient(location=qdrant_url, prefer_grpc=grpc)
+    # a collection indexed without a manifest holds points whose IDs are unknown and would
+    # never be replaced, and a manifest without its collection (a new or in-memory Qdrant)
+    # would have every page answer 304 and nothing indexed, so either is indexed again from scratch
+    collection_exists = client.collection_exists(COLLECTION_NAME)
+    if not full and collection_exists and not MANIFEST_PATH.exists():
+        print(f"No crawl manifest for the existing '{COLLECTION_NAME}' collection; indexing it again from scratch")
+        full = True
+    if not full and not collection_exists and MANIFEST_PATH.exists():
+        print(f"No '{COLLECTION_NAME}' collection for the crawl manifest; discarding it and indexing from scratch")
+        full = True
+    if full:
+        client.delete_collection(COLLECTION_NAME)
+        MANIFEST_PATH.unlink(missing_ok=True)
+    if not client.collection_exists(COLLECTION_NAME):
+        client.create_collection(
+            COLLECTION_NAME,
+            vectors_config=VectorParams(size=EMBEDDING_DIMENSIONS, distance=Distance.COSINE)
+        )
+
+    manifest = CrawlManifest(MANIFEST_PATH, version=INDEX_VERSION)
+    crawler = Crawler(start_url, concurrency=concurrency, per_host=per_host, max_pages=max_pages, manifest=manifest)
+    stats = dict.fromkeys(
+        [
+            "changed", "unchanged", "removed", "embedded", "deleted", "raw_chunks", "raw_tokens", "chunks", "tokens",
+            "exact_duplicates", "near_duplicates"
+        ],
+        0
+    )
+
+    # site chrome is recognized by counting blocks over every indexed page, not only those changed in this run
+    boilerplate = BoilerplateFilter()
+    for page in manifest.pages.values():
+        boilerplate.add(page.blocks)
+    # changed pages waiting for enough pages to be counted
+    waiting = []
+    # chunks repeated across the pages indexed in this run are stored once
+    deduplicator = ChunkDeduplicator()
+
+    # pages whose new chunks were handed to the pipeline (None for removed pages),
+    # with the points those pages no longer use
+    pending = []
+
+    async with IndexingPipeline(embedding_model, client, COLLECTION_NAME, concurrency=embed_concurrency) as pipeline:
+
+        async def checkpoint():
+            await pipeline.drain()
+            for url, record, _ in pending:
+                if record is None:
+                    manifest.remove(url)
+                else:
+                    manifest.update(url, record)
+            # a point another page still refers to as a copy of its chunk is kept
+            referenced = {chunk_id for page in manifest.pages.values() for chunk_id in page.chunk_ids}
+            stale = {chunk_id for _, _, old_ids in pending for chunk_id in old_ids} - referenced
+            await pipeline.delete(list(stale))
+            stats["deleted"] += len(stale)
+            pending.clear()
+            # recorded only once its chunks are stored, so an interrupted run redoes the page
+            manifest.save()
+
+        async def index_page(doc, record, previous, blocks):
+            doc.page_content = "\n\n".join(boilerplate(blocks))
+            split_docs = text_splitter.split_documents(documents=[doc])
+            # a chunk repeating one already indexed in this run refers to that chunk's point, so
+            # the point is kept for as long as any page refers to it
+            ids = chunk_ids(doc.metadata["source"], [chunk.page_content for chunk in split_docs])
+            own_chunks, referenced = [], []
+            for chunk_id, chunk in zip(ids, split_docs):
+                original = deduplicator.original(chunk.page_content, chunk_id)
+                if original is None:
+                    own_chunks.append((chunk_id, chunk))
+                referenced.append(original or chunk_id)
+            record.chunk_ids = list(dict.fromkeys(referenced))
+            stats["chunks"] += len(own_chunks)
+            stats["tokens"] += sum(count_tokens(chunk.page_content) for _, chunk in own_chunks)
+            # chunks whose text is unchanged keep their point and are not embedded again
+            kept = set(previous.chunk_ids)
+            new_chunks = [(chunk_id, chunk) for chunk_id, chunk in own_chunks if chunk_id not in kept]
+            await pipeline.add(new_chunks)
+            stats["embedded"] += len(new_chunks)
+            pending.append((doc.metadata["source"], record, kept - set(record.chunk_ids)))
+
+        #unchanged pages answer 304 and are never yielded; the rest are chunked as they are
+        #crawled, while earlier chunks are embedded and stored
+        saved_at = 0
+        async for doc in crawler.crawl():
+            url = doc.metadata["source"]
+            record = PageRecord(
+                etag=doc.metadata.pop("etag"),
+                last_modified=doc.metadata.pop("last_modified"),
+                content_hash=content_hash(doc.page_content),
+                links=doc.metadata.pop("links"),
+                version=INDEX_VERSION
+            )
+            previous = manifest.get(url) or PageRecord()
+            if record.content_hash == previous.content_hash and not manifest.outdated(url):
+                record.chunk_ids = previous.chunk_ids
+                record.blocks = previous.blocks
+                manifest.update(url, record)
+                continue
+
+            stats["changed"] += 1
+            raw_chunks = raw_splitter.split_text(doc.page_content)
+            stats["raw_chunks"] += len(raw_chunks)
+            stats["raw_tokens"] += sum(count_tokens(chunk) for chunk in raw_chunks)
 
+            blocks = extract_blocks(doc.page_content)
+            record.blocks = boilerplate.hashes(blocks)
+            boilerplate.remove(previous.blocks)
+            boilerplate.add(record.blocks)
+            waiting.append((doc, record, previous, blocks))
+            if boilerplate.page_count >= BOILERPLATE_WARMUP_PAGES:
+                for page in waiting:
+                    await index_page(*page)
+                waiting.clear()
+            if stats["embedded"] - saved_at >= CHECKPOINT_CHUNKS:
+                await checkpoint()
+                saved_at = stats["embedded"]
 
-#loading the url
-loader = RecursiveUrlLoader( "https://docs.chaicode.com/",)
-docs = loader.load()
+        for page in waiting:
+            await index_page(*page)
 
+        #pages a complete crawl no longer reaches are removed from the index
+        if max_pages is None:
+            for url in manifest.missing(crawler.start_url, crawler.fetched, crawler.failed):
+                pending.append((url, None, set(manifest.get(url).chunk_ids)))
+                stats["removed"] += 1
+        await checkpoint()
 
-#chunking
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1000,
-    chunk_overlap=400
-)
-split_docs = text_splitter.split_documents(documents=docs)
+    stats["unchanged"] = len(crawler.fetched) - stats["changed"]
+    stats["exact_duplicates"] = deduplicator.exact_duplicates
+    stats["near_duplicates"] = deduplicator.near_duplicates
+    print(
+        f"Pages: {stats['changed']} new or changed, {stats['unchanged']} unchanged, {stats['removed']} removed; "
+        f"chunks: {stats['embedded']} embedded, {stats['deleted']} deleted"
+    )
+    print(
+        f"Stored {pipeline.chunks} chunks ({pipeline.tokens} tokens in {pipeline.requests} embedding requests) "
+        f"at {pipeline.chunks_per_second:.1f} chunks/sec"
+    )
+    print(
+        f"Text extraction and dedupe: {stats['chunks']} chunks ({stats['tokens']} tokens) instead of "
+        f"{stats['raw_chunks']} ({stats['raw_tokens']}) from raw HTML, saving "
+        f"{stats['raw_chunks'] - stats['chunks']} chunks and {stats['raw_tokens'] - stats['tokens']} tokens; "
+        f"{stats['exact_duplicates']} exact and {stats['near_duplicates']} near-duplicate chunks dropped"
+    )
+    print(f"Embedding cache: {embedding_model.hits} hits, {embedding_model.misses} misses")
 
-# vector embedding
-embedding_model =OpenAIEmbeddings(
-    model="text-embedding-3-large"
-)
 
-#using [embedding_model] create embeddings of [split_docs] and store in vector db
-vector_store = QdrantVectorStore.from_documents(
-    documents=split_docs,
-    url="http://localhost:6333",
-    collection_name="learning_vectors",
-    embedding=embedding_model
-)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl a docs site and index it into Qdrant")
+    parser.add_argument("--url", default=START_URL, help="Page to start crawling from")
+    parser.add_argument("--concurrency", type=int, default=16, help="Pages fetched at once")
+    parser.add_argument("--per-host", type=int, default=4, help="Pages fetched at once from one host")
+    parser.add_argument("--max-pages", type=int, default=None, help="Stop after this many pages")
+    parser.add_argument("--full", action="store_true", help="Drop the collection and manifest and index everything again")
+    parser.add_argument("--qdrant", default=QDRANT_URL, help="Qdrant URL, or :memory: for a throwaway in-process instance")
+    parser.add_argument("--no-grpc", action="store_true", help="Talk to Qdrant over REST instead of gRPC")
+    parser.add_argument("--embed-concurrency", type=int, default=EMBED_CONCURRENCY, help="Embedding requests in flight at once")
+    args = parser.parse_args()
 
-print("Indexing of documents done...")
\ No newline at end of file
+    asyncio.run(index(
+        args.url,
+        args.concurrency,
+        args.per_host,
+        args.max_pages,
+        args.full,
+        qdrant_url=args.qdrant,
+        grpc=not args.no_grpc,
+        embed_concurrency=args.embed_concurrency
+    ))
+    print("Indexing of documents done...")
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_ids(url: str, texts: Iterable[str]) -> List[str]:
+    """Return deterministic Qdrant point IDs for the chunks of a page.
+
+    An ID depends on the page, the chunk's text and how many identical chunks
+    came before it on the page, so an unchanged chunk keeps its ID when the
+    text around it changes.
+    """
+    ids, occurrences = [], {}
+    for text in texts:
+        digest = content_hash(text)
+        occurrences[digest] = occurrences.get(digest, 0) + 1
+        ids.append(str(uuid.uuid5(uuid.NAMESPACE_URL, f"{url}#{digest}:{occurrences[digest]}")))
+    return ids
+
+
+@dataclass
+class PageRecord:
+    """What was indexed for a page, and how to ask the server whether it changed."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    chunk_ids: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    # how the page was turned into chunks, and the hashes of its text blocks
+    version: str = ""
+    blocks: List[str] = field(default_factory=list)
+
+
+class CrawlManifest:
+    """Persistent map of crawled URL -> HTTP validators, content hash and chunk IDs.
+
+    It lets a re-index send conditional GETs, skip pages whose content is
+    unchanged, embed only new chunks and delete the points of chunks and
+    pages that are gone.
+
+    ``version`` names how pages are turned into chunks. A page recorded
+    with another version is outdated: its chunk IDs are still known, so its
+    points can be replaced, but it is fetched and chunked again. Since each
+    page carries its own version, a run that stops part way through leaves
+    the pages it did not reach outdated.
+    """
+
+    def __init__(self, path: Path, version: str = ""):
+        self.path = Path(path)
+        self.version = version
+        self.pages: Dict[str, PageRecord] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.pages = {url: PageRecord(**record) for url, record in data["pages"].items()}
+
+    def get(self, url: str) -> Optional[PageRecord]:
+        return self.pages.get(url)
+
+    def outdated(self, url: str) -> bool:
+        """Whether a page was indexed with another version, or not at all."""
+        record = self.pages.get(url)
+        return record is None or record.version != self.version
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return the If-None-Match/If-Modified-Since headers for a page indexed before."""
+        record = self.pages.get(url)
+        headers = {}
+        if record is not None and record.content_hash and not self.outdated(url):
+            if record.etag:
+                headers["If-None-Match"] = record.etag
+            if record.last_modified:
+                headers["If-Modified-Since"] = record.last_modified
+        return headers
+
+    def update(self, url: str, record: PageRecord) -> None:
+        self.pages[url] = record
+
+    def remove(self, url: str) -> Optional[PageRecord]:
+        return self.pages.pop(url, None)
+
+    def missing(self, prefix: str, alive: Set[str], failed: Set[str]) -> List[str]:
+        """Return the indexed URLs under prefix that a full crawl no longer reached.
+
+        Pages that failed with a transient error are kept until a crawl
+        reaches them again.
+        """
+        return [url for url in self.pages if url.startswith(prefix) and url not in alive and url not in failed]
+
+    def save(self) -> None:
+        """Write the manifest, replacing the old file only once the new one is complete."""
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"pages": {url: asdict(record) for url, record in self.pages.items()}}, f)
+        os.replace(temporary, self.path)
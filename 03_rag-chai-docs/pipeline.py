@@ -0,0 +1,178 @@
+import asyncio
+import time
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointIdsList, PointStruct
+
+
+# an embedding request carries at most this many tokens and inputs
+# (OpenAI allows 300k tokens and 2048 inputs; smaller batches run in parallel)
+EMBED_BATCH_TOKENS = 50_000
+EMBED_BATCH_SIZE = 512
+
+# embedding requests in flight at once
+EMBED_CONCURRENCY = 4
+
+# points sent to Qdrant per upsert
+UPSERT_BATCH_SIZE = 1024
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """The tokenizer of the OpenAI embedding models, if tiktoken and its data are available."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class IndexingPipeline:
+    """Embeds chunks in token-budgeted batches and upserts them to Qdrant in bulk.
+
+    Up to ``concurrency`` embedding requests run at once, each in a worker
+    thread; while they do, a single writer upserts the vectors of finished
+    batches, so storing one batch overlaps embedding the next. ``add``
+    waits when every embedding slot is busy, which keeps memory bounded.
+    Points are written in langchain_qdrant's payload layout, so
+    QdrantVectorStore can search the collection.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        client: QdrantClient,
+        collection_name: str,
+        concurrency: int = EMBED_CONCURRENCY,
+        batch_tokens: int = EMBED_BATCH_TOKENS,
+        batch_size: int = EMBED_BATCH_SIZE,
+        upsert_size: int = UPSERT_BATCH_SIZE
+    ):
+        self.embeddings = embeddings
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_tokens = batch_tokens
+        self.batch_size = batch_size
+        self.upsert_size = upsert_size
+
+        self.chunks = 0
+        self.tokens = 0
+        self.requests = 0
+        self.started = time.perf_counter()
+
+        self._slots = asyncio.Semaphore(concurrency)
+        self._buffer: List[Tuple[str, Document]] = []
+        self._buffer_tokens = 0
+        self._embedding = set()
+        self._upserts: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        self._writer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def __aenter__(self):
+        self.started = time.perf_counter()
+        self._writer = asyncio.create_task(self._write())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                await self.drain()
+        finally:
+            self._writer.cancel()
+            for task in self._embedding:
+                task.cancel()
+            await asyncio.gather(self._writer, *self._embedding, return_exceptions=True)
+
+    @property
+    def chunks_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.chunks / elapsed if elapsed > 0 else 0.0
+
+    async def add(self, chunks: Sequence[Tuple[str, Document]]) -> None:
+        """Queue chunks with their point IDs for embedding and upsert."""
+        self._raise_error()
+        for point_id, chunk in chunks:
+            tokens = count_tokens(chunk.page_content)
+            if self._buffer and (
+                self._buffer_tokens + tokens > self.batch_tokens or len(self._buffer) >= self.batch_size
+            ):
+                await self._dispatch()
+            self._buffer.append((point_id, chunk))
+            self._buffer_tokens += tokens
+
+    async def drain(self) -> None:
+        """Wait until every chunk added so far is embedded and stored."""
+        if self._buffer:
+            await self._dispatch()
+        # a failed batch is reported by _raise_error, after the others have finished
+        await asyncio.gather(*self._embedding, return_exceptions=True)
+        await self._upserts.join()
+        self._raise_error()
+
+    async def delete(self, point_ids: Sequence[str]) -> None:
+        if point_ids:
+            await asyncio.to_thread(
+                self.client.delete, self.collection_name, points_selector=PointIdsList(points=list(point_ids))
+            )
+
+    async def _dispatch(self) -> None:
+        batch, tokens = self._buffer, self._buffer_tokens
+        self._buffer, self._buffer_tokens = [], 0
+        await self._slots.acquire()
+        task = asyncio.create_task(self._embed(batch, tokens))
+        self._embedding.add(task)
+        task.add_done_callback(self._embedding.discard)
+
+    async def _embed(self, batch: List[Tuple[str, Document]], tokens: int) -> None:
+        try:
+            vectors = await asyncio.to_thread(
+                self.embeddings.embed_documents, [chunk.page_content for _, chunk in batch]
+            )
+            self.requests += 1
+            self.tokens += tokens
+            points = [
+                PointStruct(id=point_id, vector=vector, payload={"page_content": chunk.page_content, "metadata": chunk.metadata})
+                for (point_id, chunk), vector in zip(batch, vectors)
+            ]
+            await self._upserts.put(points)
+        except BaseException as e:
+            self._error = self._error or e
+            raise
+        finally:
+            self._slots.release()
+
+    async def _write(self) -> None:
+        """Upsert embedded batches, merging those that are waiting into one request."""
+        while True:
+            points = await self._upserts.get()
+            merged = 1
+            while len(points) < self.upsert_size and not self._upserts.empty():
+                points = points + self._upserts.get_nowait()
+                merged += 1
+            try:
+                for start in range(0, len(points), self.upsert_size):
+                    await asyncio.to_thread(
+                        self.client.upsert, self.collection_name, points=points[start:start + self.upsert_size]
+                    )
+                self.chunks += len(points)
+            except Exception as e:
+                self._error = self._error or e
+            finally:
+                for _ in range(merged):
+                    self._upserts.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Indexing failed") from self._error
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler import Crawler
+from manifest import CrawlManifest, PageRecord, content_hash
+
+
+def page(title, *links):
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return f"<html><head><title>{title}</title></head><body><main><p>{title}</p>{anchors}</main></body></html>"
+
+
+class FixtureSite:
+    """A small docs site served over HTTP, with robots.txt, a sitemap, a redirect and conditional GETs."""
+
+    def __init__(self):
+        self.pages = {
+            "/docs/": page("Home", "setup", "guide", "moved", "private/notes", "gone", "https://elsewhere.test/"),
+            "/docs/setup": page("Setup", "guide"),
+            "/docs/guide": page("Guide", "setup", "deep"),
+            "/docs/deep": page("Deep"),
+            "/docs/install": page("Install"),
+            "/docs/orphan": page("Orphan"),
+            "/docs/private/notes": page("Private"),
+        }
+        self.redirects = {"/docs/moved": "/docs/install"}
+        # paths answering with a server error
+        self.broken = set()
+        self.requested = []
+        self.base_url = None
+
+    def respond(self, path, headers):
+        """Return the status, headers and body answering a GET of path."""
+        self.requested.append(path)
+        if path == "/robots.txt":
+            robots = f"User-agent: *\nDisallow: /docs/private/\nSitemap: {self.base_url}/sitemap.xml\n"
+            return 200, {"Content-Type": "text/plain"}, robots
+        if path == "/sitemap.xml":
+            locations = "".join(f"<url><loc>{self.base_url}{loc}</loc></url>" for loc in ("/docs/", "/docs/orphan"))
+            sitemap = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locations}</urlset>'
+            return 200, {"Content-Type": "application/xml"}, sitemap
+        if path in self.redirects:
+            return 301, {"Location": self.redirects[path]}, ""
+        if path in self.broken:
+            return 503, {"Content-Type": "text/plain"}, "Unavailable"
+        if path not in self.pages:
+            return 404, {"Content-Type": "text/plain"}, "Not found"
+        etag = f'"{content_hash(self.pages[path])[:12]}"'
+        if headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, ""
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": etag}, self.pages[path]
+
+    def handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, headers, body = site.respond(self.path, self.headers)
+                body = body.encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def crawler(self, manifest=None):
+        return Crawler(f"{self.base_url}/docs/", concurrency=4, per_host=2, manifest=manifest)
+
+    def urls(self, *paths):
+        return {f"{self.base_url}/docs/{path}" for path in paths}
+
+
+@pytest.fixture
+def site():
+    site = FixtureSite()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), site.handler())
+    site.base_url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield site
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def crawl(crawler):
+    async def run():
+        return [doc async for doc in crawler.crawl()]
+
+    return asyncio.run(run())
+
+
+def record_pages(manifest, documents):
+    for doc in documents:
+        manifest.update(doc.metadata["source"], PageRecord(
+            etag=doc.metadata["etag"],
+            last_modified=doc.metadata["last_modified"],
+            content_hash=content_hash(doc.page_content),
+            links=doc.metadata["links"],
+            version=manifest.version
+        ))
+
+
+def test_crawl_follows_links_and_sitemap_within_robots_rules(site):
+    crawler = site.crawler()
+
+    documents = crawl(crawler)
+
+    assert {doc.metadata["source"] for doc in documents} == site.urls("", "setup", "guide", "deep", "install", "orphan")
+    assert {doc.metadata["title"] for doc in documents} == {"Home", "Setup", "Guide", "Deep", "Install", "Orphan"}
+    assert "/robots.txt" in site.requested and "/sitemap.xml" in site.requested
+    assert "/docs/private/notes" not in site.requested
+    assert len(site.requested) == len(set(site.requested))
+    # a 404 is a page that is gone, not a failure to retry
+    assert crawler.failed == set()
+    # a redirected link is recorded under the page it leads to
+    assert crawler.fetched == site.urls("", "setup", "guide", "deep", "install", "orphan")
+
+
+def test_unchanged_pages_answer_304_and_their_links_are_followed(site, tmp_path):
+    manifest = CrawlManifest(tmp_path / "manifest.json", version="test")
+    record_pages(manifest, crawl(site.crawler(manifest)))
+
+    site.pages["/docs/deep"] = page("Deep, revised")
+    crawler = site.crawler(manifest)
+    documents = crawl(crawler)
+
+    # deep is only linked from guide, which did not change; the redirected link is requested without
+    # the validators of the page it leads to, so that page is sent again
+    assert {doc.metadata["source"] for doc in documents} == site.urls("deep", "install")
+    assert crawler.fetched == site.urls("", "setup", "guide", "deep", "install", "orphan")
+
+
+def test_pages_that_are_gone_are_missing_but_failures_are_kept(site, tmp_path):
+    manifest = CrawlManifest(tmp_path / "manifest.json", version="test")
+    record_pages(manifest, crawl(site.crawler(manifest)))
+
+    del site.pages["/docs/orphan"]
+    site.broken.add("/docs/setup")
+    crawler = site.crawler(manifest)
+    crawl(crawler)
+
+    assert crawler.failed == site.urls("setup")
+    assert manifest.missing(crawler.start_url, crawler.fetched, crawler.failed) == [f"{site.base_url}/docs/orphan"]
+
+
+def test_pages_reached_through_a_failing_page_are_not_missing(site, tmp_path):
+    manifest = CrawlManifest(tmp_path / "manifest.json", version="test")
+    record_pages(manifest, crawl(site.crawler(manifest)))
+
+    # deep is only linked from guide
+    site.broken.add("/docs/guide")
+    crawler = site.crawler(manifest)
+    crawl(crawler)
+
+    assert crawler.failed == site.urls("guide")
+    assert f"{site.base_url}/docs/deep" in crawler.fetched
+    assert manifest.missing(crawler.start_url, crawler.fetched, crawler.failed) == []
+
+
+def test_a_failing_start_page_keeps_the_whole_site(site, tmp_path):
+    manifest = CrawlManifest(tmp_path / "manifest.json", version="test")
+    record_pages(manifest, crawl(site.crawler(manifest)))
+
+    site.broken.add("/docs/")
+    crawler = site.crawler(manifest)
+    crawl(crawler)
+
+    assert crawler.failed == site.urls("")
+    assert crawler.fetched == site.urls("setup", "guide", "deep", "install", "orphan")
+    assert manifest.missing(crawler.start_url, crawler.fetched, crawler.failed) == []
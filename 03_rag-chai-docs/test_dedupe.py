@@ -0,0 +1,42 @@
+from dedupe import ChunkDeduplicator
+
+
+SETUP = (
+    "Install docker and docker compose, then clone the course repository and run docker compose up "
+    "to start the database, the vector store and the web application used in every lesson of the course."
+)
+
+
+def test_new_chunks_are_remembered_under_their_id():
+    deduplicator = ChunkDeduplicator()
+
+    assert deduplicator.original(SETUP, "a-1") is None
+    assert deduplicator.original("Brew the chai for five minutes with ginger and cardamom.", "a-2") is None
+    assert deduplicator.exact_duplicates == deduplicator.near_duplicates == 0
+
+
+def test_exact_duplicates_refer_to_the_first_chunk_ignoring_case_and_punctuation():
+    deduplicator = ChunkDeduplicator()
+    deduplicator.original(SETUP, "a-1")
+
+    assert deduplicator.original(SETUP, "b-1") == "a-1"
+    assert deduplicator.original(SETUP.upper().replace(",", ";"), "c-1") == "a-1"
+    assert deduplicator.exact_duplicates == 2
+
+
+def test_near_duplicates_refer_to_the_chunk_they_resemble():
+    deduplicator = ChunkDeduplicator()
+    deduplicator.original(SETUP, "a-1")
+
+    assert deduplicator.original(SETUP + " Enjoy!", "b-1") == "a-1"
+    assert deduplicator.near_duplicates == 1
+    assert deduplicator.exact_duplicates == 0
+
+
+def test_chunks_below_the_threshold_are_kept():
+    deduplicator = ChunkDeduplicator()
+    deduplicator.original(SETUP, "a-1")
+    half = " ".join(SETUP.split()[:18]) + " and then open the admin panel to create the first user of the course."
+
+    assert deduplicator.original(half, "b-1") is None
+    assert deduplicator.original(half, "c-1") == "b-1"
@@ -0,0 +1,75 @@
+from extraction import BoilerplateFilter, extract_blocks, html_to_text
+
+
+PAGE = """<html><head><title>Setup</title><style>body {}</style></head><body>
+<header><a href="/">Chai Docs</a></header>
+<nav class="sidebar"><ul><li>Setup</li><li>Guide</li></ul></nav>
+<main>
+  <h2>Install docker</h2>
+  <p>Install docker   and
+  compose.</p>
+  <ul><li>Linux</li><li>macOS</li></ul>
+  <pre><code><span>docker compose up</span>
+<span>docker ps</span></code></pre>
+  <div aria-hidden="true">Copy</div>
+  <script>track()</script>
+</main>
+<footer>Copyright</footer>
+</body></html>"""
+
+
+def test_main_content_is_kept_without_chrome():
+    assert extract_blocks(PAGE) == [
+        "## Install docker",
+        "Install docker and compose.",
+        "- Linux",
+        "- macOS",
+        "```\ndocker compose up\ndocker ps\n```",
+    ]
+
+
+def test_pages_without_main_keep_the_body_text():
+    html = "<html><body><nav>Menu</nav><p>First</p><div>Second <b>bold</b></div></body></html>"
+
+    assert html_to_text(html) == "First\n\nSecond bold"
+
+
+def test_blocks_on_many_pages_are_dropped_but_headings_and_code_are_kept():
+    boilerplate = BoilerplateFilter(min_pages=2)
+    pages = [["# Welcome", "Edit this page on GitHub", "```\npip install chai\n```", f"Lesson {n}"] for n in range(3)]
+    for blocks in pages:
+        boilerplate.add(boilerplate.hashes(blocks))
+
+    assert boilerplate.page_count == 3
+    assert boilerplate(pages[0]) == ["# Welcome", "```\npip install chai\n```", "Lesson 0"]
+
+
+def test_blocks_on_few_pages_are_kept():
+    boilerplate = BoilerplateFilter(min_pages=2)
+    pages = [["Edit this page on GitHub", f"Lesson {n}"] for n in range(2)]
+    for blocks in pages:
+        boilerplate.add(boilerplate.hashes(blocks))
+
+    assert boilerplate(pages[0]) == pages[0]
+
+
+def test_removed_pages_are_no_longer_counted():
+    boilerplate = BoilerplateFilter(min_pages=1)
+    hashes = [boilerplate.hashes(["Edit  this page on GitHub", f"Lesson {n}"]) for n in range(2)]
+    for page_hashes in hashes:
+        boilerplate.add(page_hashes)
+    assert boilerplate(["edit this page on github"]) == []
+
+    boilerplate.remove(hashes[1])
+
+    assert boilerplate.page_count == 1
+    assert boilerplate(["edit this page on github"]) == ["edit this page on github"]
+
+
+def test_hashes_skip_headings_and_code_and_repeats():
+    boilerplate = BoilerplateFilter()
+
+    hashes = boilerplate.hashes(["# Title", "```\ncode\n```", "Text", "text"])
+
+    assert len(hashes) == 1
+    assert boilerplate.hashes([]) == []
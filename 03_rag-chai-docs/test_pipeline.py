@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from manifest import chunk_ids
+from pipeline import IndexingPipeline, count_tokens
+
+
+COLLECTION_NAME = "test_vectors"
+DIMENSIONS = 8
+
+
+class FakeEmbeddings(Embeddings):
+    """Vectors derived from a hash of the text, remembering every embedding request."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.requests = []
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        if self.fail:
+            raise ConnectionError("embedding service unavailable")
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 + 0.01 for byte in digest[:DIMENSIONS]]
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION_NAME, vectors_config=VectorParams(size=DIMENSIONS, distance=Distance.COSINE))
+    return client
+
+
+def make_chunks(url, texts):
+    documents = [Document(page_content=text, metadata={"source": url, "title": "Lesson"}) for text in texts]
+    return list(zip(chunk_ids(url, texts), documents))
+
+
+def index(embeddings, client, chunks, **options):
+    async def run():
+        async with IndexingPipeline(embeddings, client, COLLECTION_NAME, **options) as pipeline:
+            await pipeline.add(chunks)
+            await pipeline.drain()
+        return pipeline
+
+    return asyncio.run(run())
+
+
+def test_batches_stay_within_token_budget(client):
+    texts = [f"chunk {number} " + "chai " * 40 for number in range(20)]
+    budget = 3 * max(count_tokens(text) for text in texts)
+    embeddings = FakeEmbeddings()
+
+    index(embeddings, client, make_chunks("https://docs.test/a", texts), batch_tokens=budget, batch_size=100)
+
+    assert [text for request in embeddings.requests for text in request] == texts
+    assert all(sum(count_tokens(text) for text in request) <= budget for request in embeddings.requests)
+    assert len(embeddings.requests) == 7
+
+
+def test_batches_stay_within_input_limit(client):
+    texts = [f"chunk {number}" for number in range(10)]
+    embeddings = FakeEmbeddings()
+
+    index(embeddings, client, make_chunks("https://docs.test/a", texts), batch_size=4)
+
+    assert [len(request) for request in embeddings.requests] == [4, 4, 2]
+
+
+def test_every_chunk_is_upserted_under_its_point_id(client):
+    chunks = make_chunks("https://docs.test/a", [f"chunk {number}" for number in range(25)])
+
+    pipeline = index(FakeEmbeddings(), client, chunks, batch_size=3, upsert_size=4, concurrency=2)
+
+    assert pipeline.chunks == 25
+    assert pipeline.requests == 9
+    assert client.count(COLLECTION_NAME).count == 25
+    points = client.retrieve(COLLECTION_NAME, ids=[point_id for point_id, _ in chunks])
+    assert {point.id for point in points} == {point_id for point_id, _ in chunks}
+
+
+def test_vector_store_reads_the_points(client):
+    chunks = make_chunks("https://docs.test/a", ["Brew the chai for five minutes.", "Install docker first."])
+    embeddings = FakeEmbeddings()
+    index(embeddings, client, chunks)
+
+    vector_db = QdrantVectorStore(client=client, collection_name=COLLECTION_NAME, embedding=embeddings)
+    [result] = vector_db.similarity_search("Install docker first.", k=1)
+
+    assert result.page_content == "Install docker first."
+    assert result.metadata["source"] == "https://docs.test/a"
+    assert result.metadata["title"] == "Lesson"
+    assert result.metadata["_id"] == chunks[1][0]
+
+
+def test_drain_raises_embedding_errors(client):
+    async def run():
+        async with IndexingPipeline(FakeEmbeddings(fail=True), client, COLLECTION_NAME) as pipeline:
+            await pipeline.add(make_chunks("https://docs.test/a", ["chunk"]))
+            await pipeline.drain()
+
+    with pytest.raises(RuntimeError, match="Indexing failed") as error:
+        asyncio.run(run())
+
+    assert isinstance(error.value.__cause__, ConnectionError)
+    assert client.count(COLLECTION_NAME).count == 0